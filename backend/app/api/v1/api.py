@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import connectors, skus
+from app.api.v1.endpoints import connectors, events, skus
 
 api_router = APIRouter()
 api_router.include_router(skus.router)
 api_router.include_router(connectors.router)
+api_router.include_router(events.router)
@@ -1,35 +1,102 @@
 from fastapi import APIRouter, HTTPException
 
+from app.connectors import CatalogProduct, token_cache
 from app.schemas import (
+    CatalogAggregateRequest,
     CatalogLookupRequest,
     CatalogLookupResponse,
+    TrackBatchRequest,
+    TrackBatchResponse,
+    TrackBatchResult,
     TrackShipmentRequest,
     TrackShipmentResponse,
 )
 from app.services import ingestion
+from app.services.catalog_cache import catalog_cache
 
 router = APIRouter(prefix="/connectors", tags=["connectors"])
 
 
 @router.post("/track", response_model=TrackShipmentResponse)
-def trigger_tracking(request: TrackShipmentRequest):
+async def trigger_tracking(request: TrackShipmentRequest):
     try:
-        events = ingestion.ingest_tracking(request)
+        events, duplicates = await ingestion.ingest_tracking_async(request)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return TrackShipmentResponse(events=events)
+    return TrackShipmentResponse(events=events, new=len(events), duplicates=duplicates)
+
+
+@router.post("/track:batch", response_model=TrackBatchResponse)
+async def trigger_tracking_batch(request: TrackBatchRequest):
+    """Poll carriers for many shipments in one call.
+
+    Carriers are queried in batches where their API allows it (FedEx,
+    USPS) and with bounded concurrency otherwise (UPS), all providers at
+    once. Lookup or storage failures are reported per shipment.
+    """
+    outcomes = await ingestion.ingest_tracking_batch_async(request.shipments)
+    results = [
+        TrackBatchResult(
+            sku_id=shipment.sku_id,
+            tracking_number=shipment.tracking_number,
+            provider=shipment.provider,
+            events=events,
+            new=len(events),
+            duplicates=duplicates,
+            error=error,
+        )
+        for shipment, (events, duplicates, error) in zip(request.shipments, outcomes)
+    ]
+    # A shipment listed twice is stored once and both entries report it; count it once.
+    distinct = {(result.sku_id, result.provider, result.tracking_number): result for result in results}.values()
+    return TrackBatchResponse(
+        results=results,
+        new=sum(result.new for result in distinct),
+        duplicates=sum(result.duplicates for result in distinct),
+        failed=sum(1 for result in results if result.error),
+    )
 
 
 @router.post("/catalog", response_model=CatalogLookupResponse)
-def lookup_catalog(request: CatalogLookupRequest):
+async def lookup_catalog(request: CatalogLookupRequest):
+    try:
+        product = await ingestion.lookup_catalog_async(request)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return _catalog_response(product)
+
+
+@router.post("/catalog:aggregate", response_model=CatalogLookupResponse)
+async def aggregate_catalog(request: CatalogAggregateRequest):
+    """Query several catalog providers concurrently.
+
+    `strategy` "first" returns the first good answer; "merge" combines
+    every answer, earlier providers in `providers` winning per field.
+    """
     try:
-        product = ingestion.lookup_catalog(request)
+        product = await ingestion.aggregate_catalog(request)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return _catalog_response(product)
+
+
+def _catalog_response(product: CatalogProduct) -> CatalogLookupResponse:
     return CatalogLookupResponse(
         title=product.title,
         description=product.description,
         brand=product.brand,
         identifiers=product.identifiers,
         raw=product.raw,
+        sources=product.sources,
     )
+
+
+@router.get("/token-cache/stats")
+def token_cache_stats():
+    return token_cache.stats()
+
+
+@router.get("/catalog-cache/stats")
+def catalog_cache_stats():
+    """Catalog cache counters; `upstream_calls_saved` is provider quota not spent."""
+    return catalog_cache.stats()
@@ -0,0 +1,62 @@
+import json
+from typing import List, Tuple
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.schemas.sku import BulkEventError, BulkEventResponse, SkuEventCreate
+from app.services import tracking
+
+router = APIRouter(tags=["events"])
+
+MAX_BULK_EVENTS = 50_000
+
+
+def _parse_rows(body: bytes, content_type: str) -> Tuple[list, List[BulkEventError]]:
+    """Split a JSON array or NDJSON body into raw rows plus per-line parse errors."""
+    if "ndjson" in content_type:
+        rows, errors = [], []
+        for index, line in enumerate(body.splitlines()):
+            if not line.strip():
+                continue
+            try:
+                rows.append((index, json.loads(line)))
+            except ValueError as exc:
+                errors.append(BulkEventError(index=index, error=f"Invalid JSON: {exc}"))
+        return rows, errors
+
+    try:
+        data = json.loads(body)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {exc}") from exc
+    if not isinstance(data, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of events")
+    return list(enumerate(data)), []
+
+
+@router.post("/events:bulk", response_model=BulkEventResponse)
+async def bulk_add_events(request: Request):
+    """Ingest many SKU events in one call.
+
+    Accepts a JSON array or NDJSON (Content-Type: application/x-ndjson).
+    Invalid rows are reported by index and skipped; valid rows are written,
+    except those whose content_key is already stored for the SKU.
+    """
+    rows, errors = _parse_rows(await request.body(), request.headers.get("content-type", ""))
+    if len(rows) > MAX_BULK_EVENTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_EVENTS} events per request")
+
+    payloads = []
+    for index, row in rows:
+        try:
+            payloads.append((index, SkuEventCreate.model_validate(row)))
+        except ValidationError as exc:
+            detail = "; ".join(
+                f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors()
+            )
+            errors.append(BulkEventError(index=index, error=detail))
+
+    accepted, duplicates, write_errors = await run_in_threadpool(tracking.record_events_bulk, payloads)
+    errors = sorted(errors + write_errors, key=lambda err: err.index)
+    return BulkEventResponse(accepted=accepted, duplicates=duplicates, rejected=len(errors), errors=errors)
@@ -1,8 +1,14 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
 
+from app.core.pagination import InvalidCursorError
+from app.core.serialization import dumps, json_response
 from app.schemas.sku import (
+    ResolveRequest,
+    ResolveResponse,
     SkuCreate,
     SkuEventCreate,
     SkuEventRead,
@@ -10,6 +16,8 @@ from app.schemas.sku import (
     TimelineResponse,
 )
 from app.services import tracking
+from app.services.cache import timeline_cache
+from app.services.resolution import resolution_cache, resolve_identifiers
 
 router = APIRouter(prefix="/skus", tags=["skus"])
 
@@ -20,21 +28,66 @@ def create_sku(payload: SkuCreate):
     return sku
 
 
+@router.post("/resolve", response_model=ResolveResponse)
+def resolve_skus(payload: ResolveRequest):
+    return resolve_identifiers(payload.identifiers)
+
+
+@router.get("/resolve/stats")
+def resolution_cache_stats():
+    return resolution_cache.stats()
+
+
+@router.get("", response_model=List[SkuRead])
+def list_skus(
+    status: Optional[str] = None,
+    location: Optional[str] = None,
+    limit: int = Query(tracking.DEFAULT_TIMELINE_LIMIT, ge=1, le=tracking.MAX_TIMELINE_LIMIT),
+    after_id: Optional[int] = None,
+):
+    return tracking.list_skus(status=status, location=location, limit=limit, after_id=after_id)
+
+
 @router.post("/{sku_id}/events", response_model=SkuEventRead, status_code=201)
 def add_event(sku_id: int, payload: SkuEventCreate):
     if payload.sku_id != sku_id:
         raise HTTPException(status_code=400, detail="SKU ID mismatch")
-    return tracking.record_event(payload)
+    try:
+        return tracking.record_event(payload)
+    except IntegrityError as exc:
+        raise HTTPException(status_code=409, detail="Event with this content_key already exists") from exc
 
 
 @router.get("/{sku_id}/timeline", response_model=TimelineResponse)
-def get_timeline(sku_id: int):
-    timeline = tracking.get_sku_timeline(sku_id)
-    if not timeline:
+async def get_timeline(
+    sku_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(tracking.DEFAULT_TIMELINE_LIMIT, ge=1, le=tracking.MAX_TIMELINE_LIMIT),
+    cursor: Optional[str] = None,
+):
+    async def load():
+        timeline = await tracking.get_sku_timeline_async(
+            sku_id, since=since, until=until, limit=limit, cursor=cursor
+        )
+        return dumps(timeline) if timeline else None
+
+    try:
+        body = await timeline_cache.get_or_load_async(sku_id, (since, until, limit, cursor), load)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if body is None:
         raise HTTPException(status_code=404, detail="SKU not found")
-    return timeline
+    # Rows are projected to the TimelineResponse shape by the service; the
+    # response_model only documents it.
+    return json_response(body)
+
+
+@router.get("/timeline-cache/stats")
+def timeline_cache_stats():
+    return timeline_cache.stats()
 
 
 @router.get("/search", response_model=List[SkuRead])
-def search_sku(q: str):
-    return tracking.search_skus(q)
+async def search_sku(q: str, limit: int = Query(20, ge=1, le=100)):
+    return json_response(dumps(await tracking.search_skus_async(q, limit=limit)))
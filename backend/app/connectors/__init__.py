@@ -1,6 +1,21 @@
-from .shipping import FedExConnector, UpsConnector, UspsConnector
-from .catalog import UpcItemDbConnector, BarcodeLookupConnector
-from .base import ConnectorError, ConnectorEvent, CatalogProduct
+from .shipping import (
+    FedExConnector,
+    UpsConnector,
+    UspsConnector,
+    AsyncFedExConnector,
+    AsyncUpsConnector,
+    AsyncUspsConnector,
+)
+from .catalog import (
+    UpcItemDbConnector,
+    BarcodeLookupConnector,
+    AsyncUpcItemDbConnector,
+    AsyncBarcodeLookupConnector,
+    CatalogAggregator,
+)
+from .base import ConnectorError, ConnectorEvent, CatalogProduct, TrackingResult
+from .auth import TokenCache, token_cache
+from .http import ClientRegistry, http_clients
 
 __all__ = [
     "FedExConnector",
@@ -8,7 +23,18 @@ __all__ = [
     "UspsConnector",
     "UpcItemDbConnector",
     "BarcodeLookupConnector",
+    "AsyncFedExConnector",
+    "AsyncUpsConnector",
+    "AsyncUspsConnector",
+    "AsyncUpcItemDbConnector",
+    "AsyncBarcodeLookupConnector",
+    "CatalogAggregator",
     "ConnectorError",
     "ConnectorEvent",
     "CatalogProduct",
+    "TrackingResult",
+    "TokenCache",
+    "token_cache",
+    "ClientRegistry",
+    "http_clients",
 ]
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+TokenKey = Tuple[str, str]
+# A fetcher returns (access_token, expires_in seconds or None when the provider omits it).
+TokenGrant = Tuple[str, Optional[float]]
+
+
+@dataclass
+class _CachedToken:
+    value: str
+    refresh_at: float  # time.monotonic() after which the token is refreshed
+
+
+class TokenCache:
+    """OAuth access tokens shared per (provider, client_id), refreshed shortly before expiry.
+
+    A token is reused until `refresh_margin_seconds` before its `expires_in`
+    (at most half its lifetime). Refreshes are single-flight per key: the
+    first caller to find the token stale fetches a new one, and every other
+    thread or async task asking for the same key meanwhile waits on that
+    fetch instead of hitting the token endpoint. A failed fetch is raised
+    to all of them and nothing is cached.
+    """
+
+    def __init__(self, refresh_margin_seconds: float = 60.0, default_ttl_seconds: float = 300.0) -> None:
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.default_ttl_seconds = default_ttl_seconds
+
+        self._lock = threading.Lock()
+        self._tokens: Dict[TokenKey, _CachedToken] = {}
+        self._flights: Dict[TokenKey, Future] = {}
+
+        self.hits = 0
+        self.refreshes = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.invalidations = 0
+
+    # -- public API -----------------------------------------------------
+
+    def get(self, provider: str, client_id: str, fetch: Callable[[], TokenGrant]) -> str:
+        """Return a valid access token for the key, calling `fetch` if none is cached."""
+        key = (provider, client_id)
+        token, flight, leader = self._claim(key)
+        if token is not None:
+            return token
+        if not leader:
+            return flight.result()
+        try:
+            grant = fetch()
+        except BaseException as exc:
+            self._fail(key, flight, exc)
+            raise
+        return self._store(key, flight, grant)
+
+    async def get_async(
+        self, provider: str, client_id: str, fetch: Callable[[], Awaitable[TokenGrant]]
+    ) -> str:
+        """get with an async `fetch`; waiting never blocks the event loop."""
+        key = (provider, client_id)
+        token, flight, leader = self._claim(key)
+        if token is not None:
+            return token
+        if not leader:
+            return await asyncio.wrap_future(flight)
+        try:
+            grant = await fetch()
+        except BaseException as exc:
+            self._fail(key, flight, exc)
+            raise
+        return self._store(key, flight, grant)
+
+    def invalidate(self, provider: str, client_id: str) -> None:
+        """Forget the cached token for a key, e.g. after the provider rejected it."""
+        with self._lock:
+            if self._tokens.pop((provider, client_id), None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "tokens": len(self._tokens),
+                "in_flight": len(self._flights),
+                "hits": self.hits,
+                "refreshes": self.refreshes,
+                "coalesced": self.coalesced,
+                "failures": self.failures,
+                "invalidations": self.invalidations,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+    # -- internals ------------------------------------------------------
+
+    def _claim(self, key: TokenKey) -> Tuple[Optional[str], Optional[Future], bool]:
+        # (cached token, in-flight refresh, whether this caller leads it)
+        with self._lock:
+            token = self._tokens.get(key)
+            if token is not None and time.monotonic() < token.refresh_at:
+                self.hits += 1
+                return token.value, None, False
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return None, flight, False
+            flight = self._flights[key] = Future()
+            self.refreshes += 1
+            return None, flight, True
+
+    def _store(self, key: TokenKey, flight: Future, grant: TokenGrant) -> str:
+        value, expires_in = grant
+        lifetime = float(expires_in) if expires_in else self.default_ttl_seconds
+        refresh_at = time.monotonic() + lifetime - min(self.refresh_margin_seconds, lifetime / 2)
+        with self._lock:
+            self._tokens[key] = _CachedToken(value, refresh_at)
+            del self._flights[key]
+        flight.set_result(value)
+        return value
+
+    def _fail(self, key: TokenKey, flight: Future, exc: BaseException) -> None:
+        with self._lock:
+            self.failures += 1
+            del self._flights[key]
+        flight.set_exception(exc)
+
+
+token_cache = TokenCache(refresh_margin_seconds=settings.oauth_token_refresh_margin_seconds)
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 
 class ConnectorError(Exception):
@@ -16,6 +16,16 @@ class ConnectorEvent:
     provider: str
     location: Optional[str]
     payload: Dict[str, Any]
+    timestamped: bool = True  # False when observed_at is the poll time, not the carrier's
+
+
+@dataclass
+class TrackingResult:
+    """Outcome of one tracking number in a track_many call."""
+
+    tracking_number: str
+    events: List[ConnectorEvent] = field(default_factory=list)
+    error: Optional[str] = None
 
 
 @dataclass
@@ -25,3 +35,9 @@ class CatalogProduct:
     brand: Optional[str]
     identifiers: Dict[str, str]
     raw: Dict[str, Any]
+    sources: List[str] = field(default_factory=list)  # providers that answered, set by CatalogAggregator
+
+    @property
+    def found(self) -> bool:
+        """Whether the provider knew the identifier (a title or any identifier came back)."""
+        return bool(self.title or self.identifiers)
@@ -1,70 +1,202 @@
 from __future__ import annotations
 
-from typing import Dict, Optional
+import asyncio
+from typing import Awaitable, Dict, List, Optional, Protocol, Tuple
 
 import httpx
 
 from app.connectors.base import CatalogProduct, ConnectorError
+from app.connectors.http import http_clients
 from app.core.config import settings
 
-DEFAULT_TIMEOUT = httpx.Timeout(30.0)
+
+# -- UPCItemDB ----------------------------------------------------------
+
+
+def _upcitemdb_base_url() -> str:
+    if not settings.upcitemdb_api_key:
+        raise ConnectorError("UPCItemDB API key missing")
+    return settings.upcitemdb_base_url.rstrip("/")
+
+
+def _upcitemdb_product(resp: httpx.Response) -> CatalogProduct:
+    if resp.status_code != 200:
+        raise ConnectorError(f"UPCItemDB lookup failed: {resp.text}")
+    data = resp.json()
+    item = (data.get("items") or [{}])[0]
+    identifiers: Dict[str, str] = {}
+    if upc := item.get("upc"):
+        identifiers["upc"] = upc
+    if ean := item.get("ean"):
+        identifiers["ean"] = ean
+    return CatalogProduct(
+        title=item.get("title"),
+        description=item.get("description"),
+        brand=item.get("brand"),
+        identifiers=identifiers,
+        raw=item,
+    )
 
 
 class UpcItemDbConnector:
     def __init__(self) -> None:
-        if not settings.upcitemdb_api_key:
-            raise ConnectorError("UPCItemDB API key missing")
-        self.base_url = settings.upcitemdb_base_url.rstrip("/")
+        self.base_url = _upcitemdb_base_url()
+        self.http = http_clients.client(self.base_url)
 
     def lookup(self, identifier: str) -> CatalogProduct:
-        headers = {"user_key": settings.upcitemdb_api_key}
-        resp = httpx.get(
+        resp = self.http.get(
             f"{self.base_url}/prod/trial/lookup",
             params={"upc": identifier},
-            headers=headers,
-            timeout=DEFAULT_TIMEOUT,
+            headers={"user_key": settings.upcitemdb_api_key},
         )
-        if resp.status_code != 200:
-            raise ConnectorError(f"UPCItemDB lookup failed: {resp.text}")
-        data = resp.json()
-        item = (data.get("items") or [{}])[0]
-        identifiers: Dict[str, str] = {}
-        if upc := item.get("upc"):
-            identifiers["upc"] = upc
-        if ean := item.get("ean"):
-            identifiers["ean"] = ean
-        return CatalogProduct(
-            title=item.get("title"),
-            description=item.get("description"),
-            brand=item.get("brand"),
-            identifiers=identifiers,
-            raw=item,
+        return _upcitemdb_product(resp)
+
+
+class AsyncUpcItemDbConnector:
+    """UpcItemDbConnector on the shared AsyncClient; same request and parsing."""
+
+    def __init__(self) -> None:
+        self.base_url = _upcitemdb_base_url()
+        self.http = http_clients.async_client(self.base_url)
+
+    async def lookup(self, identifier: str) -> CatalogProduct:
+        resp = await self.http.get(
+            f"{self.base_url}/prod/trial/lookup",
+            params={"upc": identifier},
+            headers={"user_key": settings.upcitemdb_api_key},
         )
+        return _upcitemdb_product(resp)
+
+
+# -- Barcode Lookup -----------------------------------------------------
+
+
+def _barcode_lookup_base_url() -> str:
+    if not settings.barcode_lookup_api_key:
+        raise ConnectorError("Barcode Lookup API key missing")
+    return settings.barcode_lookup_base_url.rstrip("/")
+
+
+def _barcode_lookup_params(identifier: str) -> dict:
+    return {"barcode": identifier, "key": settings.barcode_lookup_api_key, "formatted": "y"}
+
+
+def _barcode_lookup_product(resp: httpx.Response) -> CatalogProduct:
+    if resp.status_code != 200:
+        raise ConnectorError(f"Barcode Lookup failed: {resp.text}")
+    data = resp.json()
+    product = (data.get("products") or [{}])[0]
+    identifiers: Dict[str, str] = {}
+    if barcode := product.get("barcode_number"):
+        identifiers["barcode"] = barcode
+    return CatalogProduct(
+        title=product.get("product_name"),
+        description=product.get("description"),
+        brand=product.get("brand"),
+        identifiers=identifiers,
+        raw=product,
+    )
 
 
 class BarcodeLookupConnector:
     def __init__(self) -> None:
-        if not settings.barcode_lookup_api_key:
-            raise ConnectorError("Barcode Lookup API key missing")
-        self.base_url = settings.barcode_lookup_base_url.rstrip("/")
+        self.base_url = _barcode_lookup_base_url()
+        self.http = http_clients.client(self.base_url)
 
     def lookup(self, identifier: str) -> CatalogProduct:
-        resp = httpx.get(
-            f"{self.base_url}/products",
-            params={"barcode": identifier, "key": settings.barcode_lookup_api_key, "formatted": "y"},
-            timeout=DEFAULT_TIMEOUT,
-        )
-        if resp.status_code != 200:
-            raise ConnectorError(f"Barcode Lookup failed: {resp.text}")
-        data = resp.json()
-        product = (data.get("products") or [{}])[0]
-        identifiers: Dict[str, str] = {}
-        if barcode := product.get("barcode_number"):
-            identifiers["barcode"] = barcode
-        return CatalogProduct(
-            title=product.get("product_name"),
-            description=product.get("description"),
-            brand=product.get("brand"),
-            identifiers=identifiers,
-            raw=product,
-        )
+        resp = self.http.get(f"{self.base_url}/products", params=_barcode_lookup_params(identifier))
+        return _barcode_lookup_product(resp)
+
+
+class AsyncBarcodeLookupConnector:
+    """BarcodeLookupConnector on the shared AsyncClient; same request and parsing."""
+
+    def __init__(self) -> None:
+        self.base_url = _barcode_lookup_base_url()
+        self.http = http_clients.async_client(self.base_url)
+
+    async def lookup(self, identifier: str) -> CatalogProduct:
+        resp = await self.http.get(f"{self.base_url}/products", params=_barcode_lookup_params(identifier))
+        return _barcode_lookup_product(resp)
+
+
+# -- aggregation --------------------------------------------------------
+
+
+class AsyncCatalogConnector(Protocol):
+    def lookup(self, identifier: str) -> Awaitable[CatalogProduct]: ...
+
+
+def _merge(answers: List[Tuple[str, CatalogProduct]]) -> CatalogProduct:
+    # Earlier providers win field by field; identifiers are unioned.
+    identifiers: Dict[str, str] = {}
+    for _, product in answers:
+        for kind, value in product.identifiers.items():
+            identifiers.setdefault(kind, value)
+    return CatalogProduct(
+        title=next((product.title for _, product in answers if product.title), None),
+        description=next((product.description for _, product in answers if product.description), None),
+        brand=next((product.brand for _, product in answers if product.brand), None),
+        identifiers=identifiers,
+        raw={name: product.raw for name, product in answers},
+        sources=[name for name, _ in answers],
+    )
+
+
+class CatalogAggregator:
+    """Queries several catalog providers concurrently for one identifier.
+
+    `connectors` maps provider name to an async connector, in priority
+    order. With strategy "first" the first good answer (a title or any
+    identifier) is returned and the outstanding lookups are cancelled;
+    with "merge" every answer within `timeout` is combined, earlier
+    providers winning per field. A provider that fails or times out is
+    skipped; ConnectorError is raised only when none answered.
+    """
+
+    def __init__(self, connectors: Dict[str, AsyncCatalogConnector], timeout: Optional[float] = None) -> None:
+        self.connectors = connectors
+        self.timeout = timeout
+
+    async def lookup(self, identifier: str, strategy: str = "first") -> CatalogProduct:
+        if not self.connectors:
+            raise ConnectorError("No catalog providers are configured")
+        tasks = {
+            asyncio.ensure_future(connector.lookup(identifier)): name for name, connector in self.connectors.items()
+        }
+        order = list(self.connectors)
+        answers: List[Tuple[str, CatalogProduct]] = []
+        errors: List[str] = []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout if self.timeout is not None else None
+        pending = set(tasks)
+        try:
+            while pending:
+                remaining = max(0.0, deadline - loop.time()) if deadline is not None else None
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    errors.extend(f"{tasks[task]}: timed out" for task in pending)
+                    break
+                for task in sorted(done, key=lambda task: order.index(tasks[task])):
+                    if task.exception() is not None:
+                        errors.append(f"{tasks[task]}: {task.exception()}")
+                        continue
+                    product = task.result()
+                    if strategy == "first" and product.found:
+                        product.sources = [tasks[task]]
+                        return product
+                    answers.append((tasks[task], product))
+        finally:
+            for task in pending:
+                task.cancel()
+
+        answers.sort(key=lambda answer: order.index(answer[0]))
+        good = [answer for answer in answers if answer[1].found]
+        if strategy == "merge" and good:
+            return _merge(good)
+        if answers:
+            # Nobody had a good answer; return the highest-priority empty one.
+            name, product = answers[0]
+            product.sources = [name]
+            return product
+        raise ConnectorError("; ".join(errors) or "No catalog provider answered")
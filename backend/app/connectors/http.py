@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import os
+import threading
+from typing import Dict, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _origin(base_url: str) -> str:
+    url = httpx.URL(base_url)
+    return f"{url.scheme}://{url.netloc.decode('ascii')}"
+
+
+class ClientRegistry:
+    """Pooled httpx clients shared by the connectors, one per provider origin.
+
+    `client(base_url)` and `async_client(base_url)` return a keep-alive
+    client for the URL's scheme://host:port, created on first use, so every
+    call to a provider reuses warm connections (and TLS sessions) instead of
+    connecting per request. HTTP/2 is negotiated when enabled and the `h2`
+    package is installed. Async clients are bound to the event loop that
+    created them; a call from a different loop gets a fresh client.
+
+    `close()` / `aclose()` release every pool (FastAPI shutdown, RQ worker
+    exit); clients are recreated lazily if used afterwards.
+    """
+
+    def __init__(self, limits: httpx.Limits, timeout: httpx.Timeout, http2: bool = False) -> None:
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested for connectors but the h2 package is missing; using HTTP/1.1")
+            http2 = False
+        self.limits = limits
+        self.timeout = timeout
+        self.http2 = http2
+
+        self._lock = threading.Lock()
+        self._clients: Dict[str, httpx.Client] = {}
+        self._async_clients: Dict[str, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+
+        self.created = 0
+
+    def client(self, base_url: str) -> httpx.Client:
+        origin = _origin(base_url)
+        with self._lock:
+            client = self._clients.get(origin)
+            if client is None or client.is_closed:
+                client = self._clients[origin] = httpx.Client(
+                    limits=self.limits, timeout=self.timeout, http2=self.http2
+                )
+                self.created += 1
+            return client
+
+    def async_client(self, base_url: str) -> httpx.AsyncClient:
+        origin = _origin(base_url)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._async_clients.get(origin)
+            if entry is None or entry[0].is_closed or entry[1] is not loop:
+                # A client from a finished loop cannot be reused or closed from here.
+                entry = self._async_clients[origin] = (
+                    httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http2=self.http2),
+                    loop,
+                )
+                self.created += 1
+            return entry[0]
+
+    def close(self) -> None:
+        """Close the sync clients; async clients are closed by aclose()."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    async def aclose(self) -> None:
+        """Close every client, including async ones owned by the running loop."""
+        self.close()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entries = list(self._async_clients.values())
+            self._async_clients.clear()
+        for client, owner in entries:
+            if owner is loop:
+                await client.aclose()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "clients": sorted(self._clients),
+                "async_clients": sorted(self._async_clients),
+                "created": self.created,
+                "http2": self.http2,
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+            }
+
+    def _forget(self) -> None:
+        # After fork: the child must not share the parent's sockets, and
+        # closing them here would tear down the parent's connections.
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._async_clients = {}
+
+
+http_clients = ClientRegistry(
+    limits=httpx.Limits(
+        max_connections=settings.connector_max_connections,
+        max_keepalive_connections=settings.connector_max_keepalive_connections,
+        keepalive_expiry=settings.connector_keepalive_expiry_seconds,
+    ),
+    timeout=httpx.Timeout(settings.connector_timeout_seconds),
+    http2=settings.connector_http2,
+)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=http_clients._forget)
@@ -1,16 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 from xml.etree import ElementTree
+from xml.sax.saxutils import quoteattr
 
 import httpx
 from dateutil import parser as dateparser
 
-from app.connectors.base import ConnectorError, ConnectorEvent
+from app.connectors.auth import token_cache
+from app.connectors.base import ConnectorError, ConnectorEvent, TrackingResult
+from app.connectors.http import http_clients
 from app.core.config import settings
 
-DEFAULT_TIMEOUT = httpx.Timeout(30.0)
+FEDEX_BATCH_SIZE = 30  # trackingInfo entries per FedEx Track API request
+USPS_BATCH_SIZE = 10  # TrackIDs per USPS TrackV2 request
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 def _parse_timestamp(value: Optional[str]) -> datetime:
@@ -22,131 +31,407 @@ def _parse_timestamp(value: Optional[str]) -> datetime:
         return datetime.utcnow()
 
 
+def _token_grant(resp: httpx.Response, provider: str) -> Tuple[str, Optional[float]]:
+    if resp.status_code != 200:
+        raise ConnectorError(f"{provider} auth failed: {resp.text}")
+    body = resp.json()
+    token = body.get("access_token")
+    if not token:
+        raise ConnectorError(f"{provider} auth returned no access token")
+    expires_in = body.get("expires_in")  # UPS sends it as a string
+    return token, float(expires_in) if expires_in else None
+
+
+def _chunks(items: Sequence[str], size: int) -> List[List[str]]:
+    return [list(items[start:start + size]) for start in range(0, len(items), size)]
+
+
+def _bounded_map(func: Callable[[T], R], items: Sequence[T]) -> List[R]:
+    """func over items with at most connector_batch_concurrency calls in flight, in order."""
+    if len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(settings.connector_batch_concurrency, len(items))) as pool:
+        return list(pool.map(func, items))
+
+
+async def _bounded_gather(func: Callable[[T], Awaitable[R]], items: Sequence[T]) -> List[R]:
+    """Async _bounded_map: func over items, at most connector_batch_concurrency awaiting at once."""
+    semaphore = asyncio.Semaphore(settings.connector_batch_concurrency)
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
+
+
+def _failed(tracking_numbers: List[str], exc: Exception) -> List[TrackingResult]:
+    return [TrackingResult(number, error=str(exc)) for number in tracking_numbers]
+
+
+# -- FedEx --------------------------------------------------------------
+
+
+def _fedex_base_url() -> str:
+    if not settings.fedex_client_id or not settings.fedex_client_secret:
+        raise ConnectorError("FedEx credentials are not configured")
+    return settings.fedex_base_url.rstrip("/")
+
+
+def _fedex_token_form() -> dict:
+    return {
+        "grant_type": "client_credentials",
+        "client_id": settings.fedex_client_id,
+        "client_secret": settings.fedex_client_secret,
+    }
+
+
+def _fedex_track_payload(tracking_numbers: List[str]) -> dict:
+    return {
+        "trackingInfo": [{"trackingNumberInfo": {"trackingNumber": number}} for number in tracking_numbers],
+        "includeDetailedScans": True,
+    }
+
+
+def _fedex_complete_results(resp: httpx.Response) -> List[dict]:
+    if resp.status_code != 200:
+        raise ConnectorError(f"FedEx track failed: {resp.text}")
+    return resp.json().get("output", {}).get("completeTrackResults", [])
+
+
+def _fedex_events(result: dict) -> List[ConnectorEvent]:
+    events: List[ConnectorEvent] = []
+    for track_result in result.get("trackResults", []):
+        for scan_event in track_result.get("scanEvents", []):
+            events.append(
+                ConnectorEvent(
+                    event_type=scan_event.get("eventType", "SCAN"),
+                    observed_at=_parse_timestamp(scan_event.get("date") or scan_event.get("dateTime")),
+                    provider="FedEx",
+                    location=scan_event.get("scanLocation", {}).get("city")
+                    or scan_event.get("scanLocation", {}).get("locationId"),
+                    payload=scan_event,
+                )
+            )
+    return events
+
+
+def _fedex_tracking_results(results: List[dict], tracking_numbers: List[str]) -> List[TrackingResult]:
+    by_number: Dict[str, TrackingResult] = {}
+    for result in results:
+        number = result.get("trackingNumber")
+        tracked = by_number.setdefault(number, TrackingResult(number))
+        tracked.events.extend(_fedex_events(result))
+        errors = [track.get("error") for track in result.get("trackResults", []) if track.get("error")]
+        if errors and not tracked.events:
+            tracked.error = errors[0].get("message") or errors[0].get("code") or "FedEx tracking error"
+    return [
+        by_number.get(number) or TrackingResult(number, error="FedEx returned no result")
+        for number in tracking_numbers
+    ]
+
+
 class FedExConnector:
     def __init__(self) -> None:
-        if not settings.fedex_client_id or not settings.fedex_client_secret:
-            raise ConnectorError("FedEx credentials are not configured")
-        self.base_url = settings.fedex_base_url.rstrip("/")
+        self.base_url = _fedex_base_url()
+        self.http = http_clients.client(self.base_url)
 
     def _fetch_token(self) -> str:
-        data = {
-            "grant_type": "client_credentials",
-            "client_id": settings.fedex_client_id,
-            "client_secret": settings.fedex_client_secret,
-        }
-        resp = httpx.post(f"{self.base_url}/oauth/token", data=data, timeout=DEFAULT_TIMEOUT)
-        if resp.status_code != 200:
-            raise ConnectorError(f"FedEx auth failed: {resp.text}")
-        return resp.json().get("access_token")
+        return token_cache.get("fedex", settings.fedex_client_id, self._request_token)
+
+    def _request_token(self) -> Tuple[str, Optional[float]]:
+        resp = self.http.post(f"{self.base_url}/oauth/token", data=_fedex_token_form())
+        return _token_grant(resp, "FedEx")
 
     def track(self, tracking_number: str) -> List[ConnectorEvent]:
-        token = self._fetch_token()
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {
-            "trackingInfo": [
-                {
-                    "trackingNumberInfo": {
-                        "trackingNumber": tracking_number,
-                    }
-                }
-            ],
-            "includeDetailedScans": True,
-        }
-        resp = httpx.post(
+        results = self._request_tracking([tracking_number])
+        return [event for result in results for event in _fedex_events(result)]
+
+    def track_many(self, tracking_numbers: List[str]) -> List[TrackingResult]:
+        """Track many numbers, FEDEX_BATCH_SIZE per request, requests run concurrently."""
+        batches = _bounded_map(self._track_batch, _chunks(tracking_numbers, FEDEX_BATCH_SIZE))
+        return [result for batch in batches for result in batch]
+
+    def _track_batch(self, tracking_numbers: List[str]) -> List[TrackingResult]:
+        try:
+            results = self._request_tracking(tracking_numbers)
+        except (ConnectorError, httpx.HTTPError, ValueError) as exc:
+            return _failed(tracking_numbers, exc)
+        return _fedex_tracking_results(results, tracking_numbers)
+
+    def _request_tracking(self, tracking_numbers: List[str]) -> List[dict]:
+        payload = _fedex_track_payload(tracking_numbers)
+        resp = self._post_track(payload)
+        if resp.status_code == 401:
+            # Revoked or expired early: drop the cached token and retry once.
+            token_cache.invalidate("fedex", settings.fedex_client_id)
+            resp = self._post_track(payload)
+        return _fedex_complete_results(resp)
+
+    def _post_track(self, payload: dict) -> httpx.Response:
+        return self.http.post(
             f"{self.base_url}/track/v1/trackingnumbers",
             json=payload,
-            headers=headers,
-            timeout=DEFAULT_TIMEOUT,
+            headers={"Authorization": f"Bearer {self._fetch_token()}"},
         )
-        if resp.status_code != 200:
-            raise ConnectorError(f"FedEx track failed: {resp.text}")
-        data = resp.json()
-        events: List[ConnectorEvent] = []
-        results = data.get("output", {}).get("completeTrackResults", [])
-        for result in results:
-            for track_result in result.get("trackResults", []):
-                for scan_event in track_result.get("scanEvents", []):
-                    events.append(
-                        ConnectorEvent(
-                            event_type=scan_event.get("eventType", "SCAN"),
-                            observed_at=_parse_timestamp(scan_event.get("date") or scan_event.get("dateTime")),
-                            provider="FedEx",
-                            location=scan_event.get("scanLocation", {}).get("city")
-                            or scan_event.get("scanLocation", {}).get("locationId"),
-                            payload=scan_event,
-                        )
-                    )
-        return events
+
+
+class AsyncFedExConnector:
+    """FedExConnector on the shared AsyncClient; same requests and parsing."""
+
+    def __init__(self) -> None:
+        self.base_url = _fedex_base_url()
+        self.http = http_clients.async_client(self.base_url)
+
+    async def _fetch_token(self) -> str:
+        return await token_cache.get_async("fedex", settings.fedex_client_id, self._request_token)
+
+    async def _request_token(self) -> Tuple[str, Optional[float]]:
+        resp = await self.http.post(f"{self.base_url}/oauth/token", data=_fedex_token_form())
+        return _token_grant(resp, "FedEx")
+
+    async def track(self, tracking_number: str) -> List[ConnectorEvent]:
+        results = await self._request_tracking([tracking_number])
+        return [event for result in results for event in _fedex_events(result)]
+
+    async def track_many(self, tracking_numbers: List[str]) -> List[TrackingResult]:
+        batches = await _bounded_gather(self._track_batch, _chunks(tracking_numbers, FEDEX_BATCH_SIZE))
+        return [result for batch in batches for result in batch]
+
+    async def _track_batch(self, tracking_numbers: List[str]) -> List[TrackingResult]:
+        try:
+            results = await self._request_tracking(tracking_numbers)
+        except (ConnectorError, httpx.HTTPError, ValueError) as exc:
+            return _failed(tracking_numbers, exc)
+        return _fedex_tracking_results(results, tracking_numbers)
+
+    async def _request_tracking(self, tracking_numbers: List[str]) -> List[dict]:
+        payload = _fedex_track_payload(tracking_numbers)
+        resp = await self._post_track(payload)
+        if resp.status_code == 401:
+            token_cache.invalidate("fedex", settings.fedex_client_id)
+            resp = await self._post_track(payload)
+        return _fedex_complete_results(resp)
+
+    async def _post_track(self, payload: dict) -> httpx.Response:
+        return await self.http.post(
+            f"{self.base_url}/track/v1/trackingnumbers",
+            json=payload,
+            headers={"Authorization": f"Bearer {await self._fetch_token()}"},
+        )
+
+
+# -- UPS ----------------------------------------------------------------
+
+
+def _ups_base_url() -> str:
+    if not settings.ups_client_id or not settings.ups_client_secret:
+        raise ConnectorError("UPS credentials are not configured")
+    return settings.ups_base_url.rstrip("/")
+
+
+def _ups_token_form() -> dict:
+    return {
+        "grant_type": "client_credentials",
+        "client_id": settings.ups_client_id,
+        "client_secret": settings.ups_client_secret,
+    }
+
+
+def _ups_headers(token: str, tracking_number: str) -> dict:
+    return {"Authorization": f"Bearer {token}", "transId": tracking_number, "transactionSrc": "sku-tracker"}
+
+
+def _ups_events(resp: httpx.Response) -> List[ConnectorEvent]:
+    if resp.status_code != 200:
+        raise ConnectorError(f"UPS track failed: {resp.text}")
+    data = resp.json()
+    activities = data.get("trackResponse", {}).get("shipment", [{}])[0].get("package", [{}])[0].get("activity", [])
+    events: List[ConnectorEvent] = []
+    for act in activities:
+        location = act.get("location", {}).get("address", {})
+        city = location.get("city")
+        events.append(
+            ConnectorEvent(
+                event_type=act.get("status", {}).get("type", "ACTIVITY"),
+                observed_at=_parse_timestamp(act.get("dateTime")),
+                provider="UPS",
+                location=city,
+                payload=act,
+            )
+        )
+    return events
 
 
 class UpsConnector:
     def __init__(self) -> None:
-        if not settings.ups_client_id or not settings.ups_client_secret:
-            raise ConnectorError("UPS credentials are not configured")
-        self.base_url = settings.ups_base_url.rstrip("/")
+        self.base_url = _ups_base_url()
+        self.http = http_clients.client(self.base_url)
 
     def _fetch_token(self) -> str:
-        data = {
-            "grant_type": "client_credentials",
-            "client_id": settings.ups_client_id,
-            "client_secret": settings.ups_client_secret,
-        }
-        resp = httpx.post(f"{self.base_url}/security/v1/oauth/token", data=data, timeout=DEFAULT_TIMEOUT)
-        if resp.status_code != 200:
-            raise ConnectorError(f"UPS auth failed: {resp.text}")
-        return resp.json().get("access_token")
+        return token_cache.get("ups", settings.ups_client_id, self._request_token)
+
+    def _request_token(self) -> Tuple[str, Optional[float]]:
+        resp = self.http.post(f"{self.base_url}/security/v1/oauth/token", data=_ups_token_form())
+        return _token_grant(resp, "UPS")
 
     def track(self, tracking_number: str) -> List[ConnectorEvent]:
-        token = self._fetch_token()
-        headers = {"Authorization": f"Bearer {token}", "transId": tracking_number, "transactionSrc": "sku-tracker"}
-        resp = httpx.get(
+        resp = self._get_details(tracking_number)
+        if resp.status_code == 401:
+            token_cache.invalidate("ups", settings.ups_client_id)
+            resp = self._get_details(tracking_number)
+        return _ups_events(resp)
+
+    def track_many(self, tracking_numbers: List[str]) -> List[TrackingResult]:
+        """Track many numbers; UPS has no batch endpoint, so one request each, run concurrently."""
+        return _bounded_map(self._track_one, tracking_numbers)
+
+    def _track_one(self, tracking_number: str) -> TrackingResult:
+        try:
+            return TrackingResult(tracking_number, events=self.track(tracking_number))
+        except (ConnectorError, httpx.HTTPError, ValueError) as exc:
+            return TrackingResult(tracking_number, error=str(exc))
+
+    def _get_details(self, tracking_number: str) -> httpx.Response:
+        return self.http.get(
             f"{self.base_url}/api/track/v1/details/{tracking_number}",
-            headers=headers,
-            timeout=DEFAULT_TIMEOUT,
+            headers=_ups_headers(self._fetch_token(), tracking_number),
         )
-        if resp.status_code != 200:
-            raise ConnectorError(f"UPS track failed: {resp.text}")
-        data = resp.json()
-        activities = data.get("trackResponse", {}).get("shipment", [{}])[0].get("package", [{}])[0].get("activity", [])
-        events: List[ConnectorEvent] = []
-        for act in activities:
-            location = act.get("location", {}).get("address", {})
-            city = location.get("city")
-            events.append(
-                ConnectorEvent(
-                    event_type=act.get("status", {}).get("type", "ACTIVITY"),
-                    observed_at=_parse_timestamp(act.get("dateTime")),
-                    provider="UPS",
-                    location=city,
-                    payload=act,
-                )
+
+
+class AsyncUpsConnector:
+    """UpsConnector on the shared AsyncClient; same requests and parsing."""
+
+    def __init__(self) -> None:
+        self.base_url = _ups_base_url()
+        self.http = http_clients.async_client(self.base_url)
+
+    async def _fetch_token(self) -> str:
+        return await token_cache.get_async("ups", settings.ups_client_id, self._request_token)
+
+    async def _request_token(self) -> Tuple[str, Optional[float]]:
+        resp = await self.http.post(f"{self.base_url}/security/v1/oauth/token", data=_ups_token_form())
+        return _token_grant(resp, "UPS")
+
+    async def track(self, tracking_number: str) -> List[ConnectorEvent]:
+        resp = await self._get_details(tracking_number)
+        if resp.status_code == 401:
+            token_cache.invalidate("ups", settings.ups_client_id)
+            resp = await self._get_details(tracking_number)
+        return _ups_events(resp)
+
+    async def track_many(self, tracking_numbers: List[str]) -> List[TrackingResult]:
+        return await _bounded_gather(self._track_one, tracking_numbers)
+
+    async def _track_one(self, tracking_number: str) -> TrackingResult:
+        try:
+            return TrackingResult(tracking_number, events=await self.track(tracking_number))
+        except (ConnectorError, httpx.HTTPError, ValueError) as exc:
+            return TrackingResult(tracking_number, error=str(exc))
+
+    async def _get_details(self, tracking_number: str) -> httpx.Response:
+        return await self.http.get(
+            f"{self.base_url}/api/track/v1/details/{tracking_number}",
+            headers=_ups_headers(await self._fetch_token(), tracking_number),
+        )
+
+
+# -- USPS ---------------------------------------------------------------
+
+
+def _usps_base_url() -> str:
+    if not settings.usps_user_id:
+        raise ConnectorError("USPS USERID is not configured")
+    return settings.usps_base_url
+
+
+def _usps_params(tracking_numbers: List[str]) -> dict:
+    track_ids = "".join(f"<TrackID ID={quoteattr(number)}></TrackID>" for number in tracking_numbers)
+    xml = f"<TrackRequest USERID={quoteattr(settings.usps_user_id)}>{track_ids}</TrackRequest>"
+    return {"API": "TrackV2", "XML": xml}
+
+
+def _usps_root(resp: httpx.Response) -> ElementTree.Element:
+    if resp.status_code != 200:
+        raise ConnectorError(f"USPS track failed: {resp.text}")
+    return ElementTree.fromstring(resp.text)
+
+
+def _usps_events(element: ElementTree.Element) -> List[ConnectorEvent]:
+    events: List[ConnectorEvent] = []
+    for event in element.findall(".//TrackDetail"):
+        text = event.text or ""
+        events.append(
+            ConnectorEvent(
+                event_type="USPS_EVENT",
+                observed_at=_parse_timestamp(None),  # USPS details often omit timestamps
+                provider="USPS",
+                location=None,
+                payload={"detail": text},
+                timestamped=False,
             )
-        return events
+        )
+    return events
+
+
+def _usps_tracking_results(root: ElementTree.Element, tracking_numbers: List[str]) -> List[TrackingResult]:
+    if root.tag == "Error":
+        error = root.findtext("Description") or "USPS track failed"
+        return [TrackingResult(number, error=error) for number in tracking_numbers]
+    by_number: Dict[str, TrackingResult] = {}
+    for info in root.findall("TrackInfo"):
+        number = info.get("ID")
+        by_number[number] = TrackingResult(number, events=_usps_events(info), error=info.findtext("Error/Description"))
+    return [
+        by_number.get(number) or TrackingResult(number, error="USPS returned no result")
+        for number in tracking_numbers
+    ]
 
 
 class UspsConnector:
     def __init__(self) -> None:
-        if not settings.usps_user_id:
-            raise ConnectorError("USPS USERID is not configured")
-        self.base_url = settings.usps_base_url
+        self.base_url = _usps_base_url()
+        self.http = http_clients.client(self.base_url)
 
     def track(self, tracking_number: str) -> List[ConnectorEvent]:
-        xml = f"""<TrackRequest USERID=\"{settings.usps_user_id}\"><TrackID ID=\"{tracking_number}\"></TrackID></TrackRequest>"""
-        params = {"API": "TrackV2", "XML": xml}
-        resp = httpx.get(self.base_url, params=params, timeout=DEFAULT_TIMEOUT)
-        if resp.status_code != 200:
-            raise ConnectorError(f"USPS track failed: {resp.text}")
-        root = ElementTree.fromstring(resp.text)
-        events: List[ConnectorEvent] = []
-        for event in root.findall(".//TrackDetail"):
-            text = event.text or ""
-            events.append(
-                ConnectorEvent(
-                    event_type="USPS_EVENT",
-                    observed_at=_parse_timestamp(None),  # USPS details often omit timestamps
-                    provider="USPS",
-                    location=None,
-                    payload={"detail": text},
-                )
-            )
-        return events
+        return _usps_events(self._request_tracking([tracking_number]))
+
+    def track_many(self, tracking_numbers: List[str]) -> List[TrackingResult]:
+        """Track many numbers, USPS_BATCH_SIZE TrackIDs per request, requests run concurrently."""
+        batches = _bounded_map(self._track_batch, _chunks(tracking_numbers, USPS_BATCH_SIZE))
+        return [result for batch in batches for result in batch]
+
+    def _track_batch(self, tracking_numbers: List[str]) -> List[TrackingResult]:
+        try:
+            root = self._request_tracking(tracking_numbers)
+        except (ConnectorError, httpx.HTTPError, ElementTree.ParseError) as exc:
+            return _failed(tracking_numbers, exc)
+        return _usps_tracking_results(root, tracking_numbers)
+
+    def _request_tracking(self, tracking_numbers: List[str]) -> ElementTree.Element:
+        return _usps_root(self.http.get(self.base_url, params=_usps_params(tracking_numbers)))
+
+
+class AsyncUspsConnector:
+    """UspsConnector on the shared AsyncClient; same requests and parsing."""
+
+    def __init__(self) -> None:
+        self.base_url = _usps_base_url()
+        self.http = http_clients.async_client(self.base_url)
+
+    async def track(self, tracking_number: str) -> List[ConnectorEvent]:
+        return _usps_events(await self._request_tracking([tracking_number]))
+
+    async def track_many(self, tracking_numbers: List[str]) -> List[TrackingResult]:
+        batches = await _bounded_gather(self._track_batch, _chunks(tracking_numbers, USPS_BATCH_SIZE))
+        return [result for batch in batches for result in batch]
+
+    async def _track_batch(self, tracking_numbers: List[str]) -> List[TrackingResult]:
+        try:
+            root = await self._request_tracking(tracking_numbers)
+        except (ConnectorError, httpx.HTTPError, ElementTree.ParseError) as exc:
+            return _failed(tracking_numbers, exc)
+        return _usps_tracking_results(root, tracking_numbers)
+
+    async def _request_tracking(self, tracking_numbers: List[str]) -> ElementTree.Element:
+        return _usps_root(await self.http.get(self.base_url, params=_usps_params(tracking_numbers)))
@@ -14,6 +14,9 @@ class Settings(BaseSettings):
     api_v1_prefix: str = "/api/v1"
 
     database_url: str = "postgresql+psycopg://app:app@db:5432/sku_lifecycle"
+    async_database_url: Optional[str] = None  # derived from database_url (asyncpg / aiosqlite) when unset
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
     redis_url: str = "redis://redis:6379/0"
     opensearch_host: str = "http://opensearch:9200"
 
@@ -25,6 +28,15 @@ class Settings(BaseSettings):
     ups_client_secret: Optional[str] = None
     ups_base_url: str = "https://onlinetools.ups.com"
 
+    oauth_token_refresh_margin_seconds: float = 60.0  # refresh carrier tokens this long before expiry
+
+    connector_timeout_seconds: float = 30.0
+    connector_max_connections: int = 100  # per provider
+    connector_max_keepalive_connections: int = 20
+    connector_keepalive_expiry_seconds: float = 30.0
+    connector_http2: bool = True  # needs the h2 package (httpx[http2])
+    connector_batch_concurrency: int = 8  # parallel carrier requests per track_many call
+
     usps_user_id: Optional[str] = None
     usps_base_url: str = "https://secure.shippingapis.com/ShippingAPI.dll"
 
@@ -34,6 +46,27 @@ class Settings(BaseSettings):
     barcode_lookup_api_key: Optional[str] = None
     barcode_lookup_base_url: str = "https://api.barcodelookup.com/v3"
 
+    catalog_aggregate_timeout_seconds: float = 10.0  # overall budget for a multi-provider catalog lookup
+    catalog_cache_max_entries: int = 10_000
+    catalog_cache_ttl_seconds: float = 7 * 24 * 3600
+    catalog_cache_negative_ttl_seconds: float = 24 * 3600  # "not found" answers
+    catalog_cache_stale_seconds: float = 7 * 24 * 3600  # serve expired products this long while refreshing
+    catalog_cache_persistent: bool = True  # also keep answers in the catalogcacheentry table
+
+    timeline_cache_max_entries: int = 1024
+    timeline_cache_ttl_seconds: float = 60.0
+    timeline_cache_shared: bool = False  # also cache in Redis at redis_url
+
+    event_partitioning: bool = False  # store SkuEvents in monthly skuevent_YYYYMM tables
+
+    event_dedup_max_skus: int = 10_000  # SKUs whose stored event keys are kept in memory
+
+    resolution_cache_max_entries: int = 100_000
+    resolution_cache_negative_ttl_seconds: float = 30.0  # "not found" is only invalidated in-process
+
+    search_index_enabled: bool = True  # in-process trigram index, built in the background at startup
+    search_index_refresh_seconds: float = 30.0  # index SKUs created by other workers; 0 disables
+
     access_token_expire_minutes: int = 60 * 24
     jwt_secret_key: str = "CHANGE_ME"
     jwt_algorithm: str = "HS256"
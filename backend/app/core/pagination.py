@@ -0,0 +1,23 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(observed_at: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for an (observed_at, id) position."""
+    raw = f"{observed_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises InvalidCursorError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        observed_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(observed_at), int(row_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
@@ -0,0 +1,18 @@
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+
+def dumps(value: Any) -> bytes:
+    """Encode trusted, already JSON-shaped data (dicts, lists, datetimes) with orjson.
+
+    Datetimes are written as ISO 8601 (UTC as "Z"), matching pydantic's JSON
+    output for the same values.
+    """
+    return orjson.dumps(value, option=orjson.OPT_UTC_Z)
+
+
+def json_response(body: bytes, status_code: int = 200) -> Response:
+    """A pre-encoded JSON body, returned as-is (no response_model validation)."""
+    return Response(content=body, status_code=status_code, media_type="application/json")
@@ -1,11 +1,41 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
 
 
-engine = create_engine(settings.database_url, echo=False, pool_pre_ping=True)
+def _async_url(url: str) -> str:
+    """Map the sync DATABASE_URL onto its async driver (asyncpg / aiosqlite)."""
+    scheme, rest = url.split("://", 1)
+    if scheme.startswith("postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+
+def _pool(url: str) -> dict:
+    """Pool sizing for server databases; SQLite picks its own pool class
+    (SingletonThreadPool / StaticPool for in-memory), which rejects these."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {"pool_size": settings.db_pool_size, "max_overflow": settings.db_max_overflow}
+
+
+_async_database_url = settings.async_database_url or _async_url(settings.database_url)
+
+engine = create_engine(settings.database_url, echo=False, pool_pre_ping=True, **_pool(settings.database_url))
+async_engine = create_async_engine(
+    _async_database_url, echo=False, pool_pre_ping=True, **_pool(_async_database_url)
+)
 
 
 def init_db() -> None:
     """Create database tables."""
     SQLModel.metadata.create_all(bind=engine)
+
+
+def get_async_session() -> AsyncSession:
+    return AsyncSession(async_engine, expire_on_commit=False)
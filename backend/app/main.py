@@ -1,15 +1,30 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.api import api_router
+from app.connectors.http import http_clients
 from app.core.config import settings
-from app.db.session import init_db
+from app.db.session import engine, init_db
+from app.services.search_index import search_index
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # The search index builds in the background; searches use the database until it is ready.
+    if settings.search_index_enabled:
+        search_index.start(engine, settings.search_index_refresh_seconds)
+    # Connector clients are created on first use; release their pools on shutdown.
+    yield
+    search_index.stop()
+    await http_clients.aclose()
 
 
 def get_application() -> FastAPI:
     init_db()
 
-    app = FastAPI(title=settings.project_name)
+    app = FastAPI(title=settings.project_name, lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -1,3 +1,4 @@
 from .sku import Sku, SkuIdentity, SkuEvent
+from .catalog import CatalogCacheEntry
 
-__all__ = ["Sku", "SkuIdentity", "SkuEvent"]
+__all__ = ["Sku", "SkuIdentity", "SkuEvent", "CatalogCacheEntry"]
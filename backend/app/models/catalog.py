@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, JSON
+from sqlmodel import Field, SQLModel
+
+
+class CatalogCacheEntry(SQLModel, table=True):
+    """Persistent tier of the catalog lookup cache, one row per provider + normalized identifier."""
+
+    provider: str = Field(primary_key=True)
+    identifier: str = Field(primary_key=True)
+    # CatalogProduct fields; NULL records a "not found" answer.
+    product: Optional[dict] = Field(default=None, sa_column=Column(JSON, nullable=True))
+    fetched_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
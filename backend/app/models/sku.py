@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, Index, JSON
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -18,7 +18,18 @@ class SkuBase(SQLModel):
 
 
 class Sku(SkuBase, Timestamped, table=True):
+    # Listing by current status / location is an index lookup.
+    __table_args__ = (
+        Index("ix_sku_current_status", "current_status", "id"),
+        Index("ix_sku_last_location", "last_location", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
+    # Materialized from the newest SkuEvent by (observed_at, insertion order);
+    # maintained by the tracking service as events are recorded.
+    current_status: Optional[str] = Field(default=None)
+    last_location: Optional[str] = Field(default=None)
+    last_observed_at: Optional[datetime] = Field(default=None)
     identities: list["SkuIdentity"] = Relationship(back_populates="sku")
     events: list["SkuEvent"] = Relationship(back_populates="sku")
 
@@ -32,6 +43,9 @@ class SkuIdentityBase(SQLModel):
 class SkuIdentity(SkuIdentityBase, Timestamped, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     sku_id: int = Field(foreign_key="sku.id", index=True)
+    # Normalized form of (provider, identifier), see services.resolution.resolution_key;
+    # POST /skus/resolve looks identities up by it.
+    resolution_key: Optional[str] = Field(default=None, index=True)
     sku: Optional[Sku] = Relationship(back_populates="identities")
 
 
@@ -49,6 +63,14 @@ class SkuEventBase(SQLModel):
 
 
 class SkuEvent(SkuEventBase, Timestamped, table=True):
+    __table_args__ = (
+        # Serves timeline reads: one SKU, newest first, keyset on (observed_at, id).
+        Index("ix_skuevent_sku_id_observed_at", "sku_id", "observed_at", "id"),
+        # Re-polled carrier history is skipped on insert; NULL keys never collide.
+        Index("ux_skuevent_sku_id_content_key", "sku_id", "content_key", unique=True),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     sku_id: int = Field(foreign_key="sku.id", index=True)
+    content_key: Optional[str] = Field(default=None)
     sku: Optional[Sku] = Relationship(back_populates="events")
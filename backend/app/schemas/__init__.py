@@ -6,11 +6,21 @@ from .sku import (
     SkuEventCreate,
     SkuEventRead,
     TimelineResponse,
+    BulkEventError,
+    BulkEventResponse,
+    IdentifierRef,
+    ResolveRequest,
+    ResolvedIdentifier,
+    ResolveResponse,
 )
 from .connector import (
     TrackShipmentRequest,
     TrackShipmentResponse,
+    TrackBatchRequest,
+    TrackBatchResult,
+    TrackBatchResponse,
     CatalogLookupRequest,
+    CatalogAggregateRequest,
     CatalogLookupResponse,
 )
 
@@ -22,8 +32,18 @@ __all__ = [
     "SkuEventCreate",
     "SkuEventRead",
     "TimelineResponse",
+    "BulkEventError",
+    "BulkEventResponse",
+    "IdentifierRef",
+    "ResolveRequest",
+    "ResolvedIdentifier",
+    "ResolveResponse",
     "TrackShipmentRequest",
     "TrackShipmentResponse",
+    "TrackBatchRequest",
+    "TrackBatchResult",
+    "TrackBatchResponse",
     "CatalogLookupRequest",
+    "CatalogAggregateRequest",
     "CatalogLookupResponse",
 ]
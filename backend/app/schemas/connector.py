@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.schemas.sku import SkuEventRead
 
@@ -17,7 +17,30 @@ class TrackShipmentRequest(BaseModel):
 
 
 class TrackShipmentResponse(BaseModel):
-    events: List[SkuEventRead]
+    events: List[SkuEventRead]  # newly stored events only
+    new: int = 0
+    duplicates: int = 0
+
+
+class TrackBatchRequest(BaseModel):
+    shipments: List[TrackShipmentRequest] = Field(max_length=5_000)
+
+
+class TrackBatchResult(BaseModel):
+    sku_id: int
+    tracking_number: str
+    provider: ShipmentProvider
+    events: List[SkuEventRead] = []  # newly stored events only
+    new: int = 0
+    duplicates: int = 0
+    error: Optional[str] = None
+
+
+class TrackBatchResponse(BaseModel):
+    results: List[TrackBatchResult]
+    new: int
+    duplicates: int
+    failed: int
 
 
 class CatalogLookupRequest(BaseModel):
@@ -25,9 +48,16 @@ class CatalogLookupRequest(BaseModel):
     provider: CatalogProvider
 
 
+class CatalogAggregateRequest(BaseModel):
+    identifier: str
+    providers: List[CatalogProvider] = ["upcitemdb", "barcodelookup"]  # priority order
+    strategy: Literal["first", "merge"] = "first"
+
+
 class CatalogLookupResponse(BaseModel):
     title: Optional[str]
     description: Optional[str]
     brand: Optional[str]
     identifiers: dict
     raw: dict
+    sources: List[str] = []
@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 
 
 class SkuIdentityCreate(BaseModel):
@@ -15,6 +15,9 @@ class SkuIdentityRead(SkuIdentityCreate):
     created_at: datetime
     updated_at: datetime
 
+    class Config:
+        from_attributes = True
+
 
 class SkuCreate(BaseModel):
     canonical_sku: str
@@ -31,6 +34,9 @@ class SkuRead(BaseModel):
     description: Optional[str]
     brand: Optional[str]
     identities: List[SkuIdentityRead]
+    current_status: Optional[str] = None
+    last_location: Optional[str] = None
+    last_observed_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -45,6 +51,15 @@ class SkuEventCreate(BaseModel):
     raw_payload: Optional[dict] = None
     observed_at: Optional[datetime] = None
     confidence: float = 1.0
+    content_key: Optional[str] = None  # events with the same key for a SKU are stored once
+
+    @field_validator("observed_at")
+    @classmethod
+    def naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # Stored and compared as naive UTC, like the utcnow() defaults.
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
 
 
 class SkuEventRead(SkuEventCreate):
@@ -61,3 +76,37 @@ class TimelineResponse(BaseModel):
     events: List[SkuEventRead]
     inferred_status: str
     last_known_location: Optional[str]
+    next_cursor: Optional[str] = None
+
+
+class BulkEventError(BaseModel):
+    index: int
+    error: str
+
+
+class BulkEventResponse(BaseModel):
+    accepted: int
+    duplicates: int = 0
+    rejected: int
+    errors: List[BulkEventError]
+
+
+class IdentifierRef(BaseModel):
+    provider: str
+    identifier: str
+
+
+class ResolveRequest(BaseModel):
+    identifiers: List[IdentifierRef] = Field(max_length=10_000)
+
+
+class ResolvedIdentifier(IdentifierRef):
+    key: str
+    sku_ids: List[int]
+    sku_id: Optional[int] = None  # set when the identifier maps to exactly one SKU
+
+
+class ResolveResponse(BaseModel):
+    results: List[ResolvedIdentifier]
+    resolved: int
+    unresolved: int
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TimelineCache:
+    """Two-tier cache for encoded timeline response bodies, keyed by SKU + query.
+
+    The in-process tier is an LRU bounded by `max_entries` with a per-entry
+    TTL. The optional shared tier is any client exposing the redis-py
+    `get`/`set(ex=)`/`incr` calls (a real Redis, or a local stand-in such as
+    fakeredis), so cached pages survive restarts and are shared by workers.
+
+    Invalidation is per SKU and version based: `invalidate(sku_id)` bumps the
+    SKU's version, which makes every cached page for that SKU (in both tiers
+    and in every process sharing the Redis) unreachable. A load that raced
+    with an invalidation is not stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 60.0,
+        shared: Any = None,
+        namespace: str = "timeline",
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self.namespace = namespace
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[int, Hashable], Tuple[float, tuple, bytes]]" = OrderedDict()
+        self._keys_by_sku: Dict[int, Set[Tuple[int, Hashable]]] = {}
+        # Local invalidation sequence per SKU. SKUs pruned from this map fall
+        # back to `_floor`, which only grows, so in-flight loads stay safe.
+        self._versions: "OrderedDict[int, int]" = OrderedDict()
+        self._seq = 0
+        self._floor = 0
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.shared_errors = 0
+
+    # -- public API -----------------------------------------------------
+
+    def get_or_load(self, sku_id: int, params: Hashable, loader: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """Return the cached value for (sku_id, params), calling `loader` on a miss.
+
+        `loader` returns the encoded JSON body, or None for "not found"
+        (which is never cached). Bodies are stored and returned as-is, so a
+        hit costs no decoding or re-encoding.
+        """
+        key = (sku_id, params)
+        version = self._version(sku_id)
+        value = self._get_local(key, version)
+        if value is not None:
+            return value
+
+        value = self._shared_get(sku_id, version, params)
+        if value is not None:
+            self._shared_hit(key, version, value)
+            return value
+
+        with self._lock:
+            self.misses += 1
+        value = loader()
+        if value is not None and self._version(sku_id) == version:
+            self._store_local(key, version, value)
+            self._shared_set(sku_id, version, params, value)
+        return value
+
+    async def get_or_load_async(
+        self, sku_id: int, params: Hashable, loader: Callable[[], Awaitable[Optional[bytes]]]
+    ) -> Optional[bytes]:
+        """get_or_load with an async `loader`; shared-tier calls run in a worker thread."""
+        key = (sku_id, params)
+        version = await self._off_loop(self._version, sku_id)
+        value = self._get_local(key, version)
+        if value is not None:
+            return value
+
+        value = await self._off_loop(self._shared_get, sku_id, version, params)
+        if value is not None:
+            self._shared_hit(key, version, value)
+            return value
+
+        with self._lock:
+            self.misses += 1
+        value = await loader()
+        if value is not None and await self._off_loop(self._version, sku_id) == version:
+            self._store_local(key, version, value)
+            await self._off_loop(self._shared_set, sku_id, version, params, value)
+        return value
+
+    def invalidate(self, sku_id: int) -> None:
+        """Drop every cached page for a SKU, locally and in the shared tier."""
+        with self._lock:
+            self.invalidations += 1
+            self._seq += 1
+            self._versions[sku_id] = self._seq
+            self._versions.move_to_end(sku_id)
+            while len(self._versions) > self.max_entries * 4:
+                _, pruned = self._versions.popitem(last=False)
+                self._floor = max(self._floor, pruned)
+            for key in list(self._keys_by_sku.get(sku_id, ())):
+                self._drop(key)
+
+        if self.shared is not None:
+            try:
+                self.shared.incr(self._version_key(sku_id))
+            except Exception:
+                self._shared_failed("incr")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "shared_errors": self.shared_errors,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_sku.clear()
+
+    # -- internals ------------------------------------------------------
+
+    def _get_local(self, key: Tuple[int, Hashable], version: tuple) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, entry_version, value = entry
+            if entry_version == version and expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self._drop(key)
+            return None
+
+    def _shared_hit(self, key: Tuple[int, Hashable], version: tuple, value: bytes) -> None:
+        with self._lock:
+            self.shared_hits += 1
+        self._store_local(key, version, value)
+
+    async def _off_loop(self, func: Callable[..., Any], *args: Any) -> Any:
+        # Only the shared tier does network I/O; the local tier is called inline.
+        if self.shared is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    def _version(self, sku_id: int) -> tuple:
+        with self._lock:
+            local = self._versions.get(sku_id, self._floor)
+        shared = None
+        if self.shared is not None:
+            try:
+                shared = self.shared.get(self._version_key(sku_id))
+            except Exception:
+                self._shared_failed("get")
+        return local, shared
+
+    def _store_local(self, key: Tuple[int, Hashable], version: tuple, value: bytes) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, version, value)
+            self._keys_by_sku.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key: Tuple[int, Hashable]) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_sku.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_sku[key[0]]
+
+    def _version_key(self, sku_id: int) -> str:
+        return f"{self.namespace}:ver:{sku_id}"
+
+    def _entry_key(self, sku_id: int, version: tuple, params: Hashable) -> str:
+        shared_version = version[1].decode() if isinstance(version[1], bytes) else version[1]
+        return f"{self.namespace}:{sku_id}:{shared_version or 0}:{json.dumps(params, default=str)}"
+
+    def _shared_get(self, sku_id: int, version: tuple, params: Hashable) -> Optional[bytes]:
+        if self.shared is None:
+            return None
+        try:
+            return self.shared.get(self._entry_key(sku_id, version, params))
+        except Exception:
+            self._shared_failed("get")
+            return None
+
+    def _shared_set(self, sku_id: int, version: tuple, params: Hashable, value: bytes) -> None:
+        if self.shared is None:
+            return
+        try:
+            self.shared.set(
+                self._entry_key(sku_id, version, params),
+                value,
+                ex=max(1, int(self.ttl_seconds)),
+            )
+        except Exception:
+            self._shared_failed("set")
+
+    def _shared_failed(self, op: str) -> None:
+        # The shared tier is an optimization; fall back to the database.
+        with self._lock:
+            self.shared_errors += 1
+        logger.warning("Timeline cache shared tier %s failed", op, exc_info=True)
+
+
+def _build_timeline_cache() -> TimelineCache:
+    shared = None
+    if settings.timeline_cache_shared:
+        from redis import Redis
+
+        shared = Redis.from_url(settings.redis_url, socket_timeout=0.25)
+    return TimelineCache(
+        max_entries=settings.timeline_cache_max_entries,
+        ttl_seconds=settings.timeline_cache_ttl_seconds,
+        shared=shared,
+    )
+
+
+timeline_cache = _build_timeline_cache()
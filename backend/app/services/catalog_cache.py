@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from sqlmodel import Session
+
+from app.connectors import CatalogProduct
+from app.core.config import settings
+from app.db.session import engine
+from app.models import CatalogCacheEntry
+from app.services.resolution import GTIN_LENGTH, resolution_keys
+
+logger = logging.getLogger(__name__)
+
+CatalogKey = Tuple[str, str]
+_PRODUCT_FIELDS = ("title", "description", "brand", "identifiers", "raw")
+# Digits, optionally grouped with spaces or dashes ("0-12345-67890-5").
+_NUMERIC = re.compile(r"[\s\-]*\d[\d\s\-]*")
+
+
+@dataclass
+class _CachedLookup:
+    fetched_at: float  # time.time() of the upstream answer
+    product: Optional[dict]  # CatalogProduct fields; None records "not found"
+
+
+def catalog_key(provider: str, identifier: str) -> CatalogKey:
+    """Cache key for a lookup; barcodes are keyed as GTIN-14 so UPC/EAN spellings share an entry.
+
+    Anything that is not all digits (ignoring spaces and dashes) is sent to
+    the provider as typed, so it is keyed on the trimmed value as is.
+    """
+    value = identifier.strip()
+    if not _NUMERIC.fullmatch(value):
+        return provider, value
+    return provider, resolution_keys("barcode", value)[0].split(":", 1)[1]
+
+
+def catalog_query(key: CatalogKey) -> str:
+    """The identifier sent upstream for a key, so the answer cached is the answer to it.
+
+    A GTIN-14 key is sent in its shortest standard length (EAN-8, UPC-A,
+    EAN-13 or GTIN-14); every spelling sharing the key asks the same question.
+    """
+    value = key[1]
+    if len(value) != GTIN_LENGTH or not value.isdigit():
+        return value
+    significant = len(value.lstrip("0"))
+    for length in (8, 12, 13):
+        if significant <= length:
+            return value[-length:]
+    return value
+
+
+class CatalogCache:
+    """Catalog provider answers keyed by (provider, normalized identifier).
+
+    Answers are kept in an in-process LRU bounded by `max_entries`, backed
+    (when `engine` is given) by the `catalogcacheentry` table, which
+    survives restarts and is shared by the API and worker processes. A
+    found product is fresh for `ttl_seconds`; after that it is served
+    stale for up to `stale_seconds` more while one background lookup
+    refreshes it. "Not found" answers are cached for
+    `negative_ttl_seconds` and never served stale. Provider errors are not
+    cached.
+
+    Upstream lookups are single-flight per key: callers missing the same
+    key meanwhile wait on the one in-flight lookup, so a burst of scans of
+    a new barcode costs one request of provider quota. `fetch` is called
+    with catalog_query(key), so a cached answer (found or not) is always
+    the answer for the one spelling sent upstream.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        negative_ttl_seconds: float = 24 * 3600,
+        stale_seconds: float = 7 * 24 * 3600,
+        engine: Any = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.engine = engine
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CatalogKey, _CachedLookup]" = OrderedDict()
+        self._flights: Dict[CatalogKey, Future] = {}
+        self._tasks: Set[asyncio.Future] = set()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.stale_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.persistent_loads = 0
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.persistent_errors = 0
+        self._saved_by_provider: Counter = Counter()
+        self._fetches_by_provider: Counter = Counter()
+
+    # -- public API -----------------------------------------------------
+
+    def lookup(self, provider: str, identifier: str, fetch: Callable[[str], CatalogProduct]) -> CatalogProduct:
+        """Return the cached answer for the key, calling `fetch` with catalog_query(key) when there is none."""
+        key = catalog_key(provider, identifier)
+        entry, flight, leader = self._claim(key, self._get_local(key) or self._load(key))
+        if entry is not None:
+            if leader:
+                threading.Thread(target=self._revalidate, args=(key, flight, fetch), daemon=True).start()
+            return _product(entry)
+        if leader:
+            self._fill(key, flight, fetch)
+        return _product(flight.result())
+
+    async def lookup_async(
+        self, provider: str, identifier: str, fetch: Callable[[str], Awaitable[CatalogProduct]]
+    ) -> CatalogProduct:
+        """lookup with an async `fetch`; the persistent tier is read and written in a worker thread."""
+        key = catalog_key(provider, identifier)
+        entry = self._get_local(key)
+        if entry is None:
+            entry = await self._off_loop(self._load, key)
+        entry, flight, leader = self._claim(key, entry)
+        if leader:
+            # The lookup runs as its own task so that a cancelled caller (a
+            # provider dropped by CatalogAggregator) neither cancels it for
+            # the other waiters nor wastes the quota already spent.
+            task = asyncio.ensure_future(self._fill_async(key, flight, fetch, background=entry is not None))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if entry is not None:
+            return _product(entry)
+        return _product(await asyncio.shield(asyncio.wrap_future(flight)))
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            saved = self.hits + self.negative_hits + self.stale_hits + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "in_flight": len(self._flights),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "stale_hits": self.stale_hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "persistent_loads": self.persistent_loads,
+                "fetches": self.fetches,
+                "fetch_errors": self.fetch_errors,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "persistent_errors": self.persistent_errors,
+                "upstream_calls_saved": saved,
+                "providers": {
+                    provider: {
+                        "upstream_calls_saved": self._saved_by_provider[provider],
+                        "fetches": self._fetches_by_provider[provider],
+                    }
+                    for provider in sorted(set(self._saved_by_provider) | set(self._fetches_by_provider))
+                },
+            }
+
+    def clear(self) -> None:
+        """Drop the in-process tier; persisted answers are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    # -- internals ------------------------------------------------------
+
+    def _claim(
+        self, key: CatalogKey, entry: Optional[_CachedLookup]
+    ) -> Tuple[Optional[_CachedLookup], Optional[Future], bool]:
+        # (entry to serve, lookup to wait on or lead, whether this caller leads it)
+        age = time.time() - entry.fetched_at if entry is not None else None
+        with self._lock:
+            flight = self._flights.get(key)
+            if entry is not None and entry.product is None and age < self.negative_ttl_seconds:
+                self._saved(key, "negative_hits")
+                return entry, None, False
+            if entry is not None and entry.product is not None and age < self.ttl_seconds + self.stale_seconds:
+                if age < self.ttl_seconds:
+                    self._saved(key, "hits")
+                    return entry, None, False
+                self._saved(key, "stale_hits")
+                if flight is not None:
+                    return entry, None, False
+                self.revalidations += 1
+                flight = self._flights[key] = Future()
+                return entry, flight, True
+            if flight is not None:
+                self._saved(key, "coalesced")
+                return None, flight, False
+            self.misses += 1
+            flight = self._flights[key] = Future()
+            return None, flight, True
+
+    def _saved(self, key: CatalogKey, counter: str) -> None:
+        setattr(self, counter, getattr(self, counter) + 1)
+        self._saved_by_provider[key[0]] += 1
+
+    def _fill(self, key: CatalogKey, flight: Future, fetch: Callable[[str], CatalogProduct]) -> None:
+        self._fetched(key)
+        try:
+            product = fetch(catalog_query(key))
+        except BaseException as exc:
+            self._fail(key, flight, exc)
+            return
+        entry = _entry(product)
+        self._store(key, flight, entry)
+        self._save(key, entry)
+
+    async def _fill_async(
+        self, key: CatalogKey, flight: Future, fetch: Callable[[str], Awaitable[CatalogProduct]], background: bool
+    ) -> None:
+        self._fetched(key)
+        try:
+            product = await fetch(catalog_query(key))
+        except BaseException as exc:
+            self._fail(key, flight, exc)
+            if background:
+                logger.warning("Catalog cache refresh of %s failed: %s", key, exc)
+            return
+        entry = _entry(product)
+        self._store(key, flight, entry)
+        await self._off_loop(self._save, key, entry)
+
+    def _revalidate(self, key: CatalogKey, flight: Future, fetch: Callable[[str], CatalogProduct]) -> None:
+        self._fill(key, flight, fetch)
+        if flight.exception() is not None:
+            # The stale entry stays servable; the next request past TTL retries.
+            logger.warning("Catalog cache refresh of %s failed: %s", key, flight.exception())
+
+    def _fetched(self, key: CatalogKey) -> None:
+        with self._lock:
+            self.fetches += 1
+            self._fetches_by_provider[key[0]] += 1
+
+    def _store(self, key: CatalogKey, flight: Future, entry: _CachedLookup) -> None:
+        with self._lock:
+            self._put(key, entry)
+            del self._flights[key]
+        flight.set_result(entry)
+
+    def _fail(self, key: CatalogKey, flight: Future, exc: BaseException) -> None:
+        with self._lock:
+            self.fetch_errors += 1
+            del self._flights[key]
+        flight.set_exception(exc)
+
+    def _get_local(self, key: CatalogKey) -> Optional[_CachedLookup]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key: CatalogKey, entry: _CachedLookup) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _off_loop(self, func: Callable[..., Any], *args: Any) -> Any:
+        # Only the persistent tier does I/O; without it everything runs inline.
+        if self.engine is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    def _load(self, key: CatalogKey) -> Optional[_CachedLookup]:
+        if self.engine is None:
+            return None
+        try:
+            with Session(self.engine) as session:
+                row = session.get(CatalogCacheEntry, key)
+        except Exception:
+            self._persistent_failed("read")
+            return None
+        if row is None:
+            return None
+        entry = _CachedLookup(row.fetched_at.replace(tzinfo=timezone.utc).timestamp(), row.product)
+        with self._lock:
+            self.persistent_loads += 1
+            if key not in self._entries:
+                self._put(key, entry)
+        return entry
+
+    def _save(self, key: CatalogKey, entry: _CachedLookup) -> None:
+        if self.engine is None:
+            return
+        fetched_at = datetime.fromtimestamp(entry.fetched_at, timezone.utc).replace(tzinfo=None)
+        try:
+            with Session(self.engine) as session:
+                session.merge(
+                    CatalogCacheEntry(provider=key[0], identifier=key[1], product=entry.product, fetched_at=fetched_at)
+                )
+                session.commit()
+        except Exception:
+            self._persistent_failed("write")
+
+    def _persistent_failed(self, op: str) -> None:
+        # The persistent tier is an optimization; fall back to the provider.
+        with self._lock:
+            self.persistent_errors += 1
+        logger.warning("Catalog cache persistent tier %s failed", op, exc_info=True)
+
+
+def _entry(product: CatalogProduct) -> _CachedLookup:
+    fields = {name: getattr(product, name) for name in _PRODUCT_FIELDS} if product.found else None
+    return _CachedLookup(time.time(), fields)
+
+
+def _product(entry: _CachedLookup) -> CatalogProduct:
+    # A fresh object per caller: CatalogAggregator sets `sources` on what it gets back.
+    if entry.product is None:
+        return CatalogProduct(title=None, description=None, brand=None, identifiers={}, raw={})
+    return CatalogProduct(**{**entry.product, "identifiers": dict(entry.product["identifiers"])})
+
+
+class CachedCatalogConnector:
+    """Async catalog connector that answers from a CatalogCache before calling `connector`."""
+
+    def __init__(self, provider: str, connector: Any, cache: CatalogCache) -> None:
+        self.provider = provider
+        self.connector = connector
+        self.cache = cache
+
+    async def lookup(self, identifier: str) -> CatalogProduct:
+        return await self.cache.lookup_async(self.provider, identifier, self.connector.lookup)
+
+
+catalog_cache = CatalogCache(
+    max_entries=settings.catalog_cache_max_entries,
+    ttl_seconds=settings.catalog_cache_ttl_seconds,
+    negative_ttl_seconds=settings.catalog_cache_negative_ttl_seconds,
+    stale_seconds=settings.catalog_cache_stale_seconds,
+    engine=engine if settings.catalog_cache_persistent else None,
+)
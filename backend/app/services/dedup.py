@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+
+
+def content_key(
+    provider: str,
+    tracking_number: str,
+    event_type: str,
+    observed_at: Optional[datetime],
+    location: Optional[str],
+    payload: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Stable identity of a carrier scan, so re-polled history maps to the same key.
+
+    Pass `observed_at=None` when the carrier gave no timestamp (the connector
+    filled in the poll time); the payload is hashed in its place.
+    """
+    if observed_at is not None:
+        if observed_at.tzinfo is not None:
+            observed_at = observed_at.astimezone(timezone.utc).replace(tzinfo=None)
+        moment = observed_at.isoformat()
+    else:
+        moment = json.dumps(payload or {}, sort_keys=True, default=str)
+    parts = (provider.lower(), tracking_number.strip().upper(), event_type, moment, location or "")
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()[:32]
+
+
+class SeenEventKeys:
+    """Per-SKU sets of content keys known to be stored, LRU-bounded by SKU.
+
+    A pre-check only: keys not in the set still go to the database, where
+    the unique (sku_id, content_key) index is the source of truth.
+    """
+
+    def __init__(self, max_skus: int = 10_000, max_keys_per_sku: int = 5_000) -> None:
+        self.max_skus = max_skus
+        self.max_keys_per_sku = max_keys_per_sku
+        self._lock = threading.Lock()
+        self._keys: "OrderedDict[int, Set[str]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def unseen(self, sku_id: int, keys: Iterable[str]) -> List[str]:
+        """The subset of `keys` not yet known to be stored for this SKU."""
+        keys = list(keys)
+        with self._lock:
+            known = self._keys.get(sku_id)
+            if known is None:
+                fresh = keys
+            else:
+                self._keys.move_to_end(sku_id)
+                fresh = [key for key in keys if key not in known]
+            self.hits += len(keys) - len(fresh)
+            self.misses += len(fresh)
+        return fresh
+
+    def add(self, sku_id: int, keys: Iterable[str]) -> None:
+        with self._lock:
+            known = self._keys.get(sku_id)
+            if known is None:
+                known = self._keys[sku_id] = set()
+            self._keys.move_to_end(sku_id)
+            known.update(keys)
+            if len(known) > self.max_keys_per_sku:
+                known.clear()
+            while len(self._keys) > self.max_skus:
+                self._keys.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "skus": len(self._keys),
+                "keys": sum(len(keys) for keys in self._keys.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+
+
+seen_event_keys = SeenEventKeys(max_skus=settings.event_dedup_max_skus)
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Connection,
+    Engine,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    Sequence,
+    Table,
+    event,
+    inspect,
+    select,
+    text,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import SkuEvent
+
+PARTITION_PREFIX = "skuevent_"
+# Event ids are globally unique: each monthly partition allocates from its
+# own range, period * PARTITION_ID_SPAN + n (e.g. 202405 -> 2024050000000001).
+PARTITION_ID_SPAN = 10**10
+
+_PARTITION_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{6}})$")
+# session.info key: {store: periods created in the session's open transaction}
+_PENDING_PERIODS = "event_store.pending_periods"
+# (sku_id, content_key) pairs per stored-key probe; two bind parameters each.
+_KEY_CHUNK = 400
+
+
+def insert_skipping_duplicates(table: Table, dialect: str):
+    """INSERT that skips rows whose (sku_id, content_key) is already stored.
+
+    Plain INSERT on dialects without ON CONFLICT; duplicates then raise.
+    """
+    if dialect == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing(index_elements=["sku_id", "content_key"])
+    if dialect == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing(index_elements=["sku_id", "content_key"])
+    return table.insert()
+
+
+def period_of(moment: datetime) -> int:
+    """Monthly partition key (YYYYMM) for an observed_at timestamp."""
+    return moment.year * 100 + moment.month
+
+
+def period_start(period: int) -> datetime:
+    return datetime(period // 100, period % 100, 1)
+
+
+def period_end(period: int) -> datetime:
+    year, month = divmod(period, 100)
+    return datetime(year + month // 12, month % 12 + 1, 1)
+
+
+class PartitionedEventStore:
+    """SkuEvent rows stored in one table per calendar month of observed_at.
+
+    Each partition (`skuevent_YYYYMM`) has the SkuEvent columns and timeline
+    index. Writes are routed by observed_at; windowed reads only open the
+    partitions overlapping the window and walk them newest first, stopping
+    once the page is full; retention drops whole partitions. Plain tables
+    keep this portable (SQLite included); on PostgreSQL the same layout can
+    later move to native declarative partitioning or TimescaleDB.
+
+    The unique (sku_id, content_key) index is per partition, but a carrier
+    event without a timestamp is routed by the time it was polled, so a
+    re-poll in a later month targets a different partition. Writes that
+    skip duplicates therefore first look the keys up across all partitions
+    (`stored_keys`). Two transactions storing the same key into different
+    months at the same moment can still both succeed.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.metadata = MetaData()
+        self._lock = threading.Lock()
+        self._tables: Dict[int, Table] = {}
+        self._periods: Optional[List[int]] = None
+
+    # -- partitions -----------------------------------------------------
+
+    def periods(self) -> List[int]:
+        """Existing partition keys, oldest first."""
+        with self._lock:
+            if self._periods is None:
+                names = inspect(self.engine).get_table_names()
+                self._periods = sorted(
+                    int(match.group(1)) for match in map(_PARTITION_NAME.match, names) if match
+                )
+            return list(self._periods)
+
+    def table(self, period: int) -> Table:
+        with self._lock:
+            table = self._tables.get(period)
+            if table is None:
+                table = self._tables[period] = self._define(period)
+        return table
+
+    def ensure(self, session: Session, period: int) -> Table:
+        """The partition for `period`, created in the session's transaction if missing."""
+        table = self.table(period)
+        if period not in self.periods() and period not in self._pending(session):
+            self._create(session.connection(), table, period)
+            session.info.setdefault(_PENDING_PERIODS, {}).setdefault(self, set()).add(period)
+        return table
+
+    def drop_before(self, cutoff: datetime) -> List[int]:
+        """Drop every partition whose whole month lies before `cutoff`."""
+        dropped = [period for period in self.periods() if period_end(period) <= cutoff]
+        for period in dropped:
+            self.table(period).drop(self.engine, checkfirst=True)
+        with self._lock:
+            self._periods = None
+            for period in dropped:
+                self.metadata.remove(self._tables.pop(period))
+        return dropped
+
+    def _define(self, period: int) -> Table:
+        name = f"{PARTITION_PREFIX}{period}"
+        columns = [
+            Column(
+                column.name,
+                column.type,
+                *(ForeignKey(fk.column) for fk in column.foreign_keys),
+                nullable=column.nullable,
+            )
+            for column in SkuEvent.__table__.columns
+            if column.name != "id"
+        ]
+        return Table(
+            name,
+            self.metadata,
+            Column(
+                "id",
+                BigInteger().with_variant(Integer, "sqlite"),
+                Sequence(f"{name}_id_seq", start=period * PARTITION_ID_SPAN + 1),
+                primary_key=True,
+            ),
+            *columns,
+            Index(f"ix_{name}_sku_id_observed_at", "sku_id", "observed_at", "id"),
+            Index(f"ux_{name}_sku_id_content_key", "sku_id", "content_key", unique=True),
+            sqlite_autoincrement=True,
+        )
+
+    def _create(self, conn: Connection, table: Table, period: int) -> None:
+        # Runs on the writer's own connection: a second connection would block
+        # on SQLite's write lock, and on PostgreSQL the DDL stays transactional.
+        table.create(conn, checkfirst=True)
+        if conn.dialect.name == "sqlite":
+            # AUTOINCREMENT continues from sqlite_sequence, so start the range there.
+            seeded = conn.execute(
+                text("SELECT 1 FROM sqlite_sequence WHERE name = :name"), {"name": table.name}
+            ).first()
+            if seeded is None:
+                conn.execute(
+                    text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+                    {"name": table.name, "seq": period * PARTITION_ID_SPAN},
+                )
+
+    def _pending(self, session: Session) -> Set[int]:
+        # Partitions created in the session's open transaction; they only
+        # join periods() once it commits (see _publish_created_partitions).
+        return session.info.get(_PENDING_PERIODS, {}).get(self, set())
+
+    def _publish(self, periods: Set[int]) -> None:
+        with self._lock:
+            if self._periods is not None:
+                self._periods = sorted(set(self._periods) | periods)
+
+    def refresh(self) -> None:
+        """Forget cached partition names (after external DDL)."""
+        with self._lock:
+            self._periods = None
+
+    # -- writes ---------------------------------------------------------
+
+    def insert_one(self, session: Session, row: Dict[str, Any], skip_duplicates: bool = False) -> Optional[int]:
+        """Insert one event row in the session's transaction and return its id.
+
+        With `skip_duplicates`, returns None when the content key is already stored.
+        """
+        table = self.ensure(session, period_of(row["observed_at"]))
+        if not skip_duplicates:
+            return session.execute(table.insert().values(**row)).inserted_primary_key[0]
+        statement = insert_skipping_duplicates(table, session.get_bind().dialect.name)
+        return session.execute(statement.values(**row).returning(table.c.id)).scalar()
+
+    def insert_many(self, session: Session, rows: Iterable[Dict[str, Any]]) -> int:
+        """executemany insert per partition, skipping duplicate content keys; returns rows written."""
+        by_period: Dict[int, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_period.setdefault(period_of(row["observed_at"]), []).append(row)
+        dialect = session.get_bind().dialect.name
+        written = 0
+        stored = self.stored_keys(
+            session,
+            ((row["sku_id"], row["content_key"]) for rows in by_period.values() for row in rows if row["content_key"]),
+        )
+        for period, period_rows in by_period.items():
+            if stored:
+                period_rows = [row for row in period_rows if (row["sku_id"], row["content_key"]) not in stored]
+                if not period_rows:
+                    continue
+            table = self.ensure(session, period)
+            written += session.execute(insert_skipping_duplicates(table, dialect), period_rows).rowcount
+        return written
+
+    def stored_keys(self, session: Session, keys: Iterable[Tuple[int, str]]) -> Set[Tuple[int, str]]:
+        """The (sku_id, content_key) pairs of `keys` already stored in any partition."""
+        keys = sorted(set(keys))
+        periods = sorted(set(self.periods()) | self._pending(session))
+        found: Set[Tuple[int, str]] = set()
+        for start in range(0, len(keys) if periods else 0, _KEY_CHUNK):
+            chunk = keys[start:start + _KEY_CHUNK]
+            selects = [
+                select(table.c.sku_id, table.c.content_key)
+                .where(tuple_(table.c.sku_id, table.c.content_key).in_(chunk))
+                for table in map(self.table, periods)
+            ]
+            found.update(session.execute(union_all(*selects) if len(selects) > 1 else selects[0]).tuples())
+        return found
+
+    # -- reads ----------------------------------------------------------
+
+    def window(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[int]:
+        """Partition keys overlapping [since, until), oldest first."""
+        return [
+            period
+            for period in self.periods()
+            if (since is None or period_end(period) > since)
+            and (until is None or period_start(period) < until)
+        ]
+
+    def timeline(
+        self,
+        session: Session,
+        sku_id: int,
+        limit: int,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        before: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Up to `limit` event rows (as dicts) for a SKU, newest first by (observed_at, id)."""
+        upper = until
+        if before is not None:
+            # Keyset bound; the cursor's own month may still hold older rows.
+            cursor_end = period_end(period_of(before[0]))
+            upper = cursor_end if upper is None else min(upper, cursor_end)
+        window = self.window(since, upper)
+
+        events: List[Dict[str, Any]] = []
+        for period in reversed(window):
+            table = self.table(period)
+            statement = select(table).where(table.c.sku_id == sku_id)
+            if since is not None:
+                statement = statement.where(table.c.observed_at >= since)
+            if until is not None:
+                statement = statement.where(table.c.observed_at < until)
+            if before is not None:
+                statement = statement.where(tuple_(table.c.observed_at, table.c.id) < before)
+            statement = statement.order_by(table.c.observed_at.desc(), table.c.id.desc())
+            rows = session.execute(statement.limit(limit - len(events)))
+            # Plain str keys: reflected/copied column names are quoted_name,
+            # which JSON encoders reject as dict keys.
+            names = [str(column.name) for column in table.columns]
+            events.extend(dict(zip(names, row)) for row in rows)
+            if len(events) >= limit:
+                break
+        return events
+
+    def union(self, since: Optional[datetime] = None, until: Optional[datetime] = None):
+        """All partitions overlapping the window as one selectable, for set-based queries."""
+        window = self.window(since, until)
+        if not window:
+            return select(SkuEvent.__table__).where(text("0 = 1")).subquery("skuevent_all")
+        return union_all(*(select(self.table(period)) for period in window)).subquery("skuevent_all")
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_created_partitions(session: Session) -> None:
+    # Other connections cannot see a new partition until commit, and a
+    # rolled-back one never existed, so periods() only learns of it here.
+    for store, periods in session.info.pop(_PENDING_PERIODS, {}).items():
+        store._publish(periods)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_created_partitions(session: Session) -> None:
+    session.info.pop(_PENDING_PERIODS, None)
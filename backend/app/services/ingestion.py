@@ -1,47 +1,163 @@
 from __future__ import annotations
 
-from typing import List
+import asyncio
+from typing import Dict, List, Optional, Tuple
 
 from app.connectors import (
+    AsyncBarcodeLookupConnector,
+    AsyncFedExConnector,
+    AsyncUpcItemDbConnector,
+    AsyncUpsConnector,
+    AsyncUspsConnector,
     BarcodeLookupConnector,
+    CatalogAggregator,
+    CatalogProduct,
     ConnectorError,
+    ConnectorEvent,
     FedExConnector,
+    TrackingResult,
     UpcItemDbConnector,
     UpsConnector,
     UspsConnector,
 )
+from app.core.config import settings
 from app.models import SkuEvent
-from app.schemas.connector import CatalogLookupRequest, TrackShipmentRequest
+from app.schemas.connector import CatalogAggregateRequest, CatalogLookupRequest, TrackShipmentRequest
 from app.schemas.sku import SkuEventCreate
-from app.services.tracking import record_event
+from app.services.catalog_cache import CachedCatalogConnector, catalog_cache
+from app.services.dedup import content_key
+from app.services.tracking import record_tracked_events, record_tracked_events_batch
 
 
-def ingest_tracking(request: TrackShipmentRequest) -> List[SkuEvent]:
+def ingest_tracking(request: TrackShipmentRequest) -> Tuple[List[SkuEvent], int]:
+    """Poll a carrier and store events not seen before; returns (new events, duplicates)."""
     try:
-        if request.provider == "fedex":
-            connector = FedExConnector()
-        elif request.provider == "ups":
-            connector = UpsConnector()
-        else:
-            connector = UspsConnector()
-        events = connector.track(request.tracking_number)
+        events = _shipping_connector(request.provider).track(request.tracking_number)
+    except ConnectorError as exc:
+        raise ValueError(str(exc)) from exc
+    return record_tracked_events(request.sku_id, _event_payloads(request.sku_id, request.tracking_number, events))
+
+
+def ingest_tracking_batch(
+    requests: List[TrackShipmentRequest],
+) -> List[Tuple[List[SkuEvent], int, Optional[str]]]:
+    """Poll carriers for many shipments and store events not seen before.
+
+    Each provider is asked once per distinct tracking number through its
+    connector's track_many. Returns (new events, duplicates, error) per
+    request, in order; a failed lookup or write only fails its own entries.
+    """
+    tracked: Dict[Tuple[str, str], TrackingResult] = {}
+    for provider, numbers in _numbers_by_provider(requests).items():
+        try:
+            results = _shipping_connector(provider).track_many(numbers)
+        except ConnectorError as exc:
+            results = [TrackingResult(number, error=str(exc)) for number in numbers]
+        tracked.update(((provider, result.tracking_number), result) for result in results)
+    return _store_batch(requests, tracked)
+
+
+async def ingest_tracking_async(request: TrackShipmentRequest) -> Tuple[List[SkuEvent], int]:
+    """ingest_tracking with the carrier call on the async connectors; the write runs in a thread."""
+    try:
+        events = await _async_shipping_connector(request.provider).track(request.tracking_number)
     except ConnectorError as exc:
         raise ValueError(str(exc)) from exc
+    payloads = _event_payloads(request.sku_id, request.tracking_number, events)
+    return await asyncio.to_thread(record_tracked_events, request.sku_id, payloads)
+
+
+async def ingest_tracking_batch_async(
+    requests: List[TrackShipmentRequest],
+) -> List[Tuple[List[SkuEvent], int, Optional[str]]]:
+    """ingest_tracking_batch with every provider queried concurrently on the async connectors."""
+
+    async def track(provider: str, numbers: List[str]) -> List[TrackingResult]:
+        try:
+            return await _async_shipping_connector(provider).track_many(numbers)
+        except ConnectorError as exc:
+            return [TrackingResult(number, error=str(exc)) for number in numbers]
+
+    by_provider = _numbers_by_provider(requests)
+    answers = await asyncio.gather(*(track(provider, numbers) for provider, numbers in by_provider.items()))
+    tracked: Dict[Tuple[str, str], TrackingResult] = {
+        (provider, result.tracking_number): result
+        for provider, results in zip(by_provider, answers)
+        for result in results
+    }
+    return await asyncio.to_thread(_store_batch, requests, tracked)
+
+
+def _numbers_by_provider(requests: List[TrackShipmentRequest]) -> Dict[str, List[str]]:
+    numbers: Dict[str, List[str]] = {}
+    for request in requests:
+        numbers.setdefault(request.provider, []).append(request.tracking_number)
+    return {provider: list(dict.fromkeys(values)) for provider, values in numbers.items()}
+
+
+def _store_batch(
+    requests: List[TrackShipmentRequest], tracked: Dict[Tuple[str, str], TrackingResult]
+) -> List[Tuple[List[SkuEvent], int, Optional[str]]]:
+    # The same shipment listed more than once is stored once and every
+    # entry for it gets that outcome.
+    entries: Dict[Tuple[int, str, str], List[int]] = {}
+    for index, request in enumerate(requests):
+        entries.setdefault((request.sku_id, request.provider, request.tracking_number), []).append(index)
+
+    outcomes: List[Tuple[List[SkuEvent], int, Optional[str]]] = [([], 0, None)] * len(requests)
+    shipments = []
+    for (sku_id, provider, tracking_number), indexes in entries.items():
+        result = tracked[(provider, tracking_number)]
+        if result.error:
+            for index in indexes:
+                outcomes[index] = ([], 0, result.error)
+        else:
+            payloads = _event_payloads(sku_id, tracking_number, result.events)
+            shipments.append((indexes, (sku_id, payloads)))
+    stored = record_tracked_events_batch([shipment for _, shipment in shipments])
+    for (indexes, _), outcome in zip(shipments, stored):
+        for index in indexes:
+            outcomes[index] = outcome
+    return outcomes
+
+
+def _shipping_connector(provider: str):
+    if provider == "fedex":
+        return FedExConnector()
+    if provider == "ups":
+        return UpsConnector()
+    return UspsConnector()
+
+
+def _async_shipping_connector(provider: str):
+    if provider == "fedex":
+        return AsyncFedExConnector()
+    if provider == "ups":
+        return AsyncUpsConnector()
+    return AsyncUspsConnector()
 
-    created: List[SkuEvent] = []
-    for event in events:
-        payload = SkuEventCreate(
-            sku_id=request.sku_id,
+
+def _event_payloads(sku_id: int, tracking_number: str, events: List[ConnectorEvent]) -> List[SkuEventCreate]:
+    return [
+        SkuEventCreate(
+            sku_id=sku_id,
             event_type=event.event_type,
             provider=event.provider,
             location=event.location,
             payload=event.payload,
             observed_at=event.observed_at,
             confidence=1.0,
+            content_key=content_key(
+                event.provider,
+                tracking_number,
+                event.event_type,
+                event.observed_at if event.timestamped else None,
+                event.location,
+                event.payload,
+            ),
         )
-        created_event = record_event(payload)
-        created.append(created_event)
-    return created
+        for event in events
+    ]
 
 
 def lookup_catalog(request: CatalogLookupRequest):
@@ -50,6 +166,40 @@ def lookup_catalog(request: CatalogLookupRequest):
             connector = UpcItemDbConnector()
         else:
             connector = BarcodeLookupConnector()
-        return connector.lookup(request.identifier)
+        return catalog_cache.lookup(request.provider, request.identifier, connector.lookup)
+    except ConnectorError as exc:
+        raise ValueError(str(exc)) from exc
+
+
+async def lookup_catalog_async(request: CatalogLookupRequest) -> CatalogProduct:
+    try:
+        return await _async_catalog_connector(request.provider).lookup(request.identifier)
     except ConnectorError as exc:
         raise ValueError(str(exc)) from exc
+
+
+async def aggregate_catalog(request: CatalogAggregateRequest) -> CatalogProduct:
+    """Look an identifier up in several catalog providers concurrently.
+
+    Providers without credentials are skipped; ValueError when none can answer.
+    """
+    connectors = {}
+    unavailable = []
+    for provider in dict.fromkeys(request.providers):
+        try:
+            connectors[provider] = _async_catalog_connector(provider)
+        except ConnectorError as exc:
+            unavailable.append(f"{provider}: {exc}")
+    aggregator = CatalogAggregator(connectors, timeout=settings.catalog_aggregate_timeout_seconds)
+    try:
+        return await aggregator.lookup(request.identifier, strategy=request.strategy)
+    except ConnectorError as exc:
+        raise ValueError("; ".join([*unavailable, str(exc)])) from exc
+
+
+def _async_catalog_connector(provider: str) -> CachedCatalogConnector:
+    if provider == "upcitemdb":
+        connector = AsyncUpcItemDbConnector()
+    else:
+        connector = AsyncBarcodeLookupConnector()
+    return CachedCatalogConnector(provider, connector, catalog_cache)
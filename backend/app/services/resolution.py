@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import bindparam, update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.db.session import engine
+from app.models import SkuIdentity
+from app.schemas.sku import IdentifierRef, ResolvedIdentifier, ResolveResponse
+
+RESOLVE_CHUNK_SIZE = 900  # stays under SQLite's historical 999 bound parameters
+GTIN_LENGTH = 14
+GTIN_PROVIDERS = ("upc", "ean", "gtin", "isbn", "barcode")
+
+_SEPARATORS = re.compile(r"[\s\-]")
+
+
+def _family(provider: str) -> str:
+    name = re.sub(r"[^a-z]", "", provider.lower())
+    return "gtin" if name.startswith(GTIN_PROVIDERS) else name
+
+
+def gtin_check_digit(body: str) -> int:
+    """Check digit for a GTIN body (all digits except the check digit)."""
+    total = sum(int(digit) * (3 if position % 2 == 0 else 1) for position, digit in enumerate(reversed(body)))
+    return (10 - total % 10) % 10
+
+
+def resolution_keys(provider: str, identifier: str) -> List[str]:
+    """Normalized lookup keys for an identifier, most specific first.
+
+    UPC/EAN/GTIN/ISBN values share one namespace and are keyed as GTIN-14,
+    so leading zeros do not matter. A value whose last digit is not a valid
+    check digit may have been sent without one, so the completed form is
+    tried second. Other identifiers are keyed by provider and upper-cased value.
+    """
+    family = _family(provider)
+    value = _SEPARATORS.sub("", identifier)
+    if family != "gtin" or not value.isdigit() or len(value.lstrip("0")) > GTIN_LENGTH:
+        return [f"{family}:{value.upper()}"]
+
+    digits = value.lstrip("0") or "0"
+    keys = [f"gtin:{digits.zfill(GTIN_LENGTH)}"]
+    if len(digits) < GTIN_LENGTH and gtin_check_digit(digits[:-1]) != int(digits[-1]):
+        keys.append(f"gtin:{(digits + str(gtin_check_digit(digits))).zfill(GTIN_LENGTH)}")
+    return keys
+
+
+def resolution_key(provider: str, identifier: str) -> str:
+    """The key a stored identity is indexed under (SkuIdentity.resolution_key)."""
+    return resolution_keys(provider, identifier)[0]
+
+
+class ResolutionCache:
+    """Bounded LRU of resolution key -> SKU ids, including negative results.
+
+    `invalidate(keys)` is called for every identity write; loads that raced
+    with a write are not stored. Invalidation only reaches this process, so
+    a negative result expires after `negative_ttl_seconds`, bounding how long
+    an identifier registered by another API worker or the RQ worker stays
+    unresolved here.
+    """
+
+    def __init__(self, max_entries: int = 100_000, negative_ttl_seconds: float = 30.0) -> None:
+        self.max_entries = max_entries
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[int, ...]]" = OrderedDict()
+        self._negative_expiry: Dict[str, float] = {}  # key -> time.monotonic() deadline
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get_many(self, keys: Iterable[str]) -> Tuple[Dict[str, Tuple[int, ...]], List[str]]:
+        found: Dict[str, Tuple[int, ...]] = {}
+        missing: List[str] = []
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                value = self._entries.get(key)
+                if value is not None and not value and self._negative_expiry.get(key, 0.0) <= now:
+                    self._drop(key)
+                    value = None
+                if value is None:
+                    missing.append(key)
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def put_many(self, values: Dict[str, Tuple[int, ...]], generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            expires = time.monotonic() + self.negative_ttl_seconds
+            for key, value in values.items():
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                if value:
+                    self._negative_expiry.pop(key, None)
+                else:
+                    self._negative_expiry[key] = expires
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            for key in keys:
+                self._drop(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._negative_expiry.clear()
+
+    def _drop(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._negative_expiry.pop(key, None)
+
+
+resolution_cache = ResolutionCache(
+    max_entries=settings.resolution_cache_max_entries,
+    negative_ttl_seconds=settings.resolution_cache_negative_ttl_seconds,
+)
+
+
+def invalidate_identities(identities: Iterable[SkuIdentity]) -> None:
+    """Drop cached resolutions affected by new or changed identities."""
+    resolution_cache.invalidate(
+        key for identity in identities for key in resolution_keys(identity.provider, identity.identifier)
+    )
+
+
+def _load(keys: List[str]) -> Dict[str, Tuple[int, ...]]:
+    # Stored identities are indexed on their primary key only.
+    matches: Dict[str, Set[int]] = {key: set() for key in keys}
+    with Session(engine) as session:
+        for start in range(0, len(keys), RESOLVE_CHUNK_SIZE):
+            chunk = keys[start:start + RESOLVE_CHUNK_SIZE]
+            rows = session.exec(
+                select(SkuIdentity.resolution_key, SkuIdentity.sku_id).where(SkuIdentity.resolution_key.in_(chunk))
+            )
+            for key, sku_id in rows:
+                matches[key].add(sku_id)
+    return {key: tuple(sorted(sku_ids)) for key, sku_ids in matches.items()}
+
+
+def backfill_resolution_keys(batch_size: int = 1000) -> int:
+    """Set resolution_key on identities stored without one; returns the number updated."""
+    table = SkuIdentity.__table__
+    statement = update(table).where(table.c.id == bindparam("row_id")).values(resolution_key=bindparam("key"))
+    updated = 0
+    with Session(engine) as session:
+        while True:
+            rows = session.exec(
+                select(SkuIdentity.id, SkuIdentity.provider, SkuIdentity.identifier)
+                .where(SkuIdentity.resolution_key.is_(None))
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            session.execute(
+                statement,
+                [{"row_id": row_id, "key": resolution_key(provider, identifier)} for row_id, provider, identifier in rows],
+            )
+            session.commit()
+            updated += len(rows)
+    resolution_cache.clear()
+    return updated
+
+
+def resolve_identifiers(refs: List[IdentifierRef]) -> ResolveResponse:
+    """Resolve (provider, identifier) pairs to SKU ids with one set-based lookup."""
+    keys_by_ref = [resolution_keys(ref.provider, ref.identifier) for ref in refs]
+    unique = list(dict.fromkeys(key for keys in keys_by_ref for key in keys))
+
+    generation = resolution_cache.generation
+    resolved, missing = resolution_cache.get_many(unique)
+    if missing:
+        loaded = _load(missing)
+        resolution_cache.put_many(loaded, generation)
+        resolved.update(loaded)
+
+    results = []
+    for ref, keys in zip(refs, keys_by_ref):
+        key = next((key for key in keys if resolved[key]), keys[0])
+        sku_ids = list(resolved[key])
+        results.append(
+            ResolvedIdentifier(
+                provider=ref.provider,
+                identifier=ref.identifier,
+                key=key,
+                sku_ids=sku_ids,
+                sku_id=sku_ids[0] if len(sku_ids) == 1 else None,
+            )
+        )
+    matched = sum(1 for result in results if result.sku_ids)
+    return ResolveResponse(results=results, resolved=matched, unresolved=len(results) - matched)
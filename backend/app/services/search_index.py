@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Engine
+from sqlmodel import Session, select
+
+from app.models import Sku, SkuIdentity
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# catch_up re-reads this many ids below the highest one indexed, for SKUs
+# another worker committed out of id order.
+CATCH_UP_OVERLAP = 1_000
+
+
+def _tokens(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def _word_grams(word: str, prefix: bool = False) -> List[str]:
+    # Padded like pg_trgm ("  w", " wi", ..., "et "); a prefix query word has
+    # no trailing pad so "wid" fully matches "widget".
+    padded = f"  {word}" if prefix else f"  {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _grams(tokens: Iterable[str]) -> Set[str]:
+    grams: Set[str] = set()
+    for token in tokens:
+        grams.update(_word_grams(token))
+    return grams
+
+
+def _load_docs(session: Session, batch_size: int, after: int = 0) -> Dict[int, Tuple[List[str], List[str]]]:
+    # sku_id -> (tokens, exact keys) for every SKU with id > `after`.
+    docs: Dict[int, Tuple[List[str], List[str]]] = {}
+    rows = session.exec(
+        select(Sku.id, Sku.name, Sku.brand, Sku.canonical_sku)
+        .where(Sku.id > after)
+        .execution_options(yield_per=batch_size)
+    )
+    for sku_id, name, brand, canonical_sku in rows:
+        docs[sku_id] = (_tokens(name) + _tokens(brand) + _tokens(canonical_sku), [canonical_sku])
+    rows = session.exec(
+        select(SkuIdentity.sku_id, SkuIdentity.identifier)
+        .where(SkuIdentity.sku_id > after)
+        .execution_options(yield_per=batch_size)
+    )
+    for sku_id, identifier in rows:
+        doc = docs.get(sku_id)
+        if doc is not None:
+            doc[0].extend(_tokens(identifier))
+            doc[1].append(identifier)
+    return docs
+
+
+class SkuSearchIndex:
+    """In-process trigram inverted index over SKU name, brand, canonical SKU and identifiers.
+
+    Each SKU is indexed as the set of padded trigrams of its tokens. A query
+    scores candidates by the rarity-weighted share of its trigrams they
+    contain, so a typo only costs the few trigrams it touches and the last
+    query word matches as a prefix. A query that is exactly a canonical SKU
+    or identifier returns just those SKUs. Stand-in until the OpenSearch
+    integration exists.
+
+    The index lives in each worker process. `start` builds it in the
+    background (searches fall back to the database until it is ready) and
+    then periodically catches up on SKUs created by other workers, so with
+    several workers a new SKU may take up to one refresh interval to become
+    searchable outside the worker that created it.
+    """
+
+    def __init__(self, min_similarity: float = 0.4) -> None:
+        self.min_similarity = min_similarity
+        self._lock = threading.Lock()
+        self._postings: Dict[str, array] = {}
+        self._sizes = array("H")  # trigram count per SKU id
+        self._indexed = bytearray()  # 1 per indexed SKU id
+        self._exact: Dict[str, List[int]] = {}
+        self._docs = 0
+        self._watermark = 0  # highest SKU id indexed
+        self._stop = threading.Event()
+        self.ready = False
+
+    def __len__(self) -> int:
+        return self._docs
+
+    def start(self, engine: Engine, refresh_seconds: float) -> None:
+        """Build the index in a background thread, then catch_up every `refresh_seconds` (0: never)."""
+        self._stop.clear()
+        threading.Thread(
+            target=self._maintain, args=(engine, refresh_seconds), name="sku-search-index", daemon=True
+        ).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def build(self, engine: Engine, batch_size: int = 10_000) -> None:
+        """(Re)build the index from every SKU and identity in the database."""
+        with Session(engine) as session:
+            docs = _load_docs(session, batch_size)
+
+        with self._lock:
+            self._postings = {}
+            self._sizes = array("H")
+            self._indexed = bytearray()
+            self._exact = {}
+            self._docs = 0
+            self._watermark = 0
+            for sku_id in sorted(docs):
+                tokens, keys = docs[sku_id]
+                self._add(sku_id, tokens, keys)
+            self.ready = True
+
+    def catch_up(self, engine: Engine, batch_size: int = 10_000) -> int:
+        """Index SKUs created since the last build or catch-up (e.g. by other workers); returns how many."""
+        with self._lock:
+            after = max(0, self._watermark - CATCH_UP_OVERLAP)
+        with Session(engine) as session:
+            docs = _load_docs(session, batch_size, after=after)
+        with self._lock:
+            before = self._docs
+            for sku_id in sorted(docs):
+                tokens, keys = docs[sku_id]
+                self._add(sku_id, tokens, keys)
+            return self._docs - before
+
+    def add(self, sku: Sku) -> None:
+        """Index a newly created SKU (with its identities loaded)."""
+        identifiers = [identity.identifier for identity in sku.identities]
+        tokens = _tokens(sku.name) + _tokens(sku.brand) + _tokens(sku.canonical_sku)
+        for identifier in identifiers:
+            tokens.extend(_tokens(identifier))
+        with self._lock:
+            self._add(sku.id, tokens, [sku.canonical_sku, *identifiers])
+
+    def search(self, query: str, limit: int = 20) -> List[int]:
+        """Return SKU ids ranked by relevance to `query`."""
+        words = _tokens(query)
+        if not words:
+            return []
+        grams: Set[str] = set()
+        for word in words[:-1]:
+            grams.update(_word_grams(word))
+        grams.update(_word_grams(words[-1], prefix=True))
+
+        with self._lock:
+            exact = self._exact.get("".join(words))
+            if exact:
+                # A full canonical SKU / identifier (e.g. a scanned barcode).
+                return sorted(exact)[:limit]
+            docs = max(1, self._docs)
+            postings = [self._postings.get(gram) for gram in grams]
+            sizes = self._sizes
+
+        # Trigrams are weighted by rarity, so ubiquitous ones ("sku", a common
+        # brand) barely count. A SKU must reach `needed` weight; anything absent
+        # from the rarest lists cannot, so only those lists seed candidates and
+        # the common ones are probed for existing candidates only.
+        weights = [math.log(1 + docs / len(ids)) for ids in postings if ids]
+        if not weights:
+            return []
+        # A trigram no SKU has (usually a typo) weighs as much as an average one.
+        unseen = sum(weights) / len(weights)
+        weighted = sorted(
+            ((math.log(1 + docs / len(ids)) if ids else unseen, ids) for ids in postings),
+            key=lambda entry: -entry[0],
+        )
+        total = sum(weight for weight, _ in weighted)
+        needed = total * self.min_similarity
+        rest = 0.0
+        seed = len(weighted)
+        while seed > 0 and rest + weighted[seed - 1][0] < needed:
+            seed -= 1
+            rest += weighted[seed][0]
+
+        scores: Dict[int, float] = {}
+        for weight, ids in weighted[:seed]:
+            for sku_id in ids or ():
+                scores[sku_id] = scores.get(sku_id, 0.0) + weight
+        for weight, ids in weighted[seed:]:
+            if not ids:
+                continue
+            if len(scores) * 16 < len(ids):
+                for sku_id in scores:
+                    position = bisect_left(ids, sku_id)
+                    if position < len(ids) and ids[position] == sku_id:
+                        scores[sku_id] += weight
+            else:
+                for sku_id in ids:
+                    if sku_id in scores:
+                        scores[sku_id] += weight
+
+        ranked = heapq.nlargest(
+            limit,
+            (
+                (score, -sizes[sku_id], -sku_id)
+                for sku_id, score in scores.items()
+                if score >= needed
+            ),
+        )
+        return [-entry[2] for entry in ranked]
+
+    def _add(self, sku_id: int, tokens: List[str], keys: List[str]) -> None:
+        # Posting lists stay sorted for search's bisect probes. Ids mostly
+        # arrive in increasing order and are appended; concurrent creates can
+        # index 6 before 5, so a smaller id is inserted in place.
+        if sku_id < len(self._indexed) and self._indexed[sku_id]:
+            return
+        grams = _grams(tokens)
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if ids is None:
+                ids = self._postings[gram] = array("I")
+            if ids and ids[-1] > sku_id:
+                insort(ids, sku_id)
+            else:
+                ids.append(sku_id)
+        if sku_id >= len(self._sizes):
+            self._sizes.extend([0] * (sku_id + 1 - len(self._sizes)))
+            self._indexed.extend(bytes(sku_id + 1 - len(self._indexed)))
+        self._sizes[sku_id] = min(len(grams), 0xFFFF)
+        self._indexed[sku_id] = 1
+        self._watermark = max(self._watermark, sku_id)
+        self._docs += 1
+        for key in keys:
+            normalized = "".join(_tokens(key))
+            if normalized:
+                self._exact.setdefault(normalized, []).append(sku_id)
+
+    def _maintain(self, engine: Engine, refresh_seconds: float) -> None:
+        try:
+            self.build(engine)
+        except Exception:
+            logger.exception("SKU search index build failed; searching the database instead")
+            return
+        while refresh_seconds > 0 and not self._stop.wait(refresh_seconds):
+            try:
+                self.catch_up(engine)
+            except Exception:
+                logger.warning("SKU search index catch-up failed", exc_info=True)
+
+
+search_index = SkuSearchIndex()
@@ -1,17 +1,45 @@
+import asyncio
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from sqlmodel import Session, select
+from sqlalchemy import or_, tuple_, update
 from sqlalchemy.orm import selectinload
 
-from app.db.session import engine
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.config import settings
+from app.db.session import engine, get_async_session
 from app.models import Sku, SkuEvent, SkuIdentity
+from app.services.cache import timeline_cache
+from app.services.dedup import seen_event_keys
+from app.services.event_store import PartitionedEventStore, insert_skipping_duplicates
+from app.services.resolution import invalidate_identities, resolution_key
+from app.services.search_index import search_index
 from app.schemas.sku import (
+    BulkEventError,
     SkuCreate,
     SkuEventCreate,
-    TimelineResponse,
 )
 
+BULK_CHUNK_SIZE = 1000
+TRACK_BATCH_CHUNK_SIZE = 200  # shipments per transaction in record_tracked_events_batch
+DEFAULT_TIMELINE_LIMIT = 100
+MAX_TIMELINE_LIMIT = 1000
+
+# Columns projected for read responses (the SkuRead / SkuEventRead fields).
+SKU_FIELDS = (
+    "id", "canonical_sku", "name", "description", "brand",
+    "current_status", "last_location", "last_observed_at",
+)
+IDENTITY_FIELDS = ("id", "provider", "identifier", "confidence", "created_at", "updated_at")
+EVENT_FIELDS = (
+    "id", "sku_id", "event_type", "provider", "location", "payload", "raw_payload",
+    "observed_at", "confidence", "content_key", "created_at", "updated_at",
+)
+
+# Monthly per-table event storage when enabled; the single SkuEvent table otherwise.
+event_store = PartitionedEventStore(engine) if settings.event_partitioning else None
+
 
 def get_session() -> Session:
     return Session(engine)
@@ -34,6 +62,7 @@ def create_sku(payload: SkuCreate) -> Sku:
                     sku_id=sku.id,
                     provider=identity.provider,
                     identifier=identity.identifier,
+                    resolution_key=resolution_key(identity.provider, identity.identifier),
                     confidence=identity.confidence,
                 )
             )
@@ -41,9 +70,39 @@ def create_sku(payload: SkuCreate) -> Sku:
         session.commit()
         session.refresh(sku)
         session.refresh(sku, attribute_names=["identities"])
+        invalidate_identities(sku.identities)
+        if search_index.ready:
+            search_index.add(sku)
         return sku
 
 
+def _advance_status(
+    session: Session,
+    sku_id: int,
+    event_type: str,
+    location: Optional[str],
+    observed_at: datetime,
+) -> None:
+    """Move the SKU's materialized status to this event unless a newer one is already applied.
+
+    Out-of-order events (older observed_at than the current state) leave the
+    status untouched; ties go to the event recorded last, matching timeline order.
+    """
+    session.execute(
+        update(Sku)
+        .where(
+            Sku.id == sku_id,
+            or_(Sku.last_observed_at.is_(None), Sku.last_observed_at <= observed_at),
+        )
+        .values(
+            current_status=event_type,
+            last_location=location,
+            last_observed_at=observed_at,
+            updated_at=datetime.utcnow(),
+        )
+    )
+
+
 def record_event(payload: SkuEventCreate) -> SkuEvent:
     with get_session() as session:
         event = SkuEvent(
@@ -55,42 +114,353 @@ def record_event(payload: SkuEventCreate) -> SkuEvent:
             raw_payload=payload.raw_payload,
             observed_at=payload.observed_at or datetime.utcnow(),
             confidence=payload.confidence,
+            content_key=payload.content_key,
         )
-        session.add(event)
+        if event_store is not None:
+            event.id = event_store.insert_one(session, event.model_dump(exclude={"id"}))
+        else:
+            session.add(event)
+        _advance_status(session, event.sku_id, event.event_type, event.location, event.observed_at)
         session.commit()
-        session.refresh(event)
-        return event
+        if event_store is None:
+            session.refresh(event)
+    timeline_cache.invalidate(payload.sku_id)
+    return event
+
+
+def _event_row(payload: SkuEventCreate, now: datetime) -> dict:
+    return {
+        "sku_id": payload.sku_id,
+        "event_type": payload.event_type,
+        "provider": payload.provider,
+        "location": payload.location,
+        "payload": payload.payload,
+        "raw_payload": payload.raw_payload,
+        "observed_at": payload.observed_at or now,
+        "confidence": payload.confidence,
+        "content_key": payload.content_key,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _advance_latest(session: Session, rows: List[dict]) -> None:
+    latest = {}
+    for row in rows:
+        current = latest.get(row["sku_id"])
+        if current is None or row["observed_at"] >= current["observed_at"]:
+            latest[row["sku_id"]] = row
+    for row in latest.values():
+        _advance_status(session, row["sku_id"], row["event_type"], row["location"], row["observed_at"])
+
 
+def record_tracked_events(sku_id: int, payloads: List[SkuEventCreate]) -> Tuple[List[SkuEvent], int]:
+    """Store carrier events for one SKU, skipping ones already stored.
 
-def get_sku_timeline(sku_id: int) -> Optional[TimelineResponse]:
+    Every payload carries a content_key. Keys this process has already
+    stored are dropped without a query; the rest are inserted with
+    ON CONFLICT DO NOTHING. Returns the newly stored events and the number
+    of duplicates.
+    """
+    pending = _unseen_payloads(sku_id, payloads)
+    created: List[SkuEvent] = []
+    if pending:
+        with get_session() as session:
+            created, stored = _insert_tracked(session, pending.values(), datetime.utcnow())
+            _advance_latest(session, stored)
+            session.commit()
+        seen_event_keys.add(sku_id, pending)
+        if created:
+            timeline_cache.invalidate(sku_id)
+    return created, len(payloads) - len(created)
+
+
+def record_tracked_events_batch(
+    shipments: List[Tuple[int, List[SkuEventCreate]]],
+    chunk_size: int = TRACK_BATCH_CHUNK_SIZE,
+) -> List[Tuple[List[SkuEvent], int, Optional[str]]]:
+    """record_tracked_events for many (sku_id, payloads) shipments in one session.
+
+    Shipments for unknown SKUs are rejected up front; the rest are committed
+    `chunk_size` shipments per transaction, so a failing chunk does not
+    abort the others. Returns (new events, duplicates, error) per shipment,
+    in input order.
+    """
+    outcomes: List[Tuple[List[SkuEvent], int, Optional[str]]] = [([], 0, None)] * len(shipments)
     with get_session() as session:
-        sku = session.get(Sku, sku_id)
-        if not sku:
-            return None
-
-        events = session.exec(
-            select(SkuEvent)
-            .where(SkuEvent.sku_id == sku_id)
-            .order_by(SkuEvent.observed_at.desc())
-        ).all()
-
-    inferred_status = events[0].event_type if events else "UNKNOWN"
-    last_location = events[0].location if events else None
-
-    return TimelineResponse(
-        sku=sku,
-        events=events,
-        inferred_status=inferred_status,
-        last_known_location=last_location,
-    )
+        sku_ids = {sku_id for sku_id, _ in shipments}
+        known = set(session.exec(select(Sku.id).where(Sku.id.in_(sku_ids))).all()) if sku_ids else set()
+        for index, (sku_id, _) in enumerate(shipments):
+            if sku_id not in known:
+                outcomes[index] = ([], 0, f"SKU {sku_id} not found")
+
+        accepted = [index for index, (sku_id, _) in enumerate(shipments) if sku_id in known]
+        for start in range(0, len(accepted), chunk_size):
+            chunk = accepted[start:start + chunk_size]
+            now = datetime.utcnow()
+            written = {}
+            try:
+                stored: List[dict] = []
+                for index in chunk:
+                    sku_id, payloads = shipments[index]
+                    pending = _unseen_payloads(sku_id, payloads)
+                    created, rows = _insert_tracked(session, pending.values(), now)
+                    stored.extend(rows)
+                    written[index] = (pending, created)
+                _advance_latest(session, stored)
+                session.commit()
+            except Exception as exc:
+                session.rollback()
+                for index in chunk:
+                    outcomes[index] = ([], 0, str(exc))
+                continue
+            for index, (pending, created) in written.items():
+                sku_id, payloads = shipments[index]
+                seen_event_keys.add(sku_id, pending)
+                if created:
+                    timeline_cache.invalidate(sku_id)
+                outcomes[index] = (created, len(payloads) - len(created), None)
+    return outcomes
+
+
+def _unseen_payloads(sku_id: int, payloads: List[SkuEventCreate]) -> Dict[str, SkuEventCreate]:
+    fresh = set(seen_event_keys.unseen(sku_id, (payload.content_key for payload in payloads)))
+    return {payload.content_key: payload for payload in payloads if payload.content_key in fresh}
+
+
+def _insert_tracked(
+    session: Session, payloads: Iterable[SkuEventCreate], now: datetime
+) -> Tuple[List[SkuEvent], List[dict]]:
+    # ON CONFLICT DO NOTHING per event; returns the created events and their rows.
+    dialect = session.get_bind().dialect.name
+    created: List[SkuEvent] = []
+    stored: List[dict] = []
+    if event_store is not None:
+        # The unique index only spans one partition; see PartitionedEventStore.
+        payloads = list(payloads)
+        known = event_store.stored_keys(session, ((payload.sku_id, payload.content_key) for payload in payloads))
+        payloads = [payload for payload in payloads if (payload.sku_id, payload.content_key) not in known]
+    for payload in payloads:
+        row = _event_row(payload, now)
+        if event_store is not None:
+            event_id = event_store.insert_one(session, row, skip_duplicates=True)
+        else:
+            statement = insert_skipping_duplicates(SkuEvent.__table__, dialect)
+            event_id = session.execute(statement.values(**row).returning(SkuEvent.id)).scalar()
+        if event_id is not None:
+            stored.append(row)
+            created.append(SkuEvent(id=event_id, **row))
+    return created, stored
+
+
+def record_events_bulk(
+    payloads: List[Tuple[int, SkuEventCreate]],
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> Tuple[int, int, List[BulkEventError]]:
+    """Insert many validated events, keyed by their index in the request.
+
+    Rows for unknown SKUs are rejected up front; the rest are written with
+    one executemany insert per chunk, each chunk in its own transaction, so
+    a failing chunk does not abort the others. Rows whose content_key is
+    already stored for the SKU are skipped and counted as duplicates.
+    Returns (accepted, duplicates, errors).
+    """
+    errors: List[BulkEventError] = []
+    accepted = 0
+    duplicates = 0
+
+    with get_session() as session:
+        sku_ids = {payload.sku_id for _, payload in payloads}
+        known = set(session.exec(select(Sku.id).where(Sku.id.in_(sku_ids))).all()) if sku_ids else set()
+
+        rows = []
+        for index, payload in payloads:
+            if payload.sku_id not in known:
+                errors.append(BulkEventError(index=index, error=f"SKU {payload.sku_id} not found"))
+                continue
+            rows.append((index, _event_row(payload, datetime.utcnow())))
+
+        dialect = session.get_bind().dialect.name
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                if event_store is not None:
+                    written = event_store.insert_many(session, (row for _, row in chunk))
+                else:
+                    statement = insert_skipping_duplicates(SkuEvent.__table__, dialect)
+                    written = session.execute(statement, [row for _, row in chunk]).rowcount
+                _advance_latest(session, [row for _, row in chunk])
+                session.commit()
+                accepted += written
+                duplicates += len(chunk) - written
+                for sku_id in {row["sku_id"] for _, row in chunk}:
+                    timeline_cache.invalidate(sku_id)
+            except Exception as exc:
+                session.rollback()
+                errors.extend(BulkEventError(index=index, error=str(exc)) for index, _ in chunk)
 
+    errors.sort(key=lambda err: err.index)
+    return accepted, duplicates, errors
 
-def search_skus(query: str) -> List[Sku]:
-    # Placeholder implementation until OpenSearch is wired.
+
+def get_sku_timeline(
+    sku_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = DEFAULT_TIMELINE_LIMIT,
+    cursor: Optional[str] = None,
+) -> Optional[dict]:
+    """Return one page of a SKU's events, newest first, shaped like TimelineResponse.
+
+    `since`/`until` bound observed_at (inclusive/exclusive); `cursor` is the
+    `next_cursor` of the previous page. Raises InvalidCursorError for a bad cursor.
+    Status and location come from the SKU's materialized columns. Rows are
+    projected straight into dicts, ready for `app.core.serialization.dumps`.
+    """
+    with get_session() as session:
+        return _load_timeline(session, sku_id, since, until, limit, cursor)
+
+
+async def get_sku_timeline_async(
+    sku_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = DEFAULT_TIMELINE_LIMIT,
+    cursor: Optional[str] = None,
+) -> Optional[dict]:
+    """get_sku_timeline on the async engine, without a worker thread."""
+    async with get_async_session() as session:
+        return await session.run_sync(_load_timeline, sku_id, since, until, limit, cursor)
+
+
+def _load_timeline(
+    session: Session,
+    sku_id: int,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    limit: int,
+    cursor: Optional[str],
+) -> Optional[dict]:
+    # Shared by the sync and async paths; under AsyncSession.run_sync the
+    # queries go through the async driver.
+    sku = _sku_dicts(session, [sku_id]).get(sku_id)
+    if not sku:
+        return None
+
+    before = decode_cursor(cursor) if cursor else None
+    if event_store is not None:
+        events = event_store.timeline(session, sku_id, limit + 1, since=since, until=until, before=before)
+    else:
+        table = SkuEvent.__table__
+        statement = select(*(table.c[name] for name in EVENT_FIELDS)).where(table.c.sku_id == sku_id)
+        if since is not None:
+            statement = statement.where(table.c.observed_at >= since)
+        if until is not None:
+            statement = statement.where(table.c.observed_at < until)
+        if before is not None:
+            statement = statement.where(tuple_(table.c.observed_at, table.c.id) < before)
+        rows = session.execute(
+            statement.order_by(table.c.observed_at.desc(), table.c.id.desc()).limit(limit + 1)
+        )
+        events = [dict(row._mapping) for row in rows]
+
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = encode_cursor(events[-1]["observed_at"], events[-1]["id"])
+
+    return {
+        "sku": sku,
+        "events": events,
+        "inferred_status": sku["current_status"] or "UNKNOWN",
+        "last_known_location": sku["last_location"],
+        "next_cursor": next_cursor,
+    }
+
+
+def _sku_dicts(session: Session, ids: List[int]) -> Dict[int, dict]:
+    """SkuRead-shaped dicts (identities included) for the given ids, by id."""
+    sku_table, identity_table = Sku.__table__, SkuIdentity.__table__
+    rows = session.execute(select(*(sku_table.c[name] for name in SKU_FIELDS)).where(sku_table.c.id.in_(ids)))
+    skus = {row.id: {**row._mapping, "identities": []} for row in rows}
+    if skus:
+        rows = session.execute(
+            select(identity_table.c.sku_id, *(identity_table.c[name] for name in IDENTITY_FIELDS))
+            .where(identity_table.c.sku_id.in_(list(skus)))
+            .order_by(identity_table.c.id)
+        )
+        for row in rows:
+            identity = dict(row._mapping)
+            skus[identity.pop("sku_id")]["identities"].append(identity)
+    return skus
+
+
+def list_skus(
+    status: Optional[str] = None,
+    location: Optional[str] = None,
+    limit: int = DEFAULT_TIMELINE_LIMIT,
+    after_id: Optional[int] = None,
+) -> List[Sku]:
+    """List SKUs by materialized current status / last location, in id order."""
+    statement = select(Sku).options(selectinload(Sku.identities))
+    if status is not None:
+        statement = statement.where(Sku.current_status == status)
+    if location is not None:
+        statement = statement.where(Sku.last_location == location)
+    if after_id is not None:
+        statement = statement.where(Sku.id > after_id)
     with get_session() as session:
-        statement = (
-            select(Sku)
-            .where(Sku.name.ilike(f"%{query}%"))
-            .options(selectinload(Sku.identities))
+        return session.exec(statement.order_by(Sku.id).limit(limit)).all()
+
+
+def backfill_sku_status() -> int:
+    """Recompute every SKU's materialized status from its newest event."""
+    events = event_store.union() if event_store is not None else SkuEvent.__table__
+
+    def newest(column):
+        return (
+            select(events.c[column])
+            .where(events.c.sku_id == Sku.id)
+            .order_by(events.c.observed_at.desc(), events.c.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    with get_session() as session:
+        result = session.execute(
+            update(Sku).values(
+                current_status=newest("event_type"),
+                last_location=newest("location"),
+                last_observed_at=newest("observed_at"),
+            )
         )
-        return session.exec(statement).all()
+        session.commit()
+    timeline_cache.clear()
+    return result.rowcount
+
+
+def search_skus(query: str, limit: int = 20) -> List[dict]:
+    """Ranked SKU search over name, brand, canonical SKU and identifiers, as SkuRead-shaped dicts.
+
+    Served by the in-process trigram index once it is built; falls back to a
+    name ILIKE scan otherwise.
+    """
+    ids = search_index.search(query, limit=limit) if search_index.ready else None
+    with get_session() as session:
+        return _load_search(session, query, limit, ids)
+
+
+async def search_skus_async(query: str, limit: int = 20) -> List[dict]:
+    """search_skus on the async engine; index scoring runs off the event loop."""
+    ids = await asyncio.to_thread(search_index.search, query, limit) if search_index.ready else None
+    async with get_async_session() as session:
+        return await session.run_sync(_load_search, query, limit, ids)
+
+
+def _load_search(session: Session, query: str, limit: int, ids: Optional[List[int]]) -> List[dict]:
+    if ids is None:
+        ids = session.exec(select(Sku.id).where(Sku.name.ilike(f"%{query}%")).limit(limit)).all()
+    if not ids:
+        return []
+    skus = _sku_dicts(session, ids)
+    return [skus[sku_id] for sku_id in ids if sku_id in skus]
@@ -1,14 +1,20 @@
-from rq import Connection, Queue, Worker
+from rq import Connection, Queue, SimpleWorker
 from redis import Redis
 
+from app.connectors.http import http_clients
 from app.core.config import settings
 
 redis = Redis.from_url(settings.redis_url)
 
 def run_worker():
-    with Connection(redis):
-        worker = Worker([Queue("ingestion")])
-        worker.work()
+    # SimpleWorker runs jobs in this process rather than a fork per job, so
+    # connector calls keep reusing the pooled keep-alive connections.
+    try:
+        with Connection(redis):
+            worker = SimpleWorker([Queue("ingestion")])
+            worker.work()
+    finally:
+        http_clients.close()
 
 
 if __name__ == "__main__":
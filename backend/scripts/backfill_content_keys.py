@@ -0,0 +1,103 @@
+"""Add and fill SkuEvent.content_key and its unique (sku_id, content_key) index.
+
+Run once on a database created before carrier events were deduplicated;
+works on the single skuevent table and on any skuevent_YYYYMM partitions.
+For each table it adds the column when missing, keys the carrier events
+stored without one, deletes all but the first copy of each re-polled
+event, then creates the unique index that ON CONFLICT DO NOTHING needs.
+
+The tracking number was never stored on events, so old rows are keyed
+without it. The first poll of a shipment after the upgrade therefore
+stores its history once more under the full key; later polls are
+deduplicated as usual.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/backfill_content_keys.py [--batch 1000]
+"""
+from __future__ import annotations
+
+import argparse
+
+from sqlalchemy import Table, bindparam, delete, func, inspect, select, update
+from sqlmodel import Session
+
+from app.db.session import engine, init_db
+from app.models import SkuEvent
+from app.services.dedup import content_key
+from app.services.event_store import PartitionedEventStore
+
+# Provider names as the shipping connectors store them; USPS scans carry no
+# timestamp (observed_at is the poll time), so their payload is keyed instead.
+CARRIER_PROVIDERS = ("FedEx", "UPS", "USPS")
+UNTIMESTAMPED_PROVIDERS = {"USPS"}
+
+
+def add_column(table: Table) -> None:
+    columns = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    if "content_key" not in columns:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN content_key VARCHAR")
+
+
+def key_rows(table: Table, batch: int) -> int:
+    statement = update(table).where(table.c.id == bindparam("row_id")).values(content_key=bindparam("key"))
+    keyed = 0
+    with Session(engine) as session:
+        while True:
+            rows = session.execute(
+                select(table.c.id, table.c.provider, table.c.event_type, table.c.observed_at,
+                       table.c.location, table.c.payload)
+                .where(table.c.content_key.is_(None), table.c.provider.in_(CARRIER_PROVIDERS))
+                .limit(batch)
+            ).all()
+            if not rows:
+                break
+            session.execute(statement, [
+                {
+                    "row_id": row.id,
+                    "key": content_key(
+                        row.provider,
+                        "",
+                        row.event_type,
+                        None if row.provider in UNTIMESTAMPED_PROVIDERS else row.observed_at,
+                        row.location,
+                        row.payload,
+                    ),
+                }
+                for row in rows
+            ])
+            session.commit()
+            keyed += len(rows)
+    return keyed
+
+
+def remove_duplicates(table: Table) -> int:
+    first = (
+        select(func.min(table.c.id))
+        .where(table.c.content_key.is_not(None))
+        .group_by(table.c.sku_id, table.c.content_key)
+    )
+    with engine.begin() as conn:
+        return conn.execute(
+            delete(table).where(table.c.content_key.is_not(None), table.c.id.not_in(first))
+        ).rowcount
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    init_db()
+    store = PartitionedEventStore(engine)
+    for table in [SkuEvent.__table__, *map(store.table, store.periods())]:
+        add_column(table)
+        keyed = key_rows(table, args.batch)
+        removed = remove_duplicates(table)
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+        print(f"{table.name}: keyed {keyed} event(s), removed {removed} duplicate(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Add and fill the normalized SkuIdentity.resolution_key column used by POST /skus/resolve.
+
+Run once on a database created before the column existed; adds the column
+and its index when missing, then keys every identity stored without one.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/backfill_resolution_keys.py
+"""
+from __future__ import annotations
+
+from sqlalchemy import inspect
+
+from app.db.session import engine, init_db
+from app.models import SkuIdentity
+from app.services.resolution import backfill_resolution_keys
+
+
+def main() -> None:
+    init_db()
+    columns = {column["name"] for column in inspect(engine).get_columns("skuidentity")}
+    if "resolution_key" not in columns:
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ALTER TABLE skuidentity ADD COLUMN resolution_key VARCHAR")
+    for index in SkuIdentity.__table__.indexes:
+        index.create(engine, checkfirst=True)
+    print(f"Keyed {backfill_resolution_keys()} identity row(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Add and fill the materialized current_status / last_location / last_observed_at
+columns on every SKU from its newest event.
+
+Run once on a database created before the columns existed; adds the columns
+and their indexes when missing, then recomputes every SKU.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/backfill_sku_status.py
+"""
+from __future__ import annotations
+
+from sqlalchemy import inspect
+
+from app.db.session import engine, init_db
+from app.models import Sku
+from app.services.tracking import backfill_sku_status
+
+STATUS_COLUMNS = ("current_status", "last_location", "last_observed_at")
+
+
+def main() -> None:
+    init_db()
+    existing = {column["name"] for column in inspect(engine).get_columns("sku")}
+    with engine.begin() as conn:
+        for name in STATUS_COLUMNS:
+            if name not in existing:
+                column_type = Sku.__table__.c[name].type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE sku ADD COLUMN {name} {column_type}")
+    for index in Sku.__table__.indexes:
+        index.create(engine, checkfirst=True)
+    print(f"Updated {backfill_sku_status()} SKU(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Load-test the timeline and search read paths: sync `def` (threadpool) vs `async def`.
+
+Starts a uvicorn server exposing both variants of each endpoint over the
+same service code (the timeline cache is bypassed so every request hits
+the database), then drives it with many concurrent clients and reports
+requests/sec and latency percentiles.
+
+Runs against a scratch SQLite database unless DATABASE_URL is set. A local
+SQLite query returns in microseconds, so `--db-latency-ms` adds a simulated
+network round trip to every statement (blocking on the sync engine, awaited
+on the async engine), which is where the threadpool runs dry against a
+remote PostgreSQL.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/bench_async_endpoints.py [--concurrency 100] [--seconds 10] [--db-latency-ms 5]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+_TMP_DIR = tempfile.mkdtemp(prefix="async-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.util import await_only  # noqa: E402
+
+from app.db.session import async_engine, engine  # noqa: E402
+from app.services import tracking  # noqa: E402
+from app.services.search_index import search_index  # noqa: E402
+
+
+def _add_db_latency(delay: float) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def sync_round_trip(*_):
+        time.sleep(delay)
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def async_round_trip(*_):
+        # Runs inside SQLAlchemy's greenlet, so this yields to the event loop.
+        await_only(asyncio.sleep(delay))
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_: FastAPI):
+    search_index.build(engine)
+    delay = float(os.environ.get("BENCH_DB_LATENCY_MS", "0")) / 1000
+    if delay:
+        _add_db_latency(delay)
+    yield
+
+
+bench_app = FastAPI(lifespan=lifespan)
+
+
+@bench_app.get("/sync/timeline/{sku_id}")
+def sync_timeline(sku_id: int):
+    return tracking.get_sku_timeline(sku_id, limit=50)
+
+
+@bench_app.get("/async/timeline/{sku_id}")
+async def async_timeline(sku_id: int):
+    return await tracking.get_sku_timeline_async(sku_id, limit=50)
+
+
+@bench_app.get("/sync/search")
+def sync_search(q: str):
+    return tracking.search_skus(q)
+
+
+@bench_app.get("/async/search")
+async def async_search(q: str):
+    return await tracking.search_skus_async(q)
+
+
+def _seed(skus: int, events_per_sku: int) -> None:
+    from sqlalchemy import insert
+    from sqlmodel import Session, select
+
+    from app.db.session import engine, init_db
+    from app.models import Sku, SkuEvent
+
+    init_db()
+    with Session(engine) as session:
+        if session.exec(select(Sku.id).limit(1)).first() is not None:
+            return
+        session.execute(
+            insert(Sku),
+            [{"id": i, "canonical_sku": f"BENCH-{i}", "name": f"Bench widget {i}"} for i in range(1, skus + 1)],
+        )
+        session.execute(
+            insert(SkuEvent),
+            [
+                {
+                    "sku_id": sku_id,
+                    "event_type": "SCANNED",
+                    "provider": "Bench",
+                    "location": f"DC-{n % 7}",
+                    "payload": {"n": n},
+                }
+                for sku_id in range(1, skus + 1)
+                for n in range(events_per_sku)
+            ],
+        )
+        session.commit()
+
+
+async def _drive(base: str, path: str, make_url, concurrency: int, seconds: float) -> Tuple[List[float], int]:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60) as client:
+        async def worker(seed: int) -> None:
+            nonlocal errors
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    resp = await client.get(make_url(path, rng))
+                    resp.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies, errors
+
+
+def _report(label: str, latencies: List[float], errors: int, seconds: float) -> None:
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    print(
+        f"{label:<18}{len(latencies) / seconds:>10,.0f}{pct(0.50):>10.1f}{pct(0.95):>10.1f}{pct(0.99):>10.1f}"
+        f"{errors:>8}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--skus", type=int, default=2000)
+    parser.add_argument("--events-per-sku", type=int, default=50)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    _seed(args.skus, args.events_per_sku)
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "scripts.bench_async_endpoints:bench_app",
+            "--port", str(args.port), "--log-level", "warning",
+        ],
+        env={**os.environ, "PYTHONPATH": os.getcwd(), "BENCH_DB_LATENCY_MS": str(args.db_latency_ms)},
+    )
+    base = f"http://127.0.0.1:{args.port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"{base}/docs", timeout=1)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+
+        def timeline_url(path: str, rng: random.Random) -> str:
+            return f"{path}/{rng.randint(1, args.skus)}"
+
+        def search_url(path: str, rng: random.Random) -> str:
+            return f"{path}?q=widget%20{rng.randint(1, args.skus)}"
+
+        print(
+            f"concurrency={args.concurrency}, {args.seconds:.0f}s per run, "
+            f"+{args.db_latency_ms:g} ms per statement"
+        )
+        print(f"{'path':<18}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for name, make_url in (("timeline", timeline_url), ("search", search_url)):
+            for mode in ("sync", "async"):
+                path = f"/{mode}/{name}"
+                latencies, errors = asyncio.run(_drive(base, path, make_url, args.concurrency, args.seconds))
+                _report(f"{mode} {name}", latencies, errors, args.seconds)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compare event ingestion throughput: one POST per event vs. POST /events:bulk.
+
+Runs against a scratch SQLite database unless DATABASE_URL is set.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/bench_bulk_events.py [--events 5000] [--skus 50]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+_TMP_DIR = tempfile.mkdtemp(prefix="bulk-events-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def _events(count: int, skus: int):
+    return [
+        {
+            "sku_id": 1 + i % skus,
+            "event_type": "SCANNED",
+            "provider": "Bench",
+            "location": f"DC-{i % 17}",
+            "payload": {"seq": i},
+        }
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--skus", type=int, default=50)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    prefix = settings.api_v1_prefix
+    for i in range(args.skus):
+        client.post(f"{prefix}/skus", json={"canonical_sku": f"BENCH-{i}", "name": f"Bench SKU {i}"})
+    events = _events(args.events, args.skus)
+
+    start = time.perf_counter()
+    for event in events:
+        client.post(f"{prefix}/skus/{event['sku_id']}/events", json=event)
+    single = time.perf_counter() - start
+
+    body = "\n".join(json.dumps(event) for event in events)
+    start = time.perf_counter()
+    resp = client.post(
+        f"{prefix}/events:bulk", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    bulk = time.perf_counter() - start
+    assert resp.json()["accepted"] == args.events, resp.json()
+
+    print(f"{'path':<28}{'events/sec':>12}")
+    print(f"{'POST /skus/{id}/events':<28}{args.events / single:>12,.0f}")
+    print(f"{'POST /events:bulk (ndjson)':<28}{args.events / bulk:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
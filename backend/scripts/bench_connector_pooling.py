@@ -0,0 +1,138 @@
+"""Compare per-call connector HTTP latency: a new connection per call vs. the pooled client registry.
+
+Starts a local stub provider (plain HTTP and, with openssl available, HTTPS
+with a throwaway self-signed certificate) and times sequential GETs made the
+way the connectors used to (`httpx.get` per call) against the shared
+keep-alive clients from `app.connectors.http`. `--rtt-ms` simulates network
+round trips on the stub: one per request, plus one per new connection for
+the TCP handshake and one more for the TLS handshake.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/bench_connector_pooling.py [--calls 300] [--rtt-ms 0]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+_TMP_DIR = tempfile.mkdtemp(prefix="pooling-bench-")
+
+import httpx  # noqa: E402
+
+from app.connectors.http import http_clients  # noqa: E402
+
+BODY = b'{"output": {"completeTrackResults": []}}'
+
+
+class StubProvider(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, rtt: float, tls: Optional[ssl.SSLContext]) -> None:
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.rtt = rtt
+        self.tls = tls
+        self.connections = 0
+
+    def finish_request(self, request, client_address) -> None:
+        # Runs in the per-connection thread, so handshakes do not serialize accepts.
+        self.connections += 1
+        time.sleep(self.rtt)  # TCP handshake
+        if self.tls is not None:
+            time.sleep(self.rtt)
+            request = self.tls.wrap_socket(request, server_side=True)
+        super().finish_request(request, client_address)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # Headers and body go out in separate writes; without TCP_NODELAY a
+    # reused connection stalls ~40 ms on delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        time.sleep(self.server.rtt)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+
+def _self_signed() -> Optional[ssl.SSLContext]:
+    if shutil.which("openssl") is None:
+        return None
+    cert, key = os.path.join(_TMP_DIR, "cert.pem"), os.path.join(_TMP_DIR, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-keyout", key, "-out", cert, "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    # httpx trusts SSL_CERT_FILE (trust_env), for both per-call and pooled clients.
+    os.environ["SSL_CERT_FILE"] = cert
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def _time_calls(call, calls: int) -> List[float]:
+    call()  # warm-up (and, for the pool, the first connection)
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call().raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--rtt-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    servers = [("http", StubProvider(args.rtt_ms / 1000, None))]
+    tls = _self_signed()
+    if tls is not None:
+        servers.append(("https", StubProvider(args.rtt_ms / 1000, tls)))
+    else:
+        print("openssl not found; skipping HTTPS")
+
+    print(f"{args.calls} sequential calls, simulated rtt {args.rtt_ms:g} ms, http2={http_clients.http2}")
+    print(f"{'scheme':<8}{'mode':<10}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'connections':>13}")
+    for scheme, server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"{scheme}://127.0.0.1:{server.server_address[1]}/track"
+        client = http_clients.client(url)
+        for mode, call in (
+            ("per-call", lambda: httpx.get(url, timeout=30.0)),
+            ("pooled", lambda: client.get(url)),
+        ):
+            before = server.connections
+            latencies = _time_calls(call, args.calls)
+            p50 = latencies[len(latencies) // 2]
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(
+                f"{scheme:<8}{mode:<10}{sum(latencies) / len(latencies):>10.2f}{p50:>10.2f}{p99:>10.2f}"
+                f"{server.connections - before:>13}"
+            )
+        server.shutdown()
+    http_clients.close()
+
+
+if __name__ == "__main__":
+    main()
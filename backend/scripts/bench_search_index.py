@@ -0,0 +1,107 @@
+"""Compare SKU search latency: name ILIKE scan vs. the in-process trigram index.
+
+Seeds a scratch SQLite database with synthetic SKUs (unless DATABASE_URL is
+set), builds the index and times a mix of exact, prefix and misspelled queries.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/bench_search_index.py [--skus 1000000] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+_TMP_DIR = tempfile.mkdtemp(prefix="search-index-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}")
+os.environ.setdefault("SEARCH_INDEX_ENABLED", "false")  # built explicitly below
+
+from sqlalchemy import insert  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+from app.db.session import engine, init_db  # noqa: E402
+from app.models import Sku, SkuIdentity  # noqa: E402
+from app.services.search_index import SkuSearchIndex  # noqa: E402
+
+BRANDS = [
+    "Acme", "Bosch", "Makita", "DeWalt", "Ryobi", "Stanley", "Milwaukee", "Hitachi", "Festool", "Metabo",
+    "Hilti", "Craftsman", "Kobalt", "Ridgid", "Porter", "Skil", "Black Decker", "Worx", "Einhell", "Fein",
+]
+NOUNS = [
+    "drill", "hammer", "saw", "wrench", "sander", "grinder", "router", "level", "clamp", "chisel",
+    "planer", "jigsaw", "nailer", "stapler", "screwdriver", "socket", "ratchet", "pliers", "vise", "file",
+    "multimeter", "flashlight", "toolbox", "workbench", "compressor", "heat gun", "glue gun", "trowel",
+]
+ADJECTIVES = [
+    "cordless", "compact", "heavy duty", "brushless", "pro", "mini", "industrial", "rotary", "magnetic",
+    "adjustable", "folding", "digital", "oscillating", "impact", "precision", "telescopic",
+]
+QUERIES = ["brushless grinder", "makita", "cordles drill", "grnder", "SKU-0004242", "hamm", "festool planer"]
+
+
+def _seed(count: int, batch: int = 50_000) -> None:
+    rng = random.Random(7)
+    with Session(engine) as session:
+        if session.exec(select(Sku.id).limit(1)).first() is not None:
+            return
+        for start in range(0, count, batch):
+            skus, identities = [], []
+            for i in range(start, min(start + batch, count)):
+                brand = rng.choice(BRANDS)
+                model = f"{rng.choice('ABCDEFGHJKLMNPRSTX')}{rng.choice('ABCDEFGHJKLMNPRSTX')}{rng.randint(10, 9999)}"
+                skus.append(
+                    {
+                        "id": i + 1,
+                        "canonical_sku": f"SKU-{i:07d}",
+                        "name": f"{brand} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {model}",
+                        "brand": brand,
+                    }
+                )
+                identities.append({"sku_id": i + 1, "provider": "gtin", "identifier": f"{rng.randrange(10**13):014d}"})
+            session.execute(insert(Sku), skus)
+            session.execute(insert(SkuIdentity), identities)
+            session.commit()
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skus", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    init_db()
+    start = time.perf_counter()
+    _seed(args.skus)
+    print(f"seeded {args.skus:,} SKUs in {time.perf_counter() - start:.1f}s")
+
+    index = SkuSearchIndex()
+    start = time.perf_counter()
+    index.build(engine)
+    print(f"built index over {len(index):,} SKUs in {time.perf_counter() - start:.1f}s\n")
+
+    print(f"{'query':<20}{'ILIKE ms':>10}{'hits':>8}{'index ms':>10}{'top hit':>40}")
+    with Session(engine) as session:
+        for query in QUERIES:
+            def ilike():
+                # The previous search_skus: unranked, unbounded name scan.
+                return session.exec(select(Sku.id).where(Sku.name.ilike(f"%{query}%"))).all()
+
+            ilike_ms = _time(ilike, args.repeat)
+            hits = len(ilike())
+            index_ms = _time(lambda: index.search(query), args.repeat)
+            ids = index.search(query)
+            top = session.get(Sku, ids[0]).name if ids else "-"
+            print(f"{query:<20}{ilike_ms:>10.1f}{hits:>8}{index_ms:>10.1f}{top:>40}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Measure per-event serialization cost of a timeline page: ORM + pydantic vs. row projection + orjson.
+
+"before" is the previous read path: ORM objects, TimelineResponse built with
+from_attributes, model_dump(mode="json") for the cache, then FastAPI's
+response_model re-validation and json.dumps. "after" projects rows straight
+into dicts and encodes them once with orjson. Both include the database
+reads; the "encode" columns time only the serialization step on
+already-loaded data.
+
+Runs against a scratch SQLite database unless DATABASE_URL is set.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/bench_timeline_serialization.py [--events 1000] [--repeat 50]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_TMP_DIR = tempfile.mkdtemp(prefix="serialization-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}")
+os.environ.setdefault("SEARCH_INDEX_ENABLED", "false")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+from app.core.serialization import dumps  # noqa: E402
+from app.db.session import engine, init_db  # noqa: E402
+from app.models import Sku, SkuEvent, SkuIdentity  # noqa: E402
+from app.schemas.sku import SkuEventRead, SkuRead, TimelineResponse  # noqa: E402
+from app.services import tracking  # noqa: E402
+
+SKU_ID = 1
+_response_adapter = TypeAdapter(TimelineResponse)
+
+
+def _seed(events: int) -> None:
+    init_db()
+    with Session(engine) as session:
+        if session.get(Sku, SKU_ID) is not None:
+            return
+        session.execute(insert(Sku), [{"id": SKU_ID, "canonical_sku": "BENCH-1", "name": "Bench widget"}])
+        session.execute(
+            insert(SkuIdentity),
+            [{"sku_id": SKU_ID, "provider": "gtin", "identifier": f"{n:014d}"} for n in range(3)],
+        )
+        start = datetime(2024, 1, 1)
+        session.execute(
+            insert(SkuEvent),
+            [
+                {
+                    "sku_id": SKU_ID,
+                    "event_type": "IN_TRANSIT",
+                    "provider": "FedEx",
+                    "location": f"Hub {n % 40}",
+                    "payload": {"status": "In transit", "scan": n, "detail": {"facility": f"F{n % 40}"}},
+                    "observed_at": start + timedelta(minutes=n),
+                    "content_key": f"{n:032x}",
+                }
+                for n in range(events)
+            ],
+        )
+        session.commit()
+
+
+def _orm_timeline(session: Session, limit: int) -> TimelineResponse:
+    # The read path before rows were projected to dicts.
+    sku = session.exec(select(Sku).where(Sku.id == SKU_ID).options(selectinload(Sku.identities))).one()
+    events = session.exec(
+        select(SkuEvent)
+        .where(SkuEvent.sku_id == SKU_ID)
+        .order_by(SkuEvent.observed_at.desc(), SkuEvent.id.desc())
+        .limit(limit)
+    ).all()
+    return TimelineResponse(
+        sku=SkuRead.model_validate(sku),
+        events=[SkuEventRead.model_validate(event) for event in events],
+        inferred_status=sku.current_status or "UNKNOWN",
+        last_known_location=sku.last_location,
+    )
+
+
+def _encode_before(timeline: TimelineResponse) -> bytes:
+    cached = timeline.model_dump(mode="json")
+    # What FastAPI's response_model does with the endpoint's return value.
+    validated = _response_adapter.validate_python(cached)
+    content = jsonable_encoder(_response_adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _per_event_us(fn, repeat: int, events: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat / events * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    _seed(args.events)
+    limit = min(args.events, tracking.MAX_TIMELINE_LIMIT)
+
+    with Session(engine) as session:
+        def before():
+            return _encode_before(_orm_timeline(session, limit))
+
+        def after():
+            return dumps(tracking._load_timeline(session, SKU_ID, None, None, limit, None))
+
+        loaded_orm = _orm_timeline(session, limit)
+        loaded_rows = tracking._load_timeline(session, SKU_ID, None, None, limit, None)
+        assert json.loads(before())["events"] == json.loads(after())["events"]
+
+        results = []
+        for label, full, encode in (
+            ("before", before, lambda: _encode_before(loaded_orm)),
+            ("after", after, lambda: dumps(loaded_rows)),
+        ):
+            results.append(
+                (label, _per_event_us(full, args.repeat, limit), _per_event_us(encode, args.repeat, limit))
+            )
+
+    print(f"{limit} events per page, {args.repeat} runs")
+    print(f"{'path':<10}{'total us/event':>16}{'encode us/event':>18}")
+    for label, total, encode in results:
+        print(f"{label:<10}{total:>16.2f}{encode:>18.2f}")
+    print(f"speedup   {results[0][1] / results[1][1]:>15.1f}x{results[0][2] / results[1][2]:>17.1f}x")
+
+
+if __name__ == "__main__":
+    main()
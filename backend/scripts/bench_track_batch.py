@@ -0,0 +1,172 @@
+"""Compare shipment sync throughput: one POST /connectors/track per shipment vs. POST /connectors/track:batch.
+
+Starts a local stub carrier (FedEx, UPS and USPS endpoints, each request
+delayed by `--carrier-latency-ms`), seeds SKUs in a scratch SQLite database
+(unless DATABASE_URL is set) and syncs the same shipments both ways,
+reporting shipments/minute and the number of carrier requests made. The
+batch run is repeated to show re-polls being stored as duplicates only.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/bench_track_batch.py [--shipments 600] [--carrier-latency-ms 50]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.etree import ElementTree
+
+_TMP_DIR = tempfile.mkdtemp(prefix="track-batch-")
+ThreadingHTTPServer.daemon_threads = True
+ThreadingHTTPServer.request_queue_size = 256
+_SERVER = ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+_BASE = f"http://127.0.0.1:{_SERVER.server_address[1]}"
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}")
+os.environ.setdefault("SEARCH_INDEX_ENABLED", "false")
+for name, value in {
+    "FEDEX_CLIENT_ID": "bench",
+    "FEDEX_CLIENT_SECRET": "bench",
+    "FEDEX_BASE_URL": _BASE,
+    "UPS_CLIENT_ID": "bench",
+    "UPS_CLIENT_SECRET": "bench",
+    "UPS_BASE_URL": _BASE,
+    "USPS_USER_ID": "bench",
+    "USPS_BASE_URL": f"{_BASE}/ShippingAPI.dll",
+}.items():
+    os.environ[name] = value
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+from app.db.session import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Sku  # noqa: E402
+
+PROVIDERS = ("fedex", "ups", "usps")
+EVENTS_PER_SHIPMENT = 3
+requests_by_kind: Counter = Counter()
+_latency = 0.0
+
+
+def _scans(number: str) -> list:
+    return [
+        {"eventType": f"E{n}", "date": f"2024-05-0{n + 1}T10:00:00", "scanLocation": {"city": f"Hub {n}"}, "n": number}
+        for n in range(EVENTS_PER_SHIPMENT)
+    ]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, body: bytes, content_type: str = "application/json") -> None:
+        time.sleep(_latency)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path.endswith("/oauth/token"):
+            requests_by_kind["token"] += 1
+            self._send(json.dumps({"access_token": "t", "expires_in": 3600}).encode())
+            return
+        requests_by_kind["fedex"] += 1
+        numbers = [info["trackingNumberInfo"]["trackingNumber"] for info in json.loads(body)["trackingInfo"]]
+        results = [{"trackingNumber": n, "trackResults": [{"scanEvents": _scans(n)}]} for n in numbers]
+        self._send(json.dumps({"output": {"completeTrackResults": results}}).encode())
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path.startswith("/api/track/v1/details/"):
+            requests_by_kind["ups"] += 1
+            number = url.path.rsplit("/", 1)[1]
+            activity = [
+                {"status": {"type": scan["eventType"]}, "dateTime": scan["date"], "location": {"address": {"city": "X"}}}
+                for scan in _scans(number)
+            ]
+            self._send(json.dumps({"trackResponse": {"shipment": [{"package": [{"activity": activity}]}]}}).encode())
+            return
+        requests_by_kind["usps"] += 1
+        request = ElementTree.fromstring(parse_qs(url.query)["XML"][0])
+        infos = "".join(
+            f'<TrackInfo ID="{track.get("ID")}">'
+            + "".join(f"<TrackDetail>{track.get('ID')} scan {n}</TrackDetail>" for n in range(EVENTS_PER_SHIPMENT))
+            + "</TrackInfo>"
+            for track in request.findall("TrackID")
+        )
+        self._send(f"<TrackResponse>{infos}</TrackResponse>".encode(), "text/xml")
+
+
+def _seed(count: int) -> None:
+    with Session(engine) as session:
+        session.execute(
+            insert(Sku), [{"id": i, "canonical_sku": f"TRACK-{i}", "name": f"Tracked {i}"} for i in range(1, count + 1)]
+        )
+        session.commit()
+
+
+def main() -> None:
+    global _latency
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shipments", type=int, default=600)
+    parser.add_argument("--carrier-latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    _SERVER.RequestHandlerClass = Handler
+    threading.Thread(target=_SERVER.serve_forever, daemon=True).start()
+    _latency = args.carrier_latency_ms / 1000
+
+    client = TestClient(app)
+    _seed(args.shipments * 2)
+    single = [
+        {"sku_id": i + 1, "tracking_number": f"S{i:08d}", "provider": PROVIDERS[i % 3]} for i in range(args.shipments)
+    ]
+    batch = [
+        {"sku_id": args.shipments + i + 1, "tracking_number": f"B{i:08d}", "provider": PROVIDERS[i % 3]}
+        for i in range(args.shipments)
+    ]
+
+    print(f"{args.shipments} shipments ({EVENTS_PER_SHIPMENT} events each), carrier latency {args.carrier_latency_ms:g} ms")
+    print(f"{'mode':<16}{'seconds':>9}{'shipments/min':>15}{'new':>8}{'dups':>8}{'failed':>8}  carrier requests")
+
+    def report(label: str, seconds: float, new: int, duplicates: int, failed: int) -> None:
+        carrier = ", ".join(f"{kind}={count}" for kind, count in sorted(requests_by_kind.items()))
+        print(f"{label:<16}{seconds:>9.2f}{args.shipments / seconds * 60:>15,.0f}{new:>8}{duplicates:>8}{failed:>8}  {carrier}")
+        requests_by_kind.clear()
+
+    start = time.perf_counter()
+    new = duplicates = failed = 0
+    for shipment in single:
+        resp = client.post("/api/v1/connectors/track", json=shipment)
+        if resp.status_code != 200:
+            failed += 1
+            continue
+        new += resp.json()["new"]
+        duplicates += resp.json()["duplicates"]
+    report("one per call", time.perf_counter() - start, new, duplicates, failed)
+
+    for label in ("track:batch", "track:batch again"):
+        start = time.perf_counter()
+        resp = client.post("/api/v1/connectors/track:batch", json={"shipments": batch})
+        resp.raise_for_status()
+        body = resp.json()
+        report(label, time.perf_counter() - start, body["new"], body["duplicates"], body["failed"])
+
+    _SERVER.shutdown()
+
+
+if __name__ == "__main__":
+    main()
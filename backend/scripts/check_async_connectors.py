@@ -0,0 +1,315 @@
+"""Check the async connectors and the catalog aggregator against local mock provider servers.
+
+Starts one stub server per provider on localhost (FedEx, UPS, USPS,
+UPCItemDB, Barcode Lookup) with adjustable latency and failure modes, then
+checks that the async connectors return the same events/products as the
+sync ones, that carrier fan-out does not serialize on the event loop, and
+that the aggregator's "first" and "merge" strategies, failures and timeout
+behave as documented.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/check_async_connectors.py [--latency-ms 100]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, urlparse
+from xml.etree import ElementTree
+
+_TMP_DIR = tempfile.mkdtemp(prefix="async-connectors-")
+ThreadingHTTPServer.daemon_threads = True
+ThreadingHTTPServer.request_queue_size = 256
+# The aggregator cancels losing lookups; their broken pipes are expected.
+ThreadingHTTPServer.handle_error = lambda self, request, client_address: None
+PROVIDERS = ("fedex", "ups", "usps", "upcitemdb", "barcodelookup")
+_SERVERS: Dict[str, ThreadingHTTPServer] = {
+    name: ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler) for name in PROVIDERS
+}
+
+
+def _url(name: str) -> str:
+    return f"http://127.0.0.1:{_SERVERS[name].server_address[1]}"
+
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'check.db')}")
+os.environ.setdefault("SEARCH_INDEX_ENABLED", "false")
+for name, value in {
+    "FEDEX_CLIENT_ID": "check",
+    "FEDEX_CLIENT_SECRET": "check",
+    "FEDEX_BASE_URL": _url("fedex"),
+    "UPS_CLIENT_ID": "check",
+    "UPS_CLIENT_SECRET": "check",
+    "UPS_BASE_URL": _url("ups"),
+    "USPS_USER_ID": "check",
+    "USPS_BASE_URL": f"{_url('usps')}/ShippingAPI.dll",
+    "UPCITEMDB_API_KEY": "check",
+    "UPCITEMDB_BASE_URL": _url("upcitemdb"),
+    "BARCODE_LOOKUP_API_KEY": "check",
+    "BARCODE_LOOKUP_BASE_URL": _url("barcodelookup"),
+}.items():
+    os.environ[name] = value
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.connectors import (  # noqa: E402
+    AsyncBarcodeLookupConnector,
+    AsyncFedExConnector,
+    AsyncUpcItemDbConnector,
+    AsyncUpsConnector,
+    AsyncUspsConnector,
+    BarcodeLookupConnector,
+    CatalogAggregator,
+    ConnectorError,
+    FedExConnector,
+    UpcItemDbConnector,
+    UpsConnector,
+    UspsConnector,
+)
+from app.main import app  # noqa: E402
+
+# Per-provider behaviour, changed between checks: latency in seconds and
+# mode "ok", "empty" (no product found) or "error" (HTTP 500).
+behaviour = {name: {"latency": 0.0, "mode": "ok"} for name in PROVIDERS}
+
+
+def _scans(number: str) -> list:
+    return [{"eventType": f"E{n}", "date": f"2024-05-0{n + 1}T10:00:00", "scanLocation": {"city": f"Hub {n}"}} for n in range(3)]
+
+
+def _handler(provider: str):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def _send(self, status: int, body, content_type: str = "application/json") -> None:
+            data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _respond(self, body: bytes) -> None:
+            settings = behaviour[provider]
+            time.sleep(settings["latency"])
+            url = urlparse(self.path)
+            if url.path.endswith("/oauth/token"):
+                self._send(200, {"access_token": f"{provider}-token", "expires_in": 3600})
+            elif settings["mode"] == "error":
+                self._send(500, {"error": "upstream exploded"})
+            elif provider == "fedex":
+                numbers = [info["trackingNumberInfo"]["trackingNumber"] for info in json.loads(body)["trackingInfo"]]
+                results = [{"trackingNumber": n, "trackResults": [{"scanEvents": _scans(n)}]} for n in numbers]
+                self._send(200, {"output": {"completeTrackResults": results}})
+            elif provider == "ups":
+                activity = [
+                    {"status": {"type": s["eventType"]}, "dateTime": s["date"], "location": {"address": {"city": "X"}}}
+                    for s in _scans(url.path.rsplit("/", 1)[1])
+                ]
+                self._send(200, {"trackResponse": {"shipment": [{"package": [{"activity": activity}]}]}})
+            elif provider == "usps":
+                request = ElementTree.fromstring(parse_qs(url.query)["XML"][0])
+                infos = "".join(
+                    f'<TrackInfo ID="{t.get("ID")}"><TrackDetail>{t.get("ID")} arrived</TrackDetail></TrackInfo>'
+                    for t in request.findall("TrackID")
+                )
+                self._send(200, f"<TrackResponse>{infos}</TrackResponse>", "text/xml")
+            elif provider == "upcitemdb":
+                items = [] if settings["mode"] == "empty" else [
+                    {"title": "Cordless drill", "brand": None, "upc": "012345678905", "description": "18V"}
+                ]
+                self._send(200, {"items": items})
+            else:
+                products = [] if settings["mode"] == "empty" else [
+                    {"product_name": "Drill, cordless", "brand": "Acme", "barcode_number": "012345678905"}
+                ]
+                self._send(200, {"products": products})
+
+        def do_GET(self) -> None:
+            self._respond(b"")
+
+        def do_POST(self) -> None:
+            self._respond(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+
+    return Handler
+
+
+def _check(label: str, ok: bool, detail: str = "") -> bool:
+    print(f"{'PASS' if ok else 'FAIL'}  {label:<52}{detail}")
+    return ok
+
+
+def _shape(events) -> list:
+    # observed_at is the poll time for USPS, so compare everything else.
+    return [(e.event_type, e.provider, e.location, e.payload, e.timestamped) for e in events]
+
+
+def _reset(latency: float = 0.0) -> None:
+    for settings in behaviour.values():
+        settings.update(latency=latency, mode="ok")
+
+
+async def _async_checks(latency: float) -> list:
+    results = []
+    numbers = [f"N{i:04d}" for i in range(25)]
+    carriers = (
+        ("fedex", FedExConnector, AsyncFedExConnector),
+        ("ups", UpsConnector, AsyncUpsConnector),
+        ("usps", UspsConnector, AsyncUspsConnector),
+    )
+    for name, sync_cls, async_cls in carriers:
+        sync_many = await asyncio.to_thread(sync_cls().track_many, numbers)
+        async_many = await async_cls().track_many(numbers)
+        same = [(r.tracking_number, _shape(r.events), r.error) for r in sync_many] == [
+            (r.tracking_number, _shape(r.events), r.error) for r in async_many
+        ]
+        single = _shape(await async_cls().track("N0000")) == _shape(await asyncio.to_thread(sync_cls().track, "N0000"))
+        results.append(_check(f"{name}: async track/track_many match sync", same and single))
+
+    for name, sync_cls, async_cls in (
+        ("upcitemdb", UpcItemDbConnector, AsyncUpcItemDbConnector),
+        ("barcodelookup", BarcodeLookupConnector, AsyncBarcodeLookupConnector),
+    ):
+        same = (await async_cls().lookup("012345678905")) == (await asyncio.to_thread(sync_cls().lookup, "012345678905"))
+        results.append(_check(f"{name}: async lookup matches sync", same))
+
+    # Fan-out: 50 single-number tracks per carrier, all in flight at once.
+    _reset(latency)
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(cls().track(f"F{i}") for cls in (AsyncFedExConnector, AsyncUpsConnector, AsyncUspsConnector) for i in range(50))
+    )
+    elapsed = time.perf_counter() - start
+    results.append(_check(
+        "150 concurrent async tracks overlap",
+        elapsed < latency * 20,
+        f"{elapsed * 1000:.0f} ms (sequential would be {150 * latency * 1000:.0f} ms)",
+    ))
+
+    def aggregator(timeout: float = 5.0) -> CatalogAggregator:
+        return CatalogAggregator(
+            {"upcitemdb": AsyncUpcItemDbConnector(), "barcodelookup": AsyncBarcodeLookupConnector()}, timeout=timeout
+        )
+
+    _reset()
+    behaviour["upcitemdb"]["latency"] = latency * 5
+    behaviour["barcodelookup"]["latency"] = latency
+    start = time.perf_counter()
+    product = await aggregator().lookup("012345678905", strategy="first")
+    elapsed = time.perf_counter() - start
+    results.append(_check(
+        "first: fastest good answer wins",
+        product.sources == ["barcodelookup"] and elapsed < latency * 3,
+        f"sources={product.sources}, {elapsed * 1000:.0f} ms",
+    ))
+
+    behaviour["barcodelookup"]["mode"] = "empty"
+    product = await aggregator().lookup("012345678905", strategy="first")
+    results.append(_check(
+        "first: empty fast answer falls through to slower one",
+        product.sources == ["upcitemdb"] and product.title == "Cordless drill",
+        f"sources={product.sources}",
+    ))
+
+    _reset()
+    product = await aggregator().lookup("012345678905", strategy="merge")
+    results.append(_check(
+        "merge: priority per field, identifiers unioned",
+        product.title == "Cordless drill"
+        and product.brand == "Acme"
+        and set(product.identifiers) == {"upc", "barcode"}
+        and product.sources == ["upcitemdb", "barcodelookup"],
+        f"title={product.title!r}, brand={product.brand!r}, identifiers={sorted(product.identifiers)}",
+    ))
+
+    behaviour["upcitemdb"]["mode"] = "error"
+    product = await aggregator().lookup("012345678905", strategy="merge")
+    results.append(_check("merge: failing provider skipped", product.sources == ["barcodelookup"], f"sources={product.sources}"))
+
+    behaviour["barcodelookup"]["mode"] = "error"
+    try:
+        await aggregator().lookup("012345678905")
+        failed = False
+    except ConnectorError:
+        failed = True
+    results.append(_check("all providers failing raises ConnectorError", failed))
+
+    _reset()
+    behaviour["upcitemdb"]["latency"] = 2.0
+    start = time.perf_counter()
+    product = await aggregator(timeout=0.3).lookup("012345678905", strategy="merge")
+    elapsed = time.perf_counter() - start
+    results.append(_check(
+        "merge: slow provider cut off at timeout",
+        product.sources == ["barcodelookup"] and elapsed < 0.6,
+        f"sources={product.sources}, {elapsed * 1000:.0f} ms",
+    ))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    for name, server in _SERVERS.items():
+        server.RequestHandlerClass = _handler(name)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    results = asyncio.run(_async_checks(args.latency_ms / 1000))
+
+    _reset()
+    with TestClient(app) as client:
+        sku = client.post("/api/v1/skus", json={"canonical_sku": "CHK-1", "name": "Check"}).json()
+        body = client.post(
+            "/api/v1/connectors/track", json={"sku_id": sku["id"], "tracking_number": "T1", "provider": "fedex"}
+        ).json()
+        results.append(_check("POST /connectors/track (async path)", body.get("new") == 3, f"new={body.get('new')}"))
+        body = client.post(
+            "/api/v1/connectors/track:batch",
+            json={"shipments": [
+                {"sku_id": sku["id"], "tracking_number": f"T{i}", "provider": provider}
+                for i, provider in enumerate(("fedex", "ups", "usps"), start=1)
+            ]},
+        ).json()
+        results.append(_check(
+            "POST /connectors/track:batch (async fan-out)",
+            # T1 was already stored by /track; USPS reports one event per number.
+            body.get("new") == 4 and body.get("duplicates") == 3 and body.get("failed") == 0,
+            f"new={body.get('new')}, duplicates={body.get('duplicates')}",
+        ))
+        shipment = {"sku_id": sku["id"], "tracking_number": "T9", "provider": "fedex"}
+        body = client.post("/api/v1/connectors/track:batch", json={"shipments": [shipment, shipment]}).json()
+        results.append(_check(
+            "POST /connectors/track:batch (repeated shipment)",
+            [result["new"] for result in body.get("results", [])] == [3, 3] and body.get("new") == 3,
+            f"new={body.get('new')}, per entry={[result['new'] for result in body.get('results', [])]}",
+        ))
+        body = client.post(
+            "/api/v1/connectors/catalog:aggregate", json={"identifier": "012345678905", "strategy": "merge"}
+        ).json()
+        results.append(_check(
+            "POST /connectors/catalog:aggregate",
+            body.get("sources") == ["upcitemdb", "barcodelookup"],
+            f"sources={body.get('sources')}",
+        ))
+
+    for server in _SERVERS.values():
+        server.shutdown()
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
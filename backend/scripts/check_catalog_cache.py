@@ -0,0 +1,237 @@
+"""Check the catalog lookup cache against local stand-in UPCItemDB and Barcode Lookup servers.
+
+Starts stub catalog providers on localhost that count upstream requests and
+checks that repeat lookups (in any UPC/EAN spelling) are served from cache
+and asked upstream in one canonical spelling while other identifiers keep
+their own spelling, that "not found" is cached for the negative TTL, that
+concurrent misses share one upstream call, that answers survive a restart
+through the database tier, that expired products are served stale while
+one background lookup refreshes them, and that provider errors are not
+cached.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/check_catalog_cache.py [--latency-ms 100] [--concurrency 50]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+_TMP_DIR = tempfile.mkdtemp(prefix="catalog-cache-")
+ThreadingHTTPServer.daemon_threads = True
+ThreadingHTTPServer.request_queue_size = 256
+_SERVER = ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+_BASE = f"http://127.0.0.1:{_SERVER.server_address[1]}"
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'check.db')}")
+os.environ.setdefault("SEARCH_INDEX_ENABLED", "false")
+for name, value in {
+    "UPCITEMDB_API_KEY": "check",
+    "UPCITEMDB_BASE_URL": _BASE,
+    "BARCODE_LOOKUP_API_KEY": "check",
+    "BARCODE_LOOKUP_BASE_URL": _BASE,
+}.items():
+    os.environ[name] = value
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.connectors import (  # noqa: E402
+    AsyncUpcItemDbConnector,
+    BarcodeLookupConnector,
+    UpcItemDbConnector,
+)
+from app.db.session import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.catalog_cache import CatalogCache, catalog_cache  # noqa: E402
+
+UNKNOWN = "099999999993"
+upstream: Counter = Counter()
+asked: list = []  # identifiers sent upstream
+behaviour = {"latency": 0.0, "failing": False, "version": 1}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        provider = "upcitemdb" if url.path.endswith("/lookup") else "barcodelookup"
+        upstream[provider] += 1
+        time.sleep(behaviour["latency"])
+        if behaviour["failing"]:
+            self._send(500, {"error": "quota exceeded"})
+            return
+        code = (query.get("upc") or query.get("barcode"))[0]
+        asked.append(code)
+        title = f"Cordless drill v{behaviour['version']}"
+        if provider == "upcitemdb":
+            self._send(200, {"items": [] if code == UNKNOWN else [{"title": title, "upc": code}]})
+        else:
+            self._send(200, {"products": [] if code == UNKNOWN else [{"product_name": title, "barcode_number": code}]})
+
+
+def _check(label: str, ok: bool, detail: str = "") -> bool:
+    print(f"{'PASS' if ok else 'FAIL'}  {label:<50}{detail}")
+    return ok
+
+
+def _calls(fn) -> int:
+    before = sum(upstream.values())
+    fn()
+    return sum(upstream.values()) - before
+
+
+def _checks(client: TestClient, latency: float, concurrency: int) -> list:
+    results = []
+
+    def lookup(identifier: str, provider: str = "upcitemdb"):
+        resp = client.post("/api/v1/connectors/catalog", json={"identifier": identifier, "provider": provider})
+        resp.raise_for_status()
+        return resp.json()
+
+    start = time.perf_counter()
+    calls = _calls(lambda: lookup("012345678905"))
+    miss_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    repeat = _calls(lambda: [lookup(code) for code in ("012345678905", "0012345678905", "0-12345-67890-5")])
+    hit_ms = (time.perf_counter() - start) * 1000 / 3
+    results.append(_check(
+        "repeat lookups (UPC-A / EAN-13 / hyphenated) hit",
+        calls == 1 and repeat == 0,
+        f"upstream={calls}+{repeat}, miss {miss_ms:.0f} ms, hit {hit_ms:.1f} ms",
+    ))
+
+    asked.clear()
+    calls = _calls(lambda: [lookup(code) for code in ("0012345678967", "12345678967", "012345678967")])
+    results.append(_check(
+        "every spelling asks upstream for the same barcode", calls == 1 and asked == ["012345678967"], f"asked={asked}"
+    ))
+
+    calls = _calls(lambda: [lookup(code) for code in ("ab-1", "AB1", "ab-1")])
+    results.append(_check("non-numeric identifiers keyed as typed", calls == 2, f"upstream={calls}"))
+
+    calls = _calls(lambda: [lookup(UNKNOWN) for _ in range(3)])
+    body = lookup(UNKNOWN)
+    results.append(_check("not found is cached", calls == 1 and body["title"] is None, f"upstream={calls}"))
+
+    async def burst(identifier: str) -> None:
+        await asyncio.gather(
+            *(catalog_cache.lookup_async("upcitemdb", identifier, AsyncUpcItemDbConnector().lookup)
+              for _ in range(concurrency))
+        )
+
+    calls = _calls(lambda: asyncio.run(burst("012345678912")))
+    results.append(_check(f"{concurrency} concurrent async misses coalesce", calls == 1, f"upstream={calls}"))
+
+    def threaded(identifier: str) -> None:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            connector = BarcodeLookupConnector()
+            list(pool.map(
+                lambda _: catalog_cache.lookup("barcodelookup", identifier, connector.lookup),
+                range(concurrency),
+            ))
+
+    calls = _calls(lambda: threaded("012345678929"))
+    results.append(_check(f"{concurrency} concurrent threaded misses coalesce", calls == 1, f"upstream={calls}"))
+
+    catalog_cache.clear()
+    calls = _calls(lambda: lookup("012345678905"))
+    restarted = CatalogCache(engine=engine)
+    calls += _calls(lambda: restarted.lookup("upcitemdb", "012345678905", UpcItemDbConnector().lookup))
+    results.append(_check(
+        "answers survive restart via database tier",
+        calls == 0 and restarted.stats()["persistent_loads"] == 1,
+        f"upstream={calls}",
+    ))
+
+    behaviour["failing"] = True
+    try:
+        lookup("012345678936")
+        failed = False
+    except Exception:
+        failed = True
+    behaviour["failing"] = False
+    calls = _calls(lambda: lookup("012345678936"))
+    results.append(_check("provider errors are not cached", failed and calls == 1, f"upstream after error={calls}"))
+
+    short = CatalogCache(ttl_seconds=0.3, negative_ttl_seconds=0.3, stale_seconds=5, engine=engine)
+    fetch = UpcItemDbConnector().lookup
+    short.lookup("upcitemdb", "012345678943", fetch)
+    time.sleep(0.4)
+    behaviour["version"] = 2
+    before = sum(upstream.values())
+    start = time.perf_counter()
+    stale = short.lookup("upcitemdb", "012345678943", fetch)
+    stale_ms = (time.perf_counter() - start) * 1000
+    again = short.lookup("upcitemdb", "012345678943", fetch)
+    time.sleep(latency * 3)
+    fresh = short.lookup("upcitemdb", "012345678943", fetch)
+    results.append(_check(
+        "expired product served stale, refreshed once",
+        stale.title.endswith("v1") and again.title.endswith("v1") and fresh.title.endswith("v2")
+        and stale_ms < latency * 1000 and sum(upstream.values()) - before == 1,
+        f"stale in {stale_ms:.1f} ms, then {fresh.title!r}, upstream={sum(upstream.values()) - before}",
+    ))
+
+    short.lookup("upcitemdb", UNKNOWN, UpcItemDbConnector().lookup)
+    time.sleep(0.4)
+    calls = _calls(lambda: short.lookup("upcitemdb", UNKNOWN, UpcItemDbConnector().lookup))
+    results.append(_check("not found is refetched after negative TTL", calls == 1, f"upstream={calls}"))
+
+    def aggregate() -> dict:
+        resp = client.post(
+            "/api/v1/connectors/catalog:aggregate", json={"identifier": "012345678950", "strategy": "merge"}
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    calls = _calls(aggregate)
+    repeat = _calls(aggregate)
+    results.append(_check("aggregate lookups use the cache per provider", calls == 2 and repeat == 0, f"upstream={calls}+{repeat}"))
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    _SERVER.RequestHandlerClass = Handler
+    threading.Thread(target=_SERVER.serve_forever, daemon=True).start()
+    behaviour["latency"] = latency
+    with TestClient(app) as client:
+        results = _checks(client, latency, args.concurrency)
+        stats = client.get("/api/v1/connectors/catalog-cache/stats").json()
+    print(f"\ncatalog cache stats: {json.dumps(stats)}")
+    print(f"upstream requests by provider: {dict(upstream)}")
+    _SERVER.shutdown()
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
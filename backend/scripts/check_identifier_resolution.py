@@ -0,0 +1,111 @@
+"""Check POST /skus/resolve against identities stored in their original spelling.
+
+Creates SKUs whose identities are stored dashed, lower-cased or without
+leading zeros, resolves them by the exact stored strings and by other
+spellings of the same value, and checks that identities written before
+resolution_key existed resolve after backfill_resolution_keys, and that a
+cached "not found" expires when another process registers the identifier.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/check_identifier_resolution.py
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+_TMP_DIR = tempfile.mkdtemp(prefix="resolution-check-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'check.db')}")
+os.environ.setdefault("SEARCH_INDEX_ENABLED", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.db.session import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import SkuIdentity  # noqa: E402
+from app.services.resolution import backfill_resolution_keys, resolution_cache, resolution_key  # noqa: E402
+
+
+def _check(label: str, ok: bool, detail: str = "") -> bool:
+    print(f"{'PASS' if ok else 'FAIL'}  {label:<56}{detail}")
+    return ok
+
+
+def main() -> None:
+    argparse.ArgumentParser(description=__doc__.splitlines()[0]).parse_args()
+    results = []
+
+    with TestClient(app) as client:
+        def create(canonical: str, identities: list) -> int:
+            body = {"canonical_sku": canonical, "name": canonical, "identities": identities}
+            resp = client.post("/api/v1/skus", json=body)
+            resp.raise_for_status()
+            return resp.json()["id"]
+
+        def resolve(provider: str, identifier: str) -> list:
+            resp = client.post(
+                "/api/v1/skus/resolve", json={"identifiers": [{"provider": provider, "identifier": identifier}]}
+            )
+            resp.raise_for_status()
+            return resp.json()["results"][0]["sku_ids"]
+
+        acme = create("ACME-001", [
+            {"provider": "sku", "identifier": "acme-001"},
+            {"provider": "upc", "identifier": "0-12345-67890-5"},
+        ])
+        short = create("SHORT-1", [{"provider": "ean", "identifier": "4006381333931"}])
+        other = create("ACME-002", [{"provider": "sku", "identifier": "ACME-002"}])
+
+        for provider, identifier, expected in (
+            ("sku", "acme-001", [acme]),
+            ("sku", "ACME001", [acme]),
+            ("sku", "Acme-001", [acme]),
+            ("upc", "0-12345-67890-5", [acme]),
+            ("upc", "012345678905", [acme]),
+            ("gtin", "00012345678905", [acme]),
+            ("upc", "01234567890", [acme]),  # check digit omitted
+            ("ean", "04006381333931", [short]),
+            ("sku", "acme-002", [other]),
+            ("sku", "acme-003", []),
+        ):
+            sku_ids = resolve(provider, identifier)
+            results.append(_check(f"{provider}:{identifier!r}", sku_ids == expected, f"sku_ids={sku_ids}"))
+
+        # An identity written without resolution_key (before the column existed).
+        with engine.begin() as conn:
+            conn.execute(insert(SkuIdentity), [{"sku_id": other, "provider": "asin", "identifier": "b00-legacy"}])
+        before = resolve("asin", "B00LEGACY")
+        keyed = backfill_resolution_keys()
+        after = resolve("asin", "B00LEGACY")
+        results.append(_check(
+            "legacy identity resolves after backfill",
+            before == [] and keyed == 1 and after == [other],
+            f"before={before}, keyed={keyed}, after={after}",
+        ))
+
+        # Registered by another process: this one's cache is not invalidated.
+        resolution_cache.negative_ttl_seconds = 0.2
+        before = resolve("sku", "ACME-004")
+        with engine.begin() as conn:
+            conn.execute(insert(SkuIdentity), [{
+                "sku_id": other, "provider": "sku", "identifier": "ACME-004",
+                "resolution_key": resolution_key("sku", "ACME-004"),
+            }])
+        cached = resolve("sku", "ACME-004")
+        time.sleep(0.3)
+        after = resolve("sku", "ACME-004")
+        results.append(_check(
+            "cached not-found expires after negative TTL",
+            before == [] and cached == [] and after == [other],
+            f"before={before}, cached={cached}, after={after}",
+        ))
+
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Check the denormalized SKU status (current_status / last_location / last_observed_at).
+
+Writes events for one SKU with a mix of timezone-aware and naive
+observed_at values through POST /events:bulk and a tracking batch, and
+checks that they are all stored and that the SKU reflects the newest one.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/check_sku_status.py
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+_TMP_DIR = tempfile.mkdtemp(prefix="sku-status-check-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'check.db')}")
+os.environ.setdefault("SEARCH_INDEX_ENABLED", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.schemas.sku import SkuEventCreate  # noqa: E402
+from app.services.tracking import record_tracked_events_batch  # noqa: E402
+
+
+def _check(label: str, ok: bool, detail: str = "") -> bool:
+    print(f"{'PASS' if ok else 'FAIL'}  {label:<56}{detail}")
+    return ok
+
+
+def main() -> None:
+    argparse.ArgumentParser(description=__doc__.splitlines()[0]).parse_args()
+    results = []
+
+    with TestClient(app) as client:
+        def create(canonical: str) -> int:
+            resp = client.post("/api/v1/skus", json={"canonical_sku": canonical, "name": canonical})
+            resp.raise_for_status()
+            return resp.json()["id"]
+
+        def status(sku_id: int) -> tuple:
+            sku = client.get(f"/api/v1/skus/{sku_id}/timeline").json()["sku"]
+            return sku["current_status"], sku["last_location"], sku["last_observed_at"]
+
+        sku_id = create("STATUS-1")
+        body = client.post("/api/v1/events:bulk", json=[
+            {"sku_id": sku_id, "event_type": "IN_TRANSIT", "provider": "ups", "location": "Reno",
+             "payload": {}, "observed_at": "2024-01-02T00:00:00"},
+            {"sku_id": sku_id, "event_type": "PICKED_UP", "provider": "ups", "location": "Boise",
+             "payload": {}, "observed_at": "2024-01-01T00:00:00Z"},
+            {"sku_id": sku_id, "event_type": "DELIVERED", "provider": "ups", "location": "Oakland",
+             "payload": {}, "observed_at": "2024-01-02T06:00:00+08:00"},
+        ]).json()
+        results.append(_check(
+            "events:bulk with mixed tz-aware / naive timestamps",
+            body.get("accepted") == 3 and body.get("rejected") == 0,
+            f"accepted={body.get('accepted')}, rejected={body.get('rejected')}",
+        ))
+        # 06:00+08:00 is 2024-01-01T22:00Z, older than the naive 2024-01-02T00:00.
+        current = status(sku_id)
+        results.append(_check(
+            "status follows the newest event in UTC",
+            current == ("IN_TRANSIT", "Reno", "2024-01-02T00:00:00"),
+            f"status={current}",
+        ))
+
+        sku_id = create("STATUS-2")
+        carrier_time = datetime.now(timezone.utc) - timedelta(days=1)
+
+        def event(event_type: str, observed_at, key: str) -> SkuEventCreate:
+            return SkuEventCreate(
+                sku_id=sku_id, event_type=event_type, provider="usps", location="Denver",
+                payload={}, observed_at=observed_at, content_key=key,
+            )
+
+        # A scan without a carrier date falls back to naive utcnow next to tz-aware carrier times.
+        outcome = record_tracked_events_batch([
+            (sku_id, [event("ACCEPTED", carrier_time, "k1"), event("ARRIVED", datetime.utcnow(), "k2")]),
+        ])[0]
+        current = status(sku_id)
+        results.append(_check(
+            "tracking batch with mixed tz-aware / naive timestamps",
+            outcome[2] is None and len(outcome[0]) == 2 and current[0] == "ARRIVED",
+            f"new={len(outcome[0])}, error={outcome[2]}, status={current[0]}",
+        ))
+
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Exercise the carrier OAuth token cache against a local stand-in OAuth server.
+
+Starts a stub token + tracking server on localhost, points the FedEx and UPS
+connectors at it and checks that concurrent lookups share one token fetch
+(threads and async tasks alike), that tokens are refreshed before
+`expires_in`, that a revoked token is replaced after a 401, and that a
+failed fetch reaches every waiter without being cached.
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/check_token_cache.py [--concurrency 50] [--token-latency-ms 200]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ThreadingHTTPServer.request_queue_size = 256
+_SERVER = ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+_BASE = f"http://127.0.0.1:{_SERVER.server_address[1]}"
+for name, value in {
+    "FEDEX_CLIENT_ID": "fedex-client",
+    "FEDEX_CLIENT_SECRET": "secret",
+    "FEDEX_BASE_URL": _BASE,
+    "UPS_CLIENT_ID": "ups-client",
+    "UPS_CLIENT_SECRET": "secret",
+    "UPS_BASE_URL": _BASE,
+}.items():
+    os.environ[name] = value
+
+import httpx  # noqa: E402
+
+from app.connectors import ConnectorError, FedExConnector, UpsConnector  # noqa: E402
+from app.connectors.auth import token_cache  # noqa: E402
+
+
+class StubOAuth:
+    """Issues numbered tokens; tracking calls accept any issued token not yet revoked."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.token_requests = 0
+        self.latency = 0.0
+        self.expires_in = 3600
+        self.failing = False
+        self.valid = set()
+
+    def issue(self) -> tuple:
+        time.sleep(self.latency)
+        with self.lock:
+            self.token_requests += 1
+            if self.failing:
+                return 500, {"error": "server_error"}
+            token = f"tok-{self.token_requests}"
+            self.valid.add(token)
+            # UPS sends expires_in as a string; exercise both forms.
+            return 200, {"access_token": token, "token_type": "Bearer", "expires_in": str(self.expires_in)}
+
+    def revoke_all(self) -> None:
+        with self.lock:
+            self.valid.clear()
+
+
+stub = StubOAuth()
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _track(self) -> None:
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+        if token not in stub.valid:
+            self._send(401, {"error": "invalid_token"})
+        else:
+            self._send(200, {"output": {"completeTrackResults": []}, "trackResponse": {"shipment": [{}]}})
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path.endswith("/oauth/token"):
+            self._send(*stub.issue())
+        else:
+            self._track()
+
+    def do_GET(self) -> None:
+        self._track()
+
+
+def _check(label: str, ok: bool, detail: str) -> bool:
+    print(f"{'PASS' if ok else 'FAIL'}  {label:<48}{detail}")
+    return ok
+
+
+def _threads(concurrency: int, fn) -> list:
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(fn) for _ in range(concurrency)]
+        return [future.exception() for future in futures]
+
+
+async def _async_tasks(concurrency: int) -> None:
+    async with httpx.AsyncClient(base_url=_BASE) as client:
+        async def fetch():
+            resp = await client.post("/security/v1/oauth/token", data={"grant_type": "client_credentials"})
+            body = resp.json()
+            return body["access_token"], float(body["expires_in"])
+
+        await asyncio.gather(*(token_cache.get_async("ups", "ups-client", fetch) for _ in range(concurrency)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--token-latency-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    _SERVER.RequestHandlerClass = Handler
+    threading.Thread(target=_SERVER.serve_forever, daemon=True).start()
+    stub.latency = args.token_latency_ms / 1000
+    n = args.concurrency
+    results = []
+
+    before = stub.token_requests
+    errors = _threads(n, lambda: FedExConnector().track("794600000000"))
+    results.append(_check(
+        f"{n} threaded FedEx tracks, cold cache",
+        not any(errors) and stub.token_requests - before == 1,
+        f"token requests={stub.token_requests - before}",
+    ))
+
+    before = stub.token_requests
+    start = time.perf_counter()
+    errors = _threads(n, lambda: FedExConnector().track("794600000000"))
+    results.append(_check(
+        f"{n} threaded FedEx tracks, warm cache",
+        not any(errors) and stub.token_requests == before,
+        f"token requests={stub.token_requests - before}, {(time.perf_counter() - start) * 1000:.0f} ms",
+    ))
+
+    before = stub.token_requests
+    asyncio.run(_async_tasks(n))
+    results.append(_check(
+        f"{n} async tasks, cold UPS key",
+        stub.token_requests - before == 1,
+        f"token requests={stub.token_requests - before}",
+    ))
+
+    before = stub.token_requests
+    errors = _threads(n, lambda: UpsConnector().track("1Z0000000000000000"))
+    results.append(_check(
+        f"{n} threaded UPS tracks reuse the async token",
+        not any(errors) and stub.token_requests == before,
+        f"token requests={stub.token_requests - before}",
+    ))
+
+    # Short-lived token: reused until refresh_at, then refreshed once.
+    token_cache.clear()
+    stub.expires_in = 2
+    stub.latency = 0.0
+    FedExConnector().track("794600000000")
+    before = stub.token_requests
+    FedExConnector().track("794600000000")
+    reused = stub.token_requests == before
+    time.sleep(1.1)  # past expires_in minus the margin (capped at half the lifetime)
+    # Token lookups only: a round of n tracking calls can outlast the new 1s window.
+    _threads(n, FedExConnector()._fetch_token)
+    results.append(_check(
+        "token refreshed before expires_in",
+        reused and stub.token_requests - before == 1,
+        f"reused={reused}, refreshes after 1.1s={stub.token_requests - before}",
+    ))
+    stub.expires_in = 3600
+
+    stub.revoke_all()
+    before = stub.token_requests
+    errors = _threads(n, lambda: FedExConnector().track("794600000000"))
+    results.append(_check(
+        "revoked token replaced after 401",
+        not any(errors) and stub.token_requests - before >= 1,
+        f"token requests={stub.token_requests - before}",
+    ))
+
+    token_cache.clear()
+    stub.failing = True
+    stub.latency = args.token_latency_ms / 1000
+    before = stub.token_requests
+    errors = _threads(n, lambda: FedExConnector().track("794600000000"))
+    failed_once = stub.token_requests - before == 1
+    stub.failing = False
+    FedExConnector().track("794600000000")
+    results.append(_check(
+        "failed fetch reaches all waiters, not cached",
+        failed_once and all(isinstance(error, ConnectorError) for error in errors),
+        f"token requests={stub.token_requests - before} (1 failed + 1 retry)",
+    ))
+
+    print(f"\ntoken cache stats: {token_cache.stats()}")
+    _SERVER.shutdown()
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
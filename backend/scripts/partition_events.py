@@ -0,0 +1,64 @@
+"""Maintain the monthly SkuEvent partitions (EVENT_PARTITIONING=true).
+
+    migrate                 move rows from the single skuevent table into partitions
+    drop --older-than-days  drop whole partitions older than the retention window
+    list                    show partitions and their row counts
+
+Usage (from backend/):
+    PYTHONPATH=. python scripts/partition_events.py migrate [--batch 5000]
+    PYTHONPATH=. python scripts/partition_events.py drop --older-than-days 365
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlmodel import Session
+
+from app.db.session import engine, init_db
+from app.models import SkuEvent
+from app.services.event_store import PartitionedEventStore
+
+
+def migrate(store: PartitionedEventStore, batch: int) -> int:
+    moved = 0
+    with Session(engine) as session:
+        while True:
+            rows = session.execute(select(SkuEvent.__table__).order_by(SkuEvent.id).limit(batch)).all()
+            if not rows:
+                break
+            store.insert_many(session, ({k: v for k, v in row._mapping.items() if k != "id"} for row in rows))
+            session.execute(delete(SkuEvent).where(SkuEvent.id.in_([row.id for row in rows])))
+            session.commit()
+            moved += len(rows)
+            print(f"moved {moved} events")
+    return moved
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate").add_argument("--batch", type=int, default=5000)
+    commands.add_parser("drop").add_argument("--older-than-days", type=int, required=True)
+    commands.add_parser("list")
+    args = parser.parse_args()
+
+    init_db()
+    store = PartitionedEventStore(engine)
+    if args.command == "migrate":
+        migrate(store, args.batch)
+    elif args.command == "drop":
+        cutoff = datetime.utcnow() - timedelta(days=args.older_than_days)
+        dropped = store.drop_before(cutoff)
+        print(f"dropped {len(dropped)} partition(s): {', '.join(map(str, dropped)) or '-'}")
+    else:
+        with Session(engine) as session:
+            for period in store.periods():
+                table = store.table(period)
+                count = session.execute(select(func.count()).select_from(table)).scalar_one()
+                print(f"{table.name}\t{count}")
+
+
+if __name__ == "__main__":
+    main()
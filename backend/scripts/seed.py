@@ -6,6 +6,7 @@ from sqlmodel import Session
 
 from app.db.session import engine
 from app.models import Sku, SkuEvent, SkuIdentity
+from app.services.resolution import resolution_key
 
 sample_skus = [
     {
@@ -95,6 +96,7 @@ def seed() -> None:
                         sku_id=sku.id,
                         provider=identity["provider"],
                         identifier=identity["identifier"],
+                        resolution_key=resolution_key(identity["provider"], identity["identifier"]),
                     )
                 )
 
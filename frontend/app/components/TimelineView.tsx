@@ -1,32 +1,49 @@
 "use client";
 
-import useSWR from "swr";
+import useSWRInfinite from "swr/infinite";
 import { fetchTimeline, type TimelineResponse } from "../../lib/api";
 
+type TimelineKey = [string, number, string | null];
+
 export default function TimelineView({ skuId }: { skuId: number }) {
-  const { data, error, isLoading } = useSWR<TimelineResponse>(
-    skuId ? ["timeline", skuId] : null,
-    ([, id]) => fetchTimeline(id)
+  const getKey = (pageIndex: number, previous: TimelineResponse | null): TimelineKey | null => {
+    if (!skuId) return null;
+    if (previous && !previous.next_cursor) return null;
+    return ["timeline", skuId, previous?.next_cursor ?? null];
+  };
+
+  const { data, error, isLoading, isValidating, size, setSize } = useSWRInfinite<TimelineResponse>(
+    getKey,
+    ([, id, cursor]: TimelineKey) => fetchTimeline(id, cursor ?? undefined)
   );
 
   if (isLoading) return <p>Loading timeline…</p>;
-  if (error || !data) return <p>Timeline unavailable.</p>;
+  if (error || !data || data.length === 0) return <p>Timeline unavailable.</p>;
+
+  const latest = data[0];
+  const events = data.flatMap((page) => page.events);
+  const hasOlder = Boolean(data[data.length - 1].next_cursor);
 
   return (
     <section className="card">
-      <h2>{data.sku.name}</h2>
-      <p>Canonical SKU: {data.sku.canonical_sku}</p>
+      <h2>{latest.sku.name}</h2>
+      <p>Canonical SKU: {latest.sku.canonical_sku}</p>
       <p>
-        Last seen {data.last_known_location ?? "Unknown"} — {data.inferred_status}
+        Last seen {latest.last_known_location ?? "Unknown"} — {latest.inferred_status}
       </p>
       <ul className="timeline">
-        {data.events.map((event) => (
+        {events.map((event) => (
           <li key={event.id}>
             <strong>{event.event_type}</strong> ({event.provider})
             <div>{new Date(event.observed_at).toLocaleString()}</div>
           </li>
         ))}
       </ul>
+      {hasOlder && (
+        <button onClick={() => setSize(size + 1)} disabled={isValidating}>
+          {isValidating ? "Loading…" : "Load older events"}
+        </button>
+      )}
     </section>
   );
 }
@@ -21,6 +21,7 @@ export type TimelineResponse = {
   events: TimelineEvent[];
   inferred_status: string;
   last_known_location?: string;
+  next_cursor?: string | null;
 };
 
 export async function searchSkus(query: string): Promise<Sku[]> {
@@ -29,8 +30,9 @@ export async function searchSkus(query: string): Promise<Sku[]> {
   return res.json();
 }
 
-export async function fetchTimeline(id: number): Promise<TimelineResponse> {
-  const res = await fetch(`${API_BASE}/skus/${id}/timeline`);
+export async function fetchTimeline(id: number, cursor?: string): Promise<TimelineResponse> {
+  const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  const res = await fetch(`${API_BASE}/skus/${id}/timeline${params}`);
   if (!res.ok) throw new Error("Timeline not found");
   return res.json();
 }
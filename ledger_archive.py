@@ -0,0 +1,200 @@
+"""
+Immutable, compressed, memory-mapped segment files for archived ledger rows.
+
+Segment layout:
+
+    MAGIC
+    block 0 .. block N-1      zlib-compressed NDJSON, rows sorted by (timestamp, id)
+    index                     JSON: per-block offset/length/time range/key range/asset ids
+    footer                    index offset (uint64 LE) + MAGIC
+
+The index is sparse (one entry per block of BLOCK_ROWS rows), so a query
+only decompresses blocks whose time range, key range and asset set can
+contain matching rows. Segments are read through mmap and never modified
+after they are written.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import mmap
+import os
+import struct
+import threading
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+MAGIC = b"LSEG0001"
+FOOTER = struct.Struct("<Q")
+BLOCK_ROWS = 1024
+SEGMENT_SUFFIX = ".lseg"
+
+
+def _row_key(row: Dict[str, Any]) -> tuple:
+    return row["timestamp"], row["id"]
+
+
+def write_segment(directory: str, rows: List[Dict[str, Any]]) -> str:
+    """
+    Write rows (dicts with datetime `timestamp` and int `id`) as a new
+    segment and return its path. The file is fsynced and renamed into place
+    so readers never see a partial segment.
+    """
+    rows = sorted(rows, key=_row_key)
+    os.makedirs(directory, exist_ok=True)
+    first, last = rows[0], rows[-1]
+    name = f"{first['timestamp']:%Y%m%dT%H%M%S}-{last['timestamp']:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    path = os.path.join(directory, name + SEGMENT_SUFFIX)
+    tmp_path = path + ".tmp"
+
+    blocks = []
+    with open(tmp_path, "wb") as fh:
+        fh.write(MAGIC)
+        for start in range(0, len(rows), BLOCK_ROWS):
+            chunk = rows[start:start + BLOCK_ROWS]
+            lines = "\n".join(
+                json.dumps({**row, "timestamp": row["timestamp"].isoformat()}, separators=(",", ":"))
+                for row in chunk
+            )
+            data = zlib.compress(lines.encode(), 6)
+            blocks.append(
+                {
+                    "offset": fh.tell(),
+                    "length": len(data),
+                    "rows": len(chunk),
+                    "min_key": [chunk[0]["timestamp"].isoformat(), chunk[0]["id"]],
+                    "max_key": [chunk[-1]["timestamp"].isoformat(), chunk[-1]["id"]],
+                    "assets": sorted({row["asset_id"] for row in chunk}),
+                }
+            )
+            fh.write(data)
+
+        index_offset = fh.tell()
+        fh.write(json.dumps({"rows": len(rows), "blocks": blocks}, separators=(",", ":")).encode())
+        fh.write(FOOTER.pack(index_offset) + MAGIC)
+        fh.flush()
+        os.fsync(fh.fileno())
+
+    os.replace(tmp_path, path)
+    return path
+
+
+class Segment:
+    """
+    Read-only view of one segment file through mmap.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        tail = len(MAGIC) + FOOTER.size
+        if self._mmap[:len(MAGIC)] != MAGIC or self._mmap[-len(MAGIC):] != MAGIC:
+            raise ValueError(f"Not a ledger segment: {path}")
+        (index_offset,) = FOOTER.unpack(self._mmap[-tail:-len(MAGIC)])
+        index = json.loads(self._mmap[index_offset:-tail])
+
+        self.rows = index["rows"]
+        self.blocks = index["blocks"]
+        for block in self.blocks:
+            block["min_key"] = (datetime.fromisoformat(block["min_key"][0]), block["min_key"][1])
+            block["max_key"] = (datetime.fromisoformat(block["max_key"][0]), block["max_key"][1])
+            block["assets"] = frozenset(block["assets"])
+        self.min_key = self.blocks[0]["min_key"]
+        self.max_key = self.blocks[-1]["max_key"]
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def iter_rows(
+        self,
+        after: Optional[tuple] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield matching rows in (timestamp, id) order, strictly after `after`.
+        `filters` are equality matches on row fields.
+        """
+        filters = filters or {}
+        asset_id = filters.get("asset_id")
+
+        for block in self.blocks:
+            if after is not None and block["max_key"] <= after:
+                continue
+            if since is not None and block["max_key"][0] < since:
+                continue
+            if until is not None and block["min_key"][0] >= until:
+                break
+            if asset_id is not None and asset_id not in block["assets"]:
+                continue
+
+            data = zlib.decompress(self._mmap[block["offset"]:block["offset"] + block["length"]])
+            for line in data.split(b"\n"):
+                row = json.loads(line)
+                if any(row.get(field) != value for field, value in filters.items()):
+                    continue
+                row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                key = _row_key(row)
+                if after is not None and key <= after:
+                    continue
+                if since is not None and row["timestamp"] < since:
+                    continue
+                if until is not None and row["timestamp"] >= until:
+                    return
+                yield row
+
+
+class LedgerArchive:
+    """
+    The set of segments in a directory, queried as one ordered stream.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._segments: Dict[str, Segment] = {}
+        self._lock = threading.Lock()
+
+    def segments(self) -> List[Segment]:
+        if not os.path.isdir(self.directory):
+            return []
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(SEGMENT_SUFFIX) and entry.path not in self._segments:
+                    self._segments[entry.path] = Segment(entry.path)
+            return sorted(self._segments.values(), key=lambda seg: seg.min_key)
+
+    def write(self, rows: List[Dict[str, Any]]) -> str:
+        return write_segment(self.directory, rows)
+
+    def iter_rows(
+        self,
+        after: Optional[tuple] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Matching rows across all segments in (timestamp, id) order.
+        """
+        streams = [
+            seg.iter_rows(after, since, until, filters)
+            for seg in self.segments()
+            if (after is None or seg.max_key > after)
+            and (since is None or seg.max_key[0] >= since)
+            and (until is None or seg.min_key[0] < until)
+        ]
+        if len(streams) == 1:
+            return streams[0]
+        return heapq.merge(*streams, key=_row_key)
+
+    def close(self) -> None:
+        with self._lock:
+            for seg in self._segments.values():
+                seg.close()
+            self._segments.clear()
@@ -1,16 +1,37 @@
+import ast
+import asyncio
+import base64
+import heapq
+import itertools
+import json
+import logging
 import os
+import queue
+import threading
+import time
 
-from datetime import datetime
-from typing import Optional, List
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, List
 
 import uuid
+import zlib
 
-from fastapi import FastAPI, HTTPException
+import numpy as np
+from fastapi import FastAPI, HTTPException, Query, Response
 from pydantic import BaseModel
+from sqlalchemy import Column, Index, LargeBinary, case, delete, event, func, insert, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlmodel import SQLModel, Field, create_engine, Session, select
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+
+from ledger_archive import LedgerArchive
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
@@ -30,15 +51,125 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Absolute path to avoid "wrong working dir" issues
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'ledger.db')}"
-
-# echo=True for SQL DDL in console; check_same_thread=False fixes SQLite + FastAPI threading
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,
-    connect_args={"check_same_thread": False}
+DATABASE_URL = os.getenv(
+    "LEDGER_DATABASE_URL",
+    f"sqlite:///{os.path.join(BASE_DIR, 'ledger.db')}",
 )
 
+# Storage profiles for the SQLite ledger, selected with LEDGER_STORAGE_PROFILE.
+#   "default":    stock SQLite settings (rollback journal, synchronous=FULL)
+#   "concurrent": WAL journal so readers don't block the writer, fewer fsyncs
+#                 (synchronous=NORMAL), 64 MiB page cache and 256 MiB mmap
+STORAGE_PROFILES = {
+    "default": {
+        "pragmas": {},
+        "pool_size": 5,
+        "max_overflow": 10,
+    },
+    "concurrent": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -64 * 1024,
+            "mmap_size": 256 * 1024 * 1024,
+            "temp_store": "MEMORY",
+        },
+        "pool_size": 8,
+        "max_overflow": 8,
+    },
+}
+
+STORAGE_PROFILE = os.getenv("LEDGER_STORAGE_PROFILE", "concurrent")
+# Seconds a connection waits on a locked database before raising.
+BUSY_TIMEOUT = float(os.getenv("LEDGER_BUSY_TIMEOUT", "5"))
+# Seconds a durable write waits for its batch to commit before raising.
+WRITE_TIMEOUT = float(os.getenv("LEDGER_WRITE_TIMEOUT", "30"))
+SQL_ECHO = os.getenv("LEDGER_SQL_ECHO", "0") == "1"
+
+
+def make_engine(url: str, profile: str = STORAGE_PROFILE, echo: bool = SQL_ECHO):
+    """
+    Create a SQLite engine with a bounded connection pool and the profile's
+    pragmas applied to every new connection.
+    """
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(
+            f"Unknown storage profile {profile!r} (LEDGER_STORAGE_PROFILE); "
+            f"expected one of: {', '.join(STORAGE_PROFILES)}"
+        )
+    settings = STORAGE_PROFILES[profile]
+    # check_same_thread=False fixes SQLite + FastAPI threading
+    new_engine = create_engine(
+        url,
+        echo=echo,
+        connect_args={"check_same_thread": False, "timeout": BUSY_TIMEOUT},
+        pool_size=settings["pool_size"],
+        max_overflow=settings["max_overflow"],
+        pool_timeout=BUSY_TIMEOUT,
+    )
+
+    @event.listens_for(new_engine, "connect")
+    def _apply_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for name, value in settings["pragmas"].items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return new_engine
+
+
+engine = make_engine(DATABASE_URL)
+
+
+
+# ============================================================
+# COMPACT PAYLOAD ENCODING
+# ============================================================
+
+# Payloads are stored as compact JSON, zlib-compressed above this many bytes.
+# The first byte tags the encoding so either form can be read back.
+PAYLOAD_COMPRESS_THRESHOLD = 512
+_PAYLOAD_JSON = b"j"
+_PAYLOAD_ZLIB = b"z"
+
+
+def encode_payload(value: Any) -> bytes:
+    data = json.dumps(value, separators=(",", ":"), default=str).encode()
+    if len(data) > PAYLOAD_COMPRESS_THRESHOLD:
+        packed = zlib.compress(data)
+        if len(packed) < len(data):
+            return _PAYLOAD_ZLIB + packed
+    return _PAYLOAD_JSON + data
+
+
+def decode_payload(value: Any) -> Any:
+    """
+    Decode a stored payload. Values that are not encoded bytes (rows read
+    back from archive segments) are returned unchanged.
+    """
+    if not isinstance(value, (bytes, bytearray)):
+        return value
+    tag, body = value[:1], value[1:]
+    if tag == _PAYLOAD_ZLIB:
+        body = zlib.decompress(body)
+    return json.loads(body)
+
+
+def _parse_legacy_payload(text: str) -> Any:
+    """
+    Best-effort structure recovery for pre-encoding rows, which stored
+    str(dict) or free text.
+    """
+    if text[:1] in ("{", "["):
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+        try:
+            return ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            pass
+    return text
 
 
 # ============================================================
@@ -50,13 +181,22 @@ class LedgerEntry(SQLModel, table=True):
     Original arbitrage ledger:
     Logs each hop in the orchestrated METRC → POS → Logistics → Payment → PMSI flow.
     """
+    # SQLite appends the rowid (id) to every index, so these also serve the
+    # (timestamp, id) keyset order used by /ledger. AUTOINCREMENT keeps ids
+    # of rows moved out by archive_ledger from being handed out again.
+    __table_args__ = (
+        Index("ix_ledgerentry_timestamp", "timestamp"),
+        Index("ix_ledgerentry_asset_id_timestamp", "asset_id", "timestamp"),
+        {"sqlite_autoincrement": True},
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     asset_id: str
     from_system: str
     to_system: str
     action: str
     status: str
-    payload: str
+    payload: bytes = Field(sa_column=Column(LargeBinary, nullable=False))  # encode_payload()
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     notes: Optional[str] = None
 
@@ -73,6 +213,8 @@ class ItemSource(SQLModel, table=True):
       provider = "FedEx"
       provider_ref = "TRACKING_NUMBER"
     """
+    __table_args__ = (Index("ix_itemsource_item_id", "item_id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     item_id: str
     provider: str
@@ -84,6 +226,8 @@ class ItemEvent(SQLModel, table=True):
     Normalized event log for ANY trackable item.
     Every scan / status change / API response becomes one ItemEvent.
     """
+    __table_args__ = (Index("ix_itemevent_item_id_timestamp", "item_id", "timestamp"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     item_id: str                  # Your universal ID
     provider: str                 # Which external system
@@ -91,42 +235,528 @@ class ItemEvent(SQLModel, table=True):
     event_type: str               # "CREATED", "SHIPPED", "RECEIVED", "SCANNED", etc.
     location: Optional[str] = None
     timestamp: datetime = Field(default_factory=datetime.utcnow)
-    raw_payload: str              # Raw JSON/string snapshot
+    raw_payload: bytes = Field(sa_column=Column(LargeBinary, nullable=False))  # encode_payload()
+
+
+class ItemSummary(SQLModel, table=True):
+    """
+    Materialized latest state of an item_id, one row per item.
+    Maintained in the same transaction as every ItemEvent insert
+    (see `apply_item_summaries`).
+    """
+    item_id: str = Field(primary_key=True)
+    event_count: int = 0
+    latest_event_type: str
+    latest_provider: str
+    latest_provider_ref: str
+    latest_timestamp: datetime
+    last_location: Optional[str] = None
+    last_location_at: Optional[datetime] = None
+
+
+class ItemProviderSummary(SQLModel, table=True):
+    """
+    Per-provider activity for an item_id: when it last reported and how
+    many events it has produced.
+    """
+    item_id: str = Field(primary_key=True)
+    provider: str = Field(primary_key=True)
+    event_count: int = 0
+    last_seen: datetime
 
 
 def init_db():
     SQLModel.metadata.create_all(engine)
+    upgrade_schema()
+
+
+def upgrade_schema():
+    """
+    Bring an existing ledger.db up to the current models.
+    create_all() skips tables that already exist, so indexes added after a
+    database was created are built here, a ledgerentry table created
+    without AUTOINCREMENT is rebuilt, and legacy text payloads are
+    re-encoded.
+    """
+    created = False
+    with engine.begin() as conn:
+        ledger_sql = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'ledgerentry'"
+        ).scalar()
+        if ledger_sql and "AUTOINCREMENT" not in ledger_sql.upper():
+            rebuild_ledger_table(conn)
+
+        existing = {
+            row[0]
+            for row in conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        }
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+                    created = True
+        if created:
+            # Refresh planner statistics for the new indexes.
+            conn.exec_driver_sql("ANALYZE")
+
+        # Payloads used to be stored as text (str(dict) or free text);
+        # re-encode any such rows. Encoded payloads are BLOBs.
+        for table, column in (("ledgerentry", "payload"), ("itemevent", "raw_payload")):
+            while True:
+                rows = conn.exec_driver_sql(
+                    f"SELECT id, {column} FROM {table} WHERE typeof({column}) = 'text' LIMIT 1000"
+                ).all()
+                if not rows:
+                    break
+                conn.exec_driver_sql(
+                    f"UPDATE {table} SET {column} = ? WHERE id = ?",
+                    [(encode_payload(_parse_legacy_payload(text)), row_id) for row_id, text in rows],
+                )
+
+
+def rebuild_ledger_table(conn) -> None:
+    """
+    Recreate ledgerentry with AUTOINCREMENT, keeping row ids.
+    The id sequence starts past the highest archived id. Hot rows whose id
+    was already reused (it is also in the archive) get new ids, so every
+    id is unique across the hot table and the archive again.
+    """
+    table = LedgerEntry.__table__
+    archived_max = 0
+    for row in ledger_archive.iter_rows():
+        archived_max = max(archived_max, row["id"])
+    candidates = {
+        row_id
+        for (row_id,) in conn.exec_driver_sql("SELECT id FROM ledgerentry WHERE id <= ?", (archived_max,))
+    }
+    reused = [(row["id"],) for row in ledger_archive.iter_rows() if row["id"] in candidates] if candidates else []
+
+    for index in table.indexes:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+    conn.exec_driver_sql("ALTER TABLE ledgerentry RENAME TO ledgerentry_rowid")
+    table.create(conn)
+    conn.exec_driver_sql("CREATE TEMP TABLE ledgerentry_reused (id INTEGER PRIMARY KEY)")
+    if reused:
+        conn.exec_driver_sql("INSERT OR IGNORE INTO ledgerentry_reused (id) VALUES (?)", reused)
+
+    columns = [column.name for column in table.columns]
+    kept = ", ".join(columns)
+    conn.exec_driver_sql(
+        f"INSERT INTO ledgerentry ({kept}) SELECT {kept} FROM ledgerentry_rowid "
+        "WHERE id NOT IN (SELECT id FROM ledgerentry_reused) ORDER BY id"
+    )
+    if not conn.exec_driver_sql("SELECT 1 FROM sqlite_sequence WHERE name = 'ledgerentry'").first():
+        conn.exec_driver_sql("INSERT INTO sqlite_sequence (name, seq) VALUES ('ledgerentry', 0)")
+    conn.exec_driver_sql(
+        "UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = 'ledgerentry'", (archived_max,)
+    )
+    renumbered = ", ".join(column for column in columns if column != "id")
+    conn.exec_driver_sql(
+        f"INSERT INTO ledgerentry ({renumbered}) SELECT {renumbered} FROM ledgerentry_rowid "
+        "WHERE id IN (SELECT id FROM ledgerentry_reused) ORDER BY id"
+    )
+    conn.exec_driver_sql("DROP TABLE ledgerentry_rowid")
+    conn.exec_driver_sql("DROP TABLE ledgerentry_reused")
+
+
+# ============================================================
+# WRITE-BEHIND LEDGER WRITER (GROUP COMMIT)
+# ============================================================
+
+_FLUSH = object()
+_STOP = object()
+
+# Futures of the durable=False rows submitted inside the current
+# LedgerWriter.scope(); None outside any scope.
+_write_scope: ContextVar[Optional[set]] = ContextVar("ledger_write_scope", default=None)
+
+
+class LedgerWriteError(RuntimeError):
+    """
+    Raised by LedgerWriter.flush() when rows queued in the caller's scope
+    failed to write.
+    """
+
+
+class LedgerWriter:
+    """
+    Queues LedgerEntry / ItemEvent rows in memory and writes them from a
+    background thread, one transaction per batch.
+
+    A batch is closed when `max_batch` rows are waiting or `max_delay`
+    seconds have passed since its first row. Durable submissions close the
+    batch as soon as the queue is drained, so concurrent durable callers
+    still share a single commit.
+
+    Rows queued together with submit_many() always share a commit and fail
+    together. If a batch fails to commit, each submission in it is retried
+    in its own transaction so only the offending ones fail. A failed durable row raises to its caller.
+    A failed durable=False row is logged, and raised as a LedgerWriteError
+    by the next flush() in the scope() it was submitted from, so one
+    request's bad row never fails another request's flush.
+    """
+
+    def __init__(self, engine, max_batch: int = 256, max_delay: float = 0.05):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches_written = 0
+        self.rows_written = 0
+        self.rows_failed = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="ledger-writer", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, row: SQLModel, durable: bool = False) -> Future:
+        """
+        Queue a row for writing. The returned future resolves to the
+        persisted row (with its primary key) once its batch has committed.
+        """
+        return self.submit_many([row], durable)[0]
+
+    def submit_many(self, rows: List[SQLModel], durable: bool = False) -> List[Future]:
+        """
+        Queue rows to be written in one transaction, even past `max_batch`;
+        they are committed or failed together. Returns one future per row.
+        """
+        futures = [Future() for _ in rows]
+        scope = _write_scope.get()
+        if scope is not None and not durable:
+            scope.update(futures)
+        self.start()
+        self._queue.put((rows, futures, durable))
+        return futures
+
+    @contextmanager
+    def scope(self):
+        """
+        Track the durable=False rows submitted in this context (including
+        tasks and threads started from it) so flush() can report theirs.
+        Also usable as a decorator on plain (non-async) functions.
+        """
+        token = _write_scope.set(set())
+        try:
+            yield
+        finally:
+            _write_scope.reset(token)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Write everything queued so far and wait for the commit.
+        Inside a scope(), raises LedgerWriteError if any row queued in that
+        scope since its previous flush failed to write.
+        """
+        future: Future = Future()
+        self.start()
+        self._queue.put((_FLUSH, [future], True))
+        future.result(timeout)
+
+        scope = _write_scope.get()
+        if not scope:
+            return
+        done = [pending for pending in list(scope) if pending.done()]
+        scope.difference_update(done)
+        errors = [pending.exception() for pending in done if pending.exception() is not None]
+        if errors:
+            raise LedgerWriteError(
+                f"{len(errors)} queued row(s) failed to write: {errors[0]!r}"
+            ) from errors[0]
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Flush pending rows and stop the background thread.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return
+        future: Future = Future()
+        self._queue.put((_STOP, [future], True))
+        try:
+            future.result(timeout)
+        finally:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = []
+            waiters = []
+            stop = False
+            try:
+                stop = self._collect(item, batch, waiters)
+                if batch:
+                    self._write(batch)
+            except Exception as exc:
+                # Never let the thread die: callers would wait on their futures forever.
+                logger.exception("Ledger writer failed")
+                for _, futures, durable in batch:
+                    for future in futures:
+                        if not future.done():
+                            self._fail(future, durable, exc)
+                for future in item[1]:
+                    if not future.done():
+                        future.set_exception(exc)
+            self._answer(waiters)
+            if stop:
+                return
+
+    def _collect(self, item, batch, waiters) -> bool:
+        """
+        Gather queued items into `batch` / `waiters` until the batch closes;
+        returns whether a stop was requested.
+        """
+        stop = False
+        urgent = False
+        size = 0
+        deadline = time.monotonic() + self.max_delay
+        while True:
+            rows, futures, durable = item
+            if rows is _FLUSH or rows is _STOP:
+                waiters.extend(futures)
+                stop = stop or rows is _STOP
+                urgent = True
+            else:
+                batch.append(item)
+                size += len(rows)
+                urgent = urgent or durable
+
+            if size >= self.max_batch:
+                return stop
+            try:
+                if urgent:
+                    item = self._queue.get_nowait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return stop
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return stop
+
+    def _answer(self, waiters) -> None:
+        for future in waiters:
+            # A waiter may already hold the error from a failed collection.
+            if not future.done():
+                future.set_result(None)
+
+    def _write(self, batch) -> None:
+        try:
+            self._commit([row for rows, _, _ in batch for row in rows])
+        except Exception:
+            # Retry submission by submission so one bad row does not fail unrelated ones.
+            for rows, futures, durable in batch:
+                for row in rows:
+                    row.id = None  # assigned by the rolled-back flush
+                try:
+                    self._commit(rows)
+                except Exception as exc:
+                    for future in futures:
+                        self._fail(future, durable, exc)
+                else:
+                    self.rows_written += len(rows)
+                    for row, future in zip(rows, futures):
+                        future.set_result(row)
+            return
+
+        self.batches_written += 1
+        for rows, futures, _ in batch:
+            self.rows_written += len(rows)
+            for row, future in zip(rows, futures):
+                future.set_result(row)
+
+    def _commit(self, rows) -> None:
+        with Session(self.engine, expire_on_commit=False) as session:
+            session.add_all(rows)
+            events = [row.model_dump() for row in rows if isinstance(row, ItemEvent)]
+            if events:
+                apply_item_summaries(session, events)
+            session.commit()
+
+    def _fail(self, future: Future, durable: bool, exc: BaseException) -> None:
+        self.rows_failed += 1
+        if not durable:
+            # Nobody waits on this future; flush() only sees it within its scope.
+            logger.error("Queued ledger row failed to write: %r", exc)
+        future.set_exception(exc)
+
+
+ledger_writer = LedgerWriter(engine)
+
+
+# ============================================================
+# ITEM SUMMARY PROJECTION
+# ============================================================
+
+def apply_item_summaries(session: Session, events: List[Dict[str, Any]]) -> None:
+    """
+    Fold a batch of new ItemEvent rows (as dicts) into ItemSummary and
+    ItemProviderSummary with atomic upserts, inside the caller's transaction.
+    """
+    summaries: Dict[str, Dict[str, Any]] = {}
+    providers: Dict[tuple, Dict[str, Any]] = {}
+
+    for ev in sorted(events, key=lambda e: e["timestamp"]):
+        summary = summaries.setdefault(ev["item_id"], {"item_id": ev["item_id"], "event_count": 0})
+        summary["event_count"] += 1
+        summary.update(
+            latest_event_type=ev["event_type"],
+            latest_provider=ev["provider"],
+            latest_provider_ref=ev["provider_ref"],
+            latest_timestamp=ev["timestamp"],
+        )
+        if ev.get("location"):
+            summary.update(last_location=ev["location"], last_location_at=ev["timestamp"])
+        else:
+            summary.setdefault("last_location", None)
+            summary.setdefault("last_location_at", None)
+
+        key = (ev["item_id"], ev["provider"])
+        activity = providers.setdefault(
+            key, {"item_id": key[0], "provider": key[1], "event_count": 0}
+        )
+        activity["event_count"] += 1
+        activity["last_seen"] = ev["timestamp"]
+
+    stmt = sqlite_insert(ItemSummary).values(list(summaries.values()))
+    newer = stmt.excluded.latest_timestamp >= ItemSummary.latest_timestamp
+    newer_location = stmt.excluded.last_location_at.is_not(None) & (
+        ItemSummary.last_location_at.is_(None)
+        | (stmt.excluded.last_location_at >= ItemSummary.last_location_at)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["item_id"],
+        set_={
+            "event_count": ItemSummary.event_count + stmt.excluded.event_count,
+            **{
+                col: case((newer, getattr(stmt.excluded, col)), else_=getattr(ItemSummary, col))
+                for col in (
+                    "latest_event_type",
+                    "latest_provider",
+                    "latest_provider_ref",
+                    "latest_timestamp",
+                )
+            },
+            **{
+                col: case((newer_location, getattr(stmt.excluded, col)), else_=getattr(ItemSummary, col))
+                for col in ("last_location", "last_location_at")
+            },
+        },
+    )
+    session.execute(stmt)
+
+    stmt = sqlite_insert(ItemProviderSummary).values(list(providers.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["item_id", "provider"],
+        set_={
+            "event_count": ItemProviderSummary.event_count + stmt.excluded.event_count,
+            "last_seen": func.max(ItemProviderSummary.last_seen, stmt.excluded.last_seen),
+        },
+    )
+    session.execute(stmt)
+
+
+def rebuild_item_summaries() -> int:
+    """
+    Recompute both projections from the full ItemEvent table.
+    Returns the number of items summarized.
+    """
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM itemprovidersummary")
+        conn.exec_driver_sql("DELETE FROM itemsummary")
+        conn.exec_driver_sql(
+            """
+            INSERT INTO itemprovidersummary (item_id, provider, event_count, last_seen)
+            SELECT item_id, provider, COUNT(*), MAX(timestamp)
+            FROM itemevent
+            GROUP BY item_id, provider
+            """
+        )
+        result = conn.exec_driver_sql(
+            """
+            INSERT INTO itemsummary (
+                item_id, event_count,
+                latest_event_type, latest_provider, latest_provider_ref, latest_timestamp,
+                last_location, last_location_at
+            )
+            SELECT c.item_id, c.n,
+                   l.event_type, l.provider, l.provider_ref, l.timestamp,
+                   loc.location, loc.timestamp
+            FROM (SELECT item_id, COUNT(*) AS n FROM itemevent GROUP BY item_id) AS c
+            JOIN (
+                SELECT item_id, event_type, provider, provider_ref, timestamp,
+                       ROW_NUMBER() OVER (PARTITION BY item_id ORDER BY timestamp DESC, id DESC) AS rn
+                FROM itemevent
+            ) AS l ON l.item_id = c.item_id AND l.rn = 1
+            LEFT JOIN (
+                SELECT item_id, location, timestamp,
+                       ROW_NUMBER() OVER (PARTITION BY item_id ORDER BY timestamp DESC, id DESC) AS rn
+                FROM itemevent
+                WHERE location IS NOT NULL AND location != ''
+            ) AS loc ON loc.item_id = c.item_id AND loc.rn = 1
+            """
+        )
+        return result.rowcount
 
 
 # ============================================================
 # HELPER FUNCTIONS
 # ============================================================
 
-def log_to_ledger(
+def ledger_entry(
     asset_id: str,
     from_system: str,
     to_system: str,
     action: str,
     status: str,
-    payload: str = "",
+    payload: Any = "",
     notes: str = "",
 ) -> LedgerEntry:
     """
-    Log a step in the arbitrage / API-hop flow.
+    Build (but do not write) a ledger row; `payload` is any JSON-serializable value.
     """
-    entry = LedgerEntry(
+    return LedgerEntry(
         asset_id=asset_id,
         from_system=from_system,
         to_system=to_system,
         action=action,
         status=status,
-        payload=payload,
+        payload=encode_payload(payload),
         notes=notes,
     )
-    with Session(engine) as session:
-        session.add(entry)
-        session.commit()
-        session.refresh(entry)
+
+
+def log_to_ledger(
+    asset_id: str,
+    from_system: str,
+    to_system: str,
+    action: str,
+    status: str,
+    payload: Any = "",
+    notes: str = "",
+    durable: bool = True,
+) -> LedgerEntry:
+    """
+    Log a step in the arbitrage / API-hop flow.
+    `payload` is any JSON-serializable value.
+
+    durable=True waits until the entry is committed (sharing the commit with
+    any concurrent writers). durable=False queues it for the next batch and
+    returns immediately; call `ledger_writer.flush()` to force it out.
+    """
+    entry = ledger_entry(asset_id, from_system, to_system, action, status, payload, notes)
+    future = ledger_writer.submit(entry, durable=durable)
+    if durable:
+        return future.result(WRITE_TIMEOUT)
     return entry
 
 
@@ -136,10 +766,12 @@ def save_item_event(
     provider_ref: str,
     event_type: str,
     location: str = "",
-    raw_payload: str = "",
+    raw_payload: Any = "",
+    durable: bool = True,
 ) -> ItemEvent:
     """
     Save a normalized tracking event for a universal item.
+    Acknowledgement modes are the same as for `log_to_ledger`.
     """
     event = ItemEvent(
         item_id=item_id,
@@ -147,12 +779,11 @@ def save_item_event(
         provider_ref=provider_ref,
         event_type=event_type,
         location=location,
-        raw_payload=raw_payload,
+        raw_payload=encode_payload(raw_payload),
     )
-    with Session(engine) as session:
-        session.add(event)
-        session.commit()
-        session.refresh(event)
+    future = ledger_writer.submit(event, durable=durable)
+    if durable:
+        return future.result(WRITE_TIMEOUT)
     return event
 
 
@@ -188,6 +819,111 @@ class RunFlowResult(BaseModel):
     success: bool
 
 
+class BatchRunFlowRequest(BaseModel):
+    asset_ids: List[str]
+    # Optional per-downstream-system overrides of DOWNSTREAM_CONCURRENCY.
+    concurrency: Dict[str, int] = {}
+
+
+class AssetFlowResult(BaseModel):
+    asset_id: str
+    steps: List[str]
+    success: bool
+    error: Optional[str] = None
+    latency_ms: float
+
+
+class BatchRunFlowResult(BaseModel):
+    succeeded: int
+    failed: int
+    elapsed_ms: float
+    results: List[AssetFlowResult]
+
+
+class LedgerEntryRead(BaseModel):
+    id: int
+    asset_id: str
+    from_system: str
+    to_system: str
+    action: str
+    status: str
+    timestamp: datetime
+    notes: Optional[str] = None
+    payload: Any = None
+
+    @classmethod
+    def from_row(cls, row: LedgerEntry, include_payload: bool) -> "LedgerEntryRead":
+        return cls(
+            **row.model_dump(exclude={"payload"}),
+            payload=decode_payload(row.payload) if include_payload else None,
+        )
+
+
+class ItemEventRead(BaseModel):
+    id: int
+    item_id: str
+    provider: str
+    provider_ref: str
+    event_type: str
+    location: Optional[str] = None
+    timestamp: datetime
+    raw_payload: Any = None
+
+    @classmethod
+    def from_row(cls, row: ItemEvent, include_payload: bool) -> "ItemEventRead":
+        return cls(
+            **row.model_dump(exclude={"raw_payload"}),
+            raw_payload=decode_payload(row.raw_payload) if include_payload else None,
+        )
+
+
+class ProviderActivity(BaseModel):
+    provider: str
+    event_count: int
+    last_seen: datetime
+
+
+class ItemSummaryResponse(BaseModel):
+    item_id: str
+    event_count: int
+    latest_event_type: str
+    latest_provider: str
+    latest_provider_ref: str
+    latest_timestamp: datetime
+    last_location: Optional[str]
+    providers: List[ProviderActivity]
+
+
+class RefreshItemsRequest(BaseModel):
+    item_ids: List[str]
+
+
+class ArbitrageOpportunity(BaseModel):
+    asset_id: str
+    region: str
+    la_price: float
+    market_price: float
+    market_stock: int
+    quantity: int
+    spread: float
+    potential_profit: float
+
+
+class ArbitrageScanRequest(BaseModel):
+    inventory: List[InventoryItem] = []
+    markets: List[MarketData] = []
+    min_ratio: float = 1.5
+    max_stock: int = 20
+    limit: int = 100
+
+
+class ArbitrageScanResult(BaseModel):
+    assets_scanned: int
+    regions_scanned: int
+    opportunities_found: int
+    opportunities: List[ArbitrageOpportunity]
+
+
 # ============================================================
 # FASTAPI APP
 # ============================================================
@@ -206,6 +942,12 @@ app = FastAPI(
 @app.on_event("startup")
 def on_startup():
     init_db()
+    ledger_writer.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    ledger_writer.stop()
 
 
 # ============================================================
@@ -352,7 +1094,135 @@ def detect_arbitrage():
     )
 
 
+# ============================================================
+# VECTORIZED MULTI-ASSET / MULTI-REGION SCANNER
+# ============================================================
+
+class ArbitrageScanner:
+    """
+    Holds inventory and regional market quotes as NumPy arrays and evaluates
+    the same rule as `detect_arbitrage` (price >= la_price * min_ratio and
+    stock < max_stock) for every asset x region pair in one pass.
+    """
+
+    def __init__(
+        self,
+        asset_ids: List[str],
+        la_price: np.ndarray,
+        quantity: np.ndarray,
+        regions: List[str],
+        market_price: np.ndarray,
+        market_stock: np.ndarray,
+    ):
+        self.asset_ids = asset_ids
+        self.la_price = np.asarray(la_price, dtype=np.float64)
+        self.quantity = np.asarray(quantity, dtype=np.int64)
+        self.regions = regions
+        self.market_price = np.asarray(market_price, dtype=np.float64)
+        self.market_stock = np.asarray(market_stock, dtype=np.int64)
+
+    @classmethod
+    def from_models(
+        cls, inventory: List[InventoryItem], markets: List[MarketData]
+    ) -> "ArbitrageScanner":
+        return cls(
+            asset_ids=[item.asset_id for item in inventory],
+            la_price=np.fromiter((item.la_price for item in inventory), np.float64, len(inventory)),
+            quantity=np.fromiter((item.quantity for item in inventory), np.int64, len(inventory)),
+            regions=[market.region for market in markets],
+            market_price=np.fromiter((m.price for m in markets), np.float64, len(markets)),
+            market_stock=np.fromiter((m.stock for m in markets), np.int64, len(markets)),
+        )
+
+    def scan(
+        self, min_ratio: float = 1.5, max_stock: int = 20, limit: int = 100
+    ) -> tuple:
+        """
+        Return (total_matches, top opportunities ranked by potential profit).
+        """
+        la = self.la_price[:, None]
+        price = self.market_price[None, :]
+        mask = (price >= la * min_ratio) & (self.market_stock < max_stock)[None, :]
+
+        total = int(np.count_nonzero(mask))
+        k = min(limit, total)
+        if k <= 0:
+            return total, []
+
+        spread = price - la
+        profit = np.where(mask, spread * self.quantity[:, None], -np.inf).ravel()
+        top = np.argpartition(profit, -k)[-k:]
+        top = top[np.argsort(profit[top])[::-1]]
+        rows, cols = np.unravel_index(top, mask.shape)
+
+        opportunities = [
+            ArbitrageOpportunity(
+                asset_id=self.asset_ids[r],
+                region=self.regions[c],
+                la_price=float(self.la_price[r]),
+                market_price=float(self.market_price[c]),
+                market_stock=int(self.market_stock[c]),
+                quantity=int(self.quantity[r]),
+                spread=float(self.market_price[c] - self.la_price[r]),
+                potential_profit=float(profit[i]),
+            )
+            for r, c, i in zip(rows.tolist(), cols.tolist(), top.tolist())
+        ]
+        return total, opportunities
+
+
+@ledger_writer.scope()
+def log_opportunities(opportunities: List[ArbitrageOpportunity]) -> None:
+    """
+    Write one DETECT_ARBITRAGE ledger row per opportunity in a single commit,
+    however many there are: the scan is logged completely or not at all.
+    """
+    ledger_writer.submit_many([
+        ledger_entry(
+            asset_id=opp.asset_id,
+            from_system="ENGINE",
+            to_system="ENGINE",
+            action="DETECT_ARBITRAGE",
+            status="ARBITRAGE_TRUE",
+            payload=opp.model_dump(),
+            notes=(
+                f"Arbitrage detected for {opp.asset_id}: "
+                f"LA ${opp.la_price} vs {opp.region} ${opp.market_price}"
+            ),
+        )
+        for opp in opportunities
+    ])
+    ledger_writer.flush()
+
+
+@app.post("/detect-arbitrage/scan", response_model=ArbitrageScanResult)
+def scan_arbitrage(request: Optional[ArbitrageScanRequest] = None):
+    """
+    Scan every inventory item against every regional market feed.
+    Falls back to the mock METRC inventory / SD market when no data is posted.
+    """
+    request = request or ArbitrageScanRequest()
+    inventory = request.inventory or mock_metrc_inventory()
+    markets = request.markets or [mock_pos_sd_market()]
+
+    scanner = ArbitrageScanner.from_models(inventory, markets)
+    total, opportunities = scanner.scan(
+        min_ratio=request.min_ratio,
+        max_stock=request.max_stock,
+        limit=request.limit,
+    )
+    log_opportunities(opportunities)
+
+    return ArbitrageScanResult(
+        assets_scanned=len(inventory),
+        regions_scanned=len(markets),
+        opportunities_found=total,
+        opportunities=opportunities,
+    )
+
+
 @app.post("/run-flow", response_model=RunFlowResult)
+@ledger_writer.scope()
 def run_flow():
     """
     Run the full mocked hop:
@@ -380,7 +1250,8 @@ def run_flow():
         to_system="METRC",
         action="CREATE_TRANSFER",
         status=transfer_resp["status"],
-        payload=str(transfer_resp),
+        payload=transfer_resp,
+        durable=False,
     )
     steps.append("Transfer manifest created in METRC")
 
@@ -395,7 +1266,8 @@ def run_flow():
         to_system="LOGISTICS",
         action="DISPATCH",
         status=logistics_resp["status"],
-        payload=str(logistics_resp),
+        payload=logistics_resp,
+        durable=False,
     )
     steps.append("Secure transport dispatched")
 
@@ -407,7 +1279,8 @@ def run_flow():
         to_system="POS",
         action="RECEIVE_AT_RETAIL",
         status=receive_resp["status"],
-        payload=str(receive_resp),
+        payload=receive_resp,
+        durable=False,
     )
     steps.append("Retailer received inventory")
 
@@ -419,7 +1292,8 @@ def run_flow():
         to_system="PAYMENT",
         action="SETTLE",
         status=pay_resp["status"],
-        payload=str(pay_resp),
+        payload=pay_resp,
+        durable=False,
         notes="Includes arbitrage profit share.",
     )
     steps.append("Payment settled, arbitrage profit shared")
@@ -432,10 +1306,14 @@ def run_flow():
         to_system="PMSI",
         action="UPDATE_LIEN",
         status=pmsi_resp["status"],
-        payload=str(pmsi_resp),
+        payload=pmsi_resp,
+        durable=False,
     )
     steps.append("PMSI lien updated")
 
+    # All five hops go out in one commit.
+    ledger_writer.flush()
+
     return RunFlowResult(
         asset_id=asset_id,
         steps=steps,
@@ -443,6 +1321,412 @@ def run_flow():
     )
 
 
+# ============================================================
+# CONCURRENT BATCH ORCHESTRATION
+# ============================================================
+
+# Hops after arbitrage detection, in order:
+# (from_system, to_system, action, step description, notes)
+FLOW_HOPS = [
+    ("ENGINE", "METRC", "CREATE_TRANSFER", "Transfer manifest created in METRC", ""),
+    ("METRC", "LOGISTICS", "DISPATCH", "Secure transport dispatched", ""),
+    ("LOGISTICS", "POS", "RECEIVE_AT_RETAIL", "Retailer received inventory", ""),
+    ("POS", "PAYMENT", "SETTLE", "Payment settled, arbitrage profit shared",
+     "Includes arbitrage profit share."),
+    ("PAYMENT", "PMSI", "UPDATE_LIEN", "PMSI lien updated", ""),
+]
+
+# Max in-flight calls per downstream system across the whole batch.
+DOWNSTREAM_CONCURRENCY = {
+    "METRC": 16,
+    "LOGISTICS": 16,
+    "POS": 32,
+    "PAYMENT": 8,
+    "PMSI": 16,
+}
+
+# Mock endpoint path for each downstream system (the HTTP stand-ins).
+DOWNSTREAM_PATHS = {
+    "METRC": "/mock/metrc/create-transfer",
+    "LOGISTICS": "/mock/logistics/dispatch",
+    "POS": "/mock/pos/receive",
+    "PAYMENT": "/mock/payment/settle",
+    "PMSI": "/mock/pmsi/update",
+}
+
+# (to_system, params) -> downstream response
+HopCaller = Callable[[str, Dict[str, str]], Awaitable[Dict[str, Any]]]
+
+
+def hop_params(to_system: str, asset_id: str, context: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Query params for a downstream call, threading earlier hop results through.
+    """
+    params = {"asset_id": asset_id}
+    if to_system == "LOGISTICS":
+        params["manifest_id"] = context["manifest_id"]
+    return params
+
+
+async def call_mock_in_process(to_system: str, params: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Default HopCaller: invoke the /mock/* handlers directly.
+    """
+    handlers = {
+        "METRC": mock_metrc_create_transfer,
+        "LOGISTICS": mock_logistics_dispatch,
+        "POS": mock_pos_receive,
+        "PAYMENT": mock_payment_settle,
+        "PMSI": mock_pmsi_update,
+    }
+    return handlers[to_system](**params)
+
+
+async def run_asset_flow(
+    asset_id: str,
+    call_hop: HopCaller,
+    limits: Dict[str, asyncio.Semaphore],
+) -> AssetFlowResult:
+    """
+    Run the FLOW_HOPS pipeline for one asset. Ledger rows are queued on the
+    write-behind writer and committed with the rest of the batch.
+    """
+    start = time.perf_counter()
+    steps: List[str] = []
+    context: Dict[str, Any] = {}
+    error = None
+
+    for from_system, to_system, action, description, notes in FLOW_HOPS:
+        try:
+            async with limits[to_system]:
+                resp = await call_hop(to_system, hop_params(to_system, asset_id, context))
+        except Exception as exc:
+            error = f"{to_system}: {exc}"
+            log_to_ledger(
+                asset_id=asset_id,
+                from_system=from_system,
+                to_system=to_system,
+                action=action,
+                status="FAILED",
+                notes=str(exc),
+                durable=False,
+            )
+            break
+
+        context.update(resp)
+        log_to_ledger(
+            asset_id=asset_id,
+            from_system=from_system,
+            to_system=to_system,
+            action=action,
+            status=resp["status"],
+            payload=resp,
+            notes=notes,
+            durable=False,
+        )
+        steps.append(description)
+
+    return AssetFlowResult(
+        asset_id=asset_id,
+        steps=steps,
+        success=error is None,
+        error=error,
+        latency_ms=(time.perf_counter() - start) * 1000,
+    )
+
+
+async def run_flows_concurrently(
+    asset_ids: List[str],
+    call_hop: HopCaller = call_mock_in_process,
+    concurrency: Optional[Dict[str, int]] = None,
+) -> List[AssetFlowResult]:
+    """
+    Run hop pipelines for many assets at once, bounded per downstream system,
+    then flush all of their ledger rows together.
+    """
+    limits = {
+        system: asyncio.Semaphore((concurrency or {}).get(system, default))
+        for system, default in DOWNSTREAM_CONCURRENCY.items()
+    }
+    with ledger_writer.scope():
+        results = await asyncio.gather(
+            *(run_asset_flow(asset_id, call_hop, limits) for asset_id in asset_ids)
+        )
+        await asyncio.to_thread(ledger_writer.flush)
+    return list(results)
+
+
+@app.post("/run-flow/batch", response_model=BatchRunFlowResult)
+async def run_flow_batch(request: BatchRunFlowRequest):
+    """
+    Run the METRC -> logistics -> POS -> payment -> PMSI hops for many
+    assets concurrently and return per-asset step results.
+    """
+    unknown = set(request.concurrency) - set(DOWNSTREAM_CONCURRENCY)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown downstream systems: {', '.join(sorted(unknown))}",
+        )
+    if any(limit < 1 for limit in request.concurrency.values()):
+        raise HTTPException(status_code=400, detail="Concurrency limits must be >= 1")
+
+    start = time.perf_counter()
+    results = await run_flows_concurrently(
+        request.asset_ids, concurrency=request.concurrency
+    )
+    succeeded = sum(1 for r in results if r.success)
+    return BatchRunFlowResult(
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        elapsed_ms=(time.perf_counter() - start) * 1000,
+        results=results,
+    )
+
+
+# ============================================================
+# KEYSET PAGINATION / NDJSON STREAMING
+# ============================================================
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+STREAM_BATCH_SIZE = 1000
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """
+    Opaque cursor for the (timestamp, id) keyset position of a row.
+    """
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_select(model, filters, since, until, cursor):
+    """
+    SELECT for `model` ordered by (timestamp, id), starting after `cursor`.
+    """
+    statement = select(model).where(*filters)
+    if since is not None:
+        statement = statement.where(model.timestamp >= since)
+    if until is not None:
+        statement = statement.where(model.timestamp < until)
+    if cursor:
+        statement = statement.where(
+            tuple_(model.timestamp, model.id) > decode_cursor(cursor)
+        )
+    return statement.order_by(model.timestamp, model.id)
+
+
+def merge_rows(hot, archived: Optional[Iterator] = None):
+    """
+    Merge hot (SQLite) and archived rows into one (timestamp, id) ordered
+    stream. A row present in both (an interrupted archive run) is
+    yielded once.
+    """
+    if archived is None:
+        yield from hot
+        return
+    last_key = None
+    for row in heapq.merge(archived, hot, key=lambda r: (r.timestamp, r.id)):
+        key = (row.timestamp, row.id)
+        if key != last_key:
+            yield row
+            last_key = key
+
+
+def fetch_page(
+    statement, limit: int, response: Response, archived: Optional[Iterator] = None
+) -> list:
+    """
+    Fetch one page; sets X-Next-Cursor when more rows follow.
+    `archived` optionally supplies already-filtered rows from cold storage.
+    """
+    with Session(engine) as session:
+        hot = session.exec(statement.limit(limit + 1)).all()
+    rows = list(itertools.islice(merge_rows(hot, archived), limit + 1))
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return rows
+
+
+def stream_ndjson(
+    statement,
+    render: Callable[[Any], BaseModel],
+    limit: Optional[int] = None,
+    archived: Optional[Iterator] = None,
+) -> StreamingResponse:
+    """
+    Stream rows as NDJSON, fetching STREAM_BATCH_SIZE rows at a time from
+    the database cursor so memory stays flat regardless of result size.
+    Each row is converted with `render` before encoding.
+    """
+    if limit is not None:
+        statement = statement.limit(limit)
+
+    def lines():
+        with Session(engine) as session:
+            hot = session.exec(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+            for row in itertools.islice(merge_rows(hot, archived), limit):
+                yield render(row).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+# ============================================================
+# LEDGER COLD-STORAGE ARCHIVAL
+# ============================================================
+
+ARCHIVE_DIR = os.getenv("LEDGER_ARCHIVE_DIR", os.path.join(BASE_DIR, "ledger_archive"))
+ARCHIVE_BATCH_ROWS = 100_000
+
+ledger_archive = LedgerArchive(ARCHIVE_DIR)
+
+
+def archive_ledger(retention_days: int, batch_rows: int = ARCHIVE_BATCH_ROWS) -> int:
+    """
+    Move ledger rows older than `retention_days` into immutable archive
+    segments, `batch_rows` per segment, deleting them from the hot table
+    once their segment is on disk. Returns the number of rows moved.
+    """
+    ledger_writer.flush()
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    moved = 0
+
+    while True:
+        with Session(engine) as session:
+            entries = session.exec(
+                select(LedgerEntry)
+                .where(LedgerEntry.timestamp < cutoff)
+                .order_by(LedgerEntry.timestamp, LedgerEntry.id)
+                .limit(batch_rows)
+            ).all()
+            if not entries:
+                break
+
+            ledger_archive.write(
+                [
+                    {**entry.model_dump(), "payload": decode_payload(entry.payload)}
+                    for entry in entries
+                ]
+            )
+
+            ids = [entry.id for entry in entries]
+            for start in range(0, len(ids), 500):
+                session.execute(
+                    delete(LedgerEntry).where(LedgerEntry.id.in_(ids[start:start + 500]))
+                )
+            session.commit()
+
+        moved += len(entries)
+        if len(entries) < batch_rows:
+            break
+
+    return moved
+
+
+def archived_ledger_rows(cursor, since, until, filters: Dict[str, str]) -> Iterator[LedgerEntry]:
+    rows = ledger_archive.iter_rows(
+        after=decode_cursor(cursor) if cursor else None,
+        since=since,
+        until=until,
+        filters=filters,
+    )
+    return (LedgerEntry(**row) for row in rows)
+
+
+# ============================================================
+# PROVIDER FAN-OUT FOR ITEM REFRESH
+# ============================================================
+
+# Max in-flight polls per provider, and seconds before a poll is abandoned.
+PROVIDER_CONCURRENCY = 8
+PROVIDER_TIMEOUT = 10.0
+
+# ItemSource -> {"event_type", "location", "raw_payload"}
+ProviderPoller = Callable[[ItemSource], Awaitable[Dict[str, Any]]]
+
+
+async def poll_mock_provider(src: ItemSource) -> Dict[str, Any]:
+    return {
+        "event_type": "MOCK_UPDATE",
+        "location": "UNKNOWN",
+        "raw_payload": f"Mock update from {src.provider} for {src.provider_ref}",
+    }
+
+
+# Real provider integrations register here by provider name; anything
+# unregistered falls back to the mock poller.
+PROVIDER_POLLERS: Dict[str, ProviderPoller] = {}
+
+
+def load_item_sources(item_ids: List[str]) -> List[ItemSource]:
+    with Session(engine) as session:
+        return session.exec(
+            select(ItemSource).where(ItemSource.item_id.in_(item_ids))
+        ).all()
+
+
+async def poll_sources(
+    sources: List[ItemSource],
+    concurrency: int = PROVIDER_CONCURRENCY,
+    timeout: float = PROVIDER_TIMEOUT,
+) -> tuple:
+    """
+    Poll every source in parallel, at most `concurrency` at a time per
+    provider. Returns (ItemEvent rows as dicts, error strings).
+    """
+    limits: Dict[str, asyncio.Semaphore] = {}
+    for src in sources:
+        limits.setdefault(src.provider, asyncio.Semaphore(concurrency))
+
+    async def poll(src: ItemSource):
+        poller = PROVIDER_POLLERS.get(src.provider, poll_mock_provider)
+        async with limits[src.provider]:
+            try:
+                result = await asyncio.wait_for(poller(src), timeout)
+                return {
+                    "item_id": src.item_id,
+                    "provider": src.provider,
+                    "provider_ref": src.provider_ref,
+                    "event_type": result["event_type"],
+                    "location": result.get("location"),
+                    "timestamp": datetime.utcnow(),
+                    "raw_payload": encode_payload(result.get("raw_payload", "")),
+                }, None
+            except asyncio.TimeoutError:
+                return None, f"{src.provider} {src.provider_ref}: timed out"
+            except Exception as exc:
+                return None, f"{src.provider} {src.provider_ref}: {exc!r}"
+
+    outcomes = await asyncio.gather(*(poll(src) for src in sources))
+    rows = [row for row, _ in outcomes if row is not None]
+    errors = [error for _, error in outcomes if error is not None]
+    return rows, errors
+
+
+def bulk_insert_item_events(rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert ItemEvent rows with a single executemany statement in one
+    transaction.
+    """
+    if not rows:
+        return
+    with Session(engine) as session:
+        session.execute(insert(ItemEvent), rows)
+        apply_item_summaries(session, rows)
+        session.commit()
+
+
 # ============================================================
 # UNIVERSAL ITEM TRACKING ENDPOINTS
 # ============================================================
@@ -474,78 +1758,170 @@ def register_item(item_id: str, provider: str, provider_ref: str):
 
 
 @app.post("/refresh-item/{item_id}")
-def refresh_item(item_id: str):
+async def refresh_item(item_id: str):
     """
     MOCK:
-    Look up all sources for this item and create fake ItemEvents.
+    Look up all sources for this item and poll them concurrently.
 
     In a real system, this is where you'd:
     - call FedEx/UPS APIs for shipping events
     - call Shopify/Amazon for order status
     - call METRC/GIA/other compliance systems
-    and normalize all into ItemEvent rows.
+    and normalize all into ItemEvent rows (see PROVIDER_POLLERS).
     """
-    with Session(engine) as session:
-        sources = session.exec(
-            select(ItemSource).where(ItemSource.item_id == item_id)
-        ).all()
-
+    sources = await asyncio.to_thread(load_item_sources, [item_id])
     if not sources:
         raise HTTPException(status_code=404, detail="No sources linked to this item_id")
 
-    created_events: List[ItemEvent] = []
-
-    for src in sources:
-        mock_payload = f"Mock update from {src.provider} for {src.provider_ref}"
-        event = save_item_event(
-            item_id=item_id,
-            provider=src.provider,
-            provider_ref=src.provider_ref,
-            event_type="MOCK_UPDATE",
-            location="UNKNOWN",
-            raw_payload=mock_payload,
-        )
-        created_events.append(event)
+    rows, errors = await poll_sources(sources)
+    await asyncio.to_thread(bulk_insert_item_events, rows)
 
     return {
         "status": "ok",
         "item_id": item_id,
-        "events_created": len(created_events),
+        "events_created": len(rows),
+        "errors": errors,
     }
 
 
-@app.get("/item-history/{item_id}", response_model=List[ItemEvent])
-def get_item_history(item_id: str):
+@app.post("/refresh-items")
+async def refresh_items(request: RefreshItemsRequest):
+    """
+    Refresh many item_ids in one call: every linked provider for every item
+    is polled concurrently and all resulting events are inserted together.
+    """
+    sources = await asyncio.to_thread(load_item_sources, request.item_ids)
+    rows, errors = await poll_sources(sources)
+    await asyncio.to_thread(bulk_insert_item_events, rows)
+
+    created: Dict[str, int] = {item_id: 0 for item_id in request.item_ids}
+    for row in rows:
+        created[row["item_id"]] += 1
+    linked = {src.item_id for src in sources}
+
+    return {
+        "status": "ok",
+        "events_created": created,
+        "unlinked_item_ids": [i for i in request.item_ids if i not in linked],
+        "errors": errors,
+    }
+
+
+@app.get("/item-history/{item_id}", response_model=List[ItemEventRead])
+def get_item_history(
+    item_id: str,
+    response: Response,
+    provider: Optional[str] = None,
+    event_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fmt: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    include_payload: bool = False,
+):
     """
-    Return the full normalized event history for a given item_id.
+    Return the normalized event history for a given item_id, oldest first.
     This shows the journey of that item across all linked providers.
+
+    Paged by (timestamp, id); see `get_ledger` for cursor, NDJSON and
+    include_payload usage.
     """
-    with Session(engine) as session:
-        statement = (
-            select(ItemEvent)
-            .where(ItemEvent.item_id == item_id)
-            .order_by(ItemEvent.timestamp)
-        )
-        events = session.exec(statement).all()
+    filters = [ItemEvent.item_id == item_id]
+    if provider:
+        filters.append(ItemEvent.provider == provider)
+    if event_type:
+        filters.append(ItemEvent.event_type == event_type)
+    statement = keyset_select(ItemEvent, filters, since, until, cursor)
+
+    def render(row: ItemEvent) -> ItemEventRead:
+        return ItemEventRead.from_row(row, include_payload)
+
+    if fmt == "ndjson":
+        return stream_ndjson(statement, render, limit)
 
-    if not events:
+    events = fetch_page(statement, limit or DEFAULT_PAGE_SIZE, response)
+    if not events and cursor is None:
         raise HTTPException(status_code=404, detail="No events found for this item_id")
-    return events
+    return [render(row) for row in events]
+
+
+@app.get("/item-summary/{item_id}", response_model=ItemSummaryResponse)
+def get_item_summary(item_id: str):
+    """
+    Latest state of an item (last event, last location, per-provider
+    activity, event counts) from the materialized projection.
+    """
+    with Session(engine) as session:
+        summary = session.get(ItemSummary, item_id)
+        if summary is None:
+            raise HTTPException(status_code=404, detail="No events found for this item_id")
+        providers = session.exec(
+            select(ItemProviderSummary).where(ItemProviderSummary.item_id == item_id)
+        ).all()
+
+    return ItemSummaryResponse(
+        **summary.model_dump(exclude={"last_location_at"}),
+        providers=[
+            ProviderActivity(
+                provider=p.provider, event_count=p.event_count, last_seen=p.last_seen
+            )
+            for p in providers
+        ],
+    )
 
 
 # ============================================================
 # VIEW RAW ARBITRAGE LEDGER
 # ============================================================
 
-@app.get("/ledger", response_model=List[LedgerEntry])
-def get_ledger():
+@app.get("/ledger", response_model=List[LedgerEntryRead])
+def get_ledger(
+    response: Response,
+    asset_id: Optional[str] = None,
+    action: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fmt: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    include_payload: bool = False,
+):
     """
-    Get all arbitrage ledger entries.
+    Get arbitrage ledger entries, oldest first, spanning both the hot table
+    and archived segments.
+
+    format=json returns one page of `limit` rows; when more rows exist the
+    X-Next-Cursor header holds the cursor for the next page.
+    format=ndjson streams every matching row (or at most `limit`) as
+    newline-delimited JSON without loading them all into memory.
+    Payloads are only decoded and returned when include_payload=true.
     """
-    with Session(engine) as session:
-        statement = select(LedgerEntry).order_by(LedgerEntry.timestamp)
-        results = session.exec(statement).all()
-        return results
+    filters = []
+    if asset_id:
+        filters.append(LedgerEntry.asset_id == asset_id)
+    if action:
+        filters.append(LedgerEntry.action == action)
+    if status:
+        filters.append(LedgerEntry.status == status)
+    statement = keyset_select(LedgerEntry, filters, since, until, cursor)
+    archived = archived_ledger_rows(
+        cursor,
+        since,
+        until,
+        {k: v for k, v in (("asset_id", asset_id), ("action", action), ("status", status)) if v},
+    )
+
+    def render(row: LedgerEntry) -> LedgerEntryRead:
+        return LedgerEntryRead.from_row(row, include_payload)
+
+    if fmt == "ndjson":
+        return stream_ndjson(statement, render, limit, archived)
+    rows = fetch_page(statement, limit or DEFAULT_PAGE_SIZE, response, archived)
+    return [render(row) for row in rows]
+
+
 @app.get("/", response_class=FileResponse)
 def serve_frontend():
     """
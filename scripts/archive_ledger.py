@@ -0,0 +1,38 @@
+"""
+Move ledger rows older than the retention window into archive segments.
+
+Archived rows stay visible through /ledger; only the hot SQLite table
+shrinks. Safe to run repeatedly (e.g. from cron).
+
+Usage:
+    python scripts/archive_ledger.py [--retention-days 30] [--batch-rows 100000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run() -> None:
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import main
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--retention-days", type=int, default=30)
+    parser.add_argument("--batch-rows", type=int, default=main.ARCHIVE_BATCH_ROWS)
+    args = parser.parse_args()
+
+    main.init_db()
+    try:
+        moved = main.archive_ledger(args.retention_days, args.batch_rows)
+    finally:
+        main.ledger_writer.stop()
+    print(f"Archived {moved} ledger row(s) to {main.ARCHIVE_DIR}")
+
+
+if __name__ == "__main__":
+    run()
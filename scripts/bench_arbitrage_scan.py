@@ -0,0 +1,72 @@
+"""
+Benchmark the vectorized arbitrage scanner against the scalar per-pair check
+used by /detect-arbitrage.
+
+Usage:
+    python scripts/bench_arbitrage_scan.py [--assets 10000] [--regions 50] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def scalar_scan(asset_ids, la_price, quantity, regions, market_price, market_stock,
+                min_ratio=1.5, max_stock=20, limit=100):
+    hits = []
+    for a, la in enumerate(la_price):
+        for r, price in enumerate(market_price):
+            if price >= la * min_ratio and market_stock[r] < max_stock:
+                hits.append(((price - la) * quantity[a], asset_ids[a], regions[r]))
+    hits.sort(reverse=True)
+    return len(hits), hits[:limit]
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--assets", type=int, default=10_000)
+    parser.add_argument("--regions", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import main
+
+    rng = np.random.default_rng(42)
+    asset_ids = [f"ASSET-{i:06d}" for i in range(args.assets)]
+    la_price = rng.uniform(10.0, 30.0, args.assets)
+    quantity = rng.integers(100, 5000, args.assets)
+    regions = [f"REGION-{i:03d}" for i in range(args.regions)]
+    market_price = rng.uniform(15.0, 60.0, args.regions)
+    market_stock = rng.integers(0, 40, args.regions)
+
+    scanner = main.ArbitrageScanner(
+        asset_ids, la_price, quantity, regions, market_price, market_stock
+    )
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        total, _ = scanner.scan()
+    vectorized = (time.perf_counter() - start) / args.repeat
+
+    lists = (la_price.tolist(), quantity.tolist(), market_price.tolist(), market_stock.tolist())
+    start = time.perf_counter()
+    scalar_total, _ = scalar_scan(asset_ids, lists[0], lists[1], regions, lists[2], lists[3])
+    scalar = time.perf_counter() - start
+
+    assert total == scalar_total, (total, scalar_total)
+    pairs = args.assets * args.regions
+    print(f"{args.assets:,} assets x {args.regions} regions = {pairs:,} pairs, {total:,} matches")
+    print(f"{'scalar loop':<12}{scalar * 1000:>10.1f} ms  {pairs / scalar:>14,.0f} pairs/sec")
+    print(f"{'vectorized':<12}{vectorized * 1000:>10.1f} ms  {pairs / vectorized:>14,.0f} pairs/sec")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,88 @@
+"""
+Benchmark the write-behind ledger writer against a copy of ledger.db.
+
+Compares one-commit-per-entry (durable) writes with batched group commits
+at several batch sizes and prints entries/sec for each.
+
+Usage:
+    python scripts/bench_ledger_writer.py [--entries 5000] [--batch-sizes 1,10,100,1000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _prepare_db() -> str:
+    tmp_dir = tempfile.mkdtemp(prefix="ledger-bench-")
+    db_path = os.path.join(tmp_dir, "ledger.db")
+    shutil.copyfile(os.path.join(ROOT, "ledger.db"), db_path)
+    os.environ["LEDGER_DATABASE_URL"] = f"sqlite:///{db_path}"
+    return tmp_dir
+
+
+def _entry(main, i: int):
+    return main.LedgerEntry(
+        asset_id=f"BENCH-{i % 100:04d}",
+        from_system="ENGINE",
+        to_system="BENCH",
+        action="BENCH_WRITE",
+        status="OK",
+        payload=main.encode_payload({"bench": i}),
+    )
+
+
+def bench_durable(main, entries: int) -> float:
+    writer = main.LedgerWriter(main.engine)
+    start = time.perf_counter()
+    for i in range(entries):
+        writer.submit(_entry(main, i), durable=True).result()
+    elapsed = time.perf_counter() - start
+    writer.stop()
+    return entries / elapsed
+
+
+def bench_batched(main, entries: int, batch_size: int) -> float:
+    writer = main.LedgerWriter(main.engine, max_batch=batch_size, max_delay=0.05)
+    start = time.perf_counter()
+    for i in range(entries):
+        writer.submit(_entry(main, i))
+    writer.flush()
+    elapsed = time.perf_counter() - start
+    writer.stop()
+    return entries / elapsed
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--batch-sizes", default="1,10,100,1000")
+    args = parser.parse_args()
+
+    tmp_dir = _prepare_db()
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import main
+
+    main.engine.echo = False
+    main.init_db()
+
+    try:
+        print(f"{'mode':<24}{'entries/sec':>14}")
+        print(f"{'durable (1 commit each)':<24}{bench_durable(main, args.entries):>14,.0f}")
+        for size in (int(s) for s in args.batch_sizes.split(",")):
+            rate = bench_batched(main, args.entries, size)
+            print(f"{f'batched max_batch={size}':<24}{rate:>14,.0f}")
+    finally:
+        main.engine.dispose()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,84 @@
+"""
+Compare ledger payload encodings: the old str(dict) text, plain compact
+JSON, and main.encode_payload (compact JSON, zlib above the threshold).
+
+Reports stored bytes per payload and encode/decode throughput for a small
+run_flow hop response and a large carrier-style scan history.
+
+Usage:
+    python scripts/bench_payload_encoding.py [--iterations 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import os
+import sys
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _samples():
+    hop = {
+        "tracking_id": str(uuid.uuid4()),
+        "asset_id": "1A406030000312F000001234",
+        "manifest_id": str(uuid.uuid4()),
+        "status": "IN_TRANSIT",
+    }
+    scans = {
+        "trackingNumber": "449044304137821",
+        "scanEvents": [
+            {
+                "date": f"2024-05-0{1 + i % 9}T10:{i % 60:02d}:00-05:00",
+                "eventType": "IT" if i % 3 else "AR",
+                "eventDescription": "In transit" if i % 3 else "Arrived at FedEx location",
+                "scanLocation": {"city": "MEMPHIS", "stateOrProvinceCode": "TN", "countryCode": "US"},
+            }
+            for i in range(40)
+        ],
+    }
+    return {"hop response": hop, "scan history": scans}
+
+
+def _rate(fn, arg, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return iterations / (time.perf_counter() - start)
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import main
+
+    def compact_json(value):
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    encodings = {
+        "str(dict)": (lambda v: str(v).encode(), lambda b: ast.literal_eval(b.decode())),
+        "compact json": (compact_json, json.loads),
+        "encode_payload": (main.encode_payload, main.decode_payload),
+    }
+
+    print(f"{'payload':<14}{'encoding':<16}{'bytes':>8}{'encode/s':>12}{'decode/s':>12}")
+    for name, value in _samples().items():
+        for label, (encode, decode) in encodings.items():
+            blob = encode(value)
+            assert decode(blob) == value
+            print(
+                f"{name:<14}{label:<16}{len(blob):>8}"
+                f"{_rate(encode, value, args.iterations):>12,.0f}"
+                f"{_rate(decode, blob, args.iterations):>12,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,111 @@
+"""
+Load benchmark for concurrent batch orchestration.
+
+Serves the app with uvicorn in a separate process and runs the hop pipelines for
+many assets against the real /mock/* HTTP endpoints, reporting flows/sec
+and p50/p99 flow latency. The local mocks answer instantly, so
+--latency-ms adds a simulated network round trip to every hop. The
+baseline runs one asset at a time, like POST /run-flow.
+
+Usage:
+    python scripts/bench_run_flow_batch.py [--assets 500] [--latency-ms 20] [--port 8765]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _start_server(port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/mock/pos/sd-market")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _run(main, base_url: str, asset_ids, latency: float, serial: bool):
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=httpx.Limits(max_connections=64)
+    ) as client:
+
+        async def call_hop(to_system, params):
+            await asyncio.sleep(latency)
+            resp = await client.post(main.DOWNSTREAM_PATHS[to_system], params=params)
+            resp.raise_for_status()
+            return resp.json()
+
+        start = time.perf_counter()
+        if serial:
+            results = []
+            for asset_id in asset_ids:
+                results += await main.run_flows_concurrently([asset_id], call_hop)
+        else:
+            results = await main.run_flows_concurrently(asset_ids, call_hop)
+        return results, time.perf_counter() - start
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--assets", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="flow-bench-")
+    shutil.copyfile(os.path.join(ROOT, "ledger.db"), os.path.join(tmp_dir, "ledger.db"))
+    os.environ["LEDGER_DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'ledger.db')}"
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import main
+
+    main.engine.echo = False
+    server = _start_server(args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+    asset_ids = [f"BENCH-{i:05d}" for i in range(args.assets)]
+
+    try:
+        print(f"{'mode':<12}{'flows/sec':>12}{'p50 ms':>10}{'p99 ms':>10}{'failed':>8}")
+        for label, serial in (("serial", True), ("concurrent", False)):
+            results, elapsed = asyncio.run(
+                _run(main, base_url, asset_ids, args.latency_ms / 1000, serial)
+            )
+            latencies = [r.latency_ms for r in results]
+            failed = sum(1 for r in results if not r.success)
+            print(
+                f"{label:<12}{len(results) / elapsed:>12,.1f}"
+                f"{_percentile(latencies, 50):>10.1f}{_percentile(latencies, 99):>10.1f}{failed:>8}"
+            )
+    finally:
+        server.terminate()
+        server.wait()
+        main.ledger_writer.stop()
+        main.engine.dispose()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run()
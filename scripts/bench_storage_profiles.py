@@ -0,0 +1,109 @@
+"""
+Multi-threaded writer/reader benchmark for the SQLite storage profiles.
+
+For each profile in main.STORAGE_PROFILES, runs --writers threads that each
+commit --writes single ledger rows while --readers threads page through
+/ledger-style keyset queries, then reports write and read throughput and
+the number of "database is locked" errors.
+
+Usage:
+    python scripts/bench_storage_profiles.py [--writers 4] [--readers 4] [--writes 500]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _bench_profile(main, profile: str, writers: int, readers: int, writes: int):
+    from sqlmodel import Session, SQLModel
+
+    tmp_dir = tempfile.mkdtemp(prefix=f"storage-{profile}-")
+    engine = main.make_engine(f"sqlite:///{os.path.join(tmp_dir, 'ledger.db')}", profile, echo=False)
+    SQLModel.metadata.create_all(engine)
+
+    done = threading.Event()
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+
+    def bump(key: str) -> None:
+        with lock:
+            counts[key] += 1
+
+    def writer(n: int) -> None:
+        for i in range(writes):
+            entry = main.LedgerEntry(
+                asset_id=f"ASSET-{n}",
+                from_system="ENGINE",
+                to_system="BENCH",
+                action="BENCH_WRITE",
+                status="OK",
+                payload=main.encode_payload({"write": i}),
+            )
+            try:
+                with Session(engine) as session:
+                    session.add(entry)
+                    session.commit()
+                bump("writes")
+            except OperationalError:
+                bump("locked")
+
+    def reader(n: int) -> None:
+        statement = main.keyset_select(
+            main.LedgerEntry, [main.LedgerEntry.asset_id == f"ASSET-{n % writers}"], None, None, None
+        ).limit(100)
+        while not done.is_set():
+            try:
+                with Session(engine) as session:
+                    session.exec(statement).all()
+                bump("reads")
+            except OperationalError:
+                bump("locked")
+
+    write_threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    read_threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    start = time.perf_counter()
+    for thread in write_threads + read_threads:
+        thread.start()
+    for thread in write_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for thread in read_threads:
+        thread.join()
+
+    engine.dispose()
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    return counts["writes"] / elapsed, counts["reads"] / elapsed, counts["locked"]
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=500, help="commits per writer thread")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import main
+
+    print(f"{'profile':<12}{'writes/sec':>12}{'reads/sec':>12}{'locked':>8}")
+    for profile in main.STORAGE_PROFILES:
+        write_rate, read_rate, locked = _bench_profile(
+            main, profile, args.writers, args.readers, args.writes
+        )
+        print(f"{profile:<12}{write_rate:>12,.0f}{read_rate:>12,.0f}{locked:>8}")
+
+
+if __name__ == "__main__":
+    run()
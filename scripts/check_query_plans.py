@@ -0,0 +1,157 @@
+"""
+Query-plan regression check for the ledger schema in main.py.
+
+Builds a scratch SQLite database with --rows ledger entries and item events,
+captures EXPLAIN QUERY PLAN for each hot query exactly as main.py issues it,
+and exits non-zero if any of them falls back to a full table scan or sorts
+through a temporary B-tree. Also prints the median run time of each query.
+
+Usage:
+    python scripts/check_query_plans.py [--rows 1000000] [--items 10000]
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _populate(db_path: str, rows: int, items: int) -> None:
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO itemsource (item_id, provider, provider_ref) VALUES (?, ?, ?)",
+        ((f"ITEM-{i}", "FedEx", f"TRK-{i}") for i in range(items)),
+    )
+    conn.executemany(
+        "INSERT INTO ledgerentry (asset_id, from_system, to_system, action, status, payload, timestamp, notes)"
+        " VALUES (?, 'ENGINE', 'METRC', 'CREATE_TRANSFER', 'TRANSFER_CREATED', X'6A2222', ?, '')",
+        (
+            (f"ASSET-{rng.randrange(items)}", str(start + timedelta(seconds=i)))
+            for i in range(rows)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO itemevent (item_id, provider, provider_ref, event_type, location, timestamp, raw_payload)"
+        " VALUES (?, 'FedEx', 'TRK', 'MOCK_UPDATE', 'UNKNOWN', ?, X'6A2222')",
+        (
+            (f"ITEM-{rng.randrange(items)}", str(start + timedelta(seconds=i)))
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+@contextlib.contextmanager
+def _explain(conn):
+    """
+    Prefix every statement run on `conn` with EXPLAIN QUERY PLAN.
+    """
+    def prefix(conn, cursor, statement, parameters, context, executemany):
+        return "EXPLAIN QUERY PLAN " + statement, parameters
+
+    event.listen(conn, "before_cursor_execute", prefix, retval=True)
+    try:
+        yield
+    finally:
+        event.remove(conn, "before_cursor_execute", prefix)
+
+
+def _hot_queries(main):
+    from sqlmodel import select
+
+    cursor = main.encode_cursor(datetime(2024, 1, 3), 500_000)
+    return {
+        "refresh_item sources": select(main.ItemSource).where(main.ItemSource.item_id == "ITEM-42"),
+        "item history page": main.keyset_select(
+            main.ItemEvent, [main.ItemEvent.item_id == "ITEM-42"], None, None, None
+        ).limit(main.DEFAULT_PAGE_SIZE + 1),
+        "item history next page": main.keyset_select(
+            main.ItemEvent, [main.ItemEvent.item_id == "ITEM-42"], None, None, cursor
+        ).limit(main.DEFAULT_PAGE_SIZE + 1),
+        "ledger by asset": main.keyset_select(
+            main.LedgerEntry, [main.LedgerEntry.asset_id == "ASSET-42"], None, None, None
+        ).limit(main.DEFAULT_PAGE_SIZE + 1),
+        "ledger by asset + window": main.keyset_select(
+            main.LedgerEntry,
+            [main.LedgerEntry.asset_id == "ASSET-42"],
+            datetime(2024, 1, 2),
+            datetime(2024, 1, 5),
+            None,
+        ).limit(main.DEFAULT_PAGE_SIZE + 1),
+        "ledger next page": main.keyset_select(
+            main.LedgerEntry, [], None, None, cursor
+        ).limit(main.DEFAULT_PAGE_SIZE + 1),
+        "ledger time window": main.keyset_select(
+            main.LedgerEntry, [], datetime(2024, 1, 2), datetime(2024, 1, 3), None
+        ).limit(main.DEFAULT_PAGE_SIZE + 1),
+    }
+
+
+def _is_regression(detail: str) -> bool:
+    if detail.startswith("SCAN ") and " USING " not in detail:
+        return True
+    return "USE TEMP B-TREE" in detail
+
+
+def run() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="query-plans-")
+    db_path = os.path.join(tmp_dir, "ledger.db")
+    os.environ["LEDGER_DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import main
+
+    main.engine.echo = False
+    failures = 0
+    try:
+        main.init_db()
+        _populate(db_path, args.rows, args.items)
+
+        with main.engine.connect() as conn:
+            for name, statement in _hot_queries(main).items():
+                with _explain(conn):
+                    plan = [row[-1] for row in conn.execute(statement)]
+
+                timings = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    conn.execute(statement).all()
+                    timings.append(time.perf_counter() - start)
+
+                bad = [detail for detail in plan if _is_regression(detail)]
+                failures += bool(bad)
+                print(f"{'FAIL' if bad else 'ok':<6}{name:<28}{statistics.median(timings) * 1000:>9.2f} ms")
+                for detail in plan:
+                    print(f"{'':<8}{detail}")
+    finally:
+        main.engine.dispose()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"\n{failures} plan regression(s) at {args.rows:,} rows")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
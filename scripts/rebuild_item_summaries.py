@@ -0,0 +1,29 @@
+"""
+Rebuild the ItemSummary / ItemProviderSummary projections from ItemEvent.
+
+Run once after upgrading an existing ledger.db, or any time the projection
+is suspected to have drifted.
+
+Usage:
+    python scripts/rebuild_item_summaries.py
+"""
+from __future__ import annotations
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run() -> None:
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import main
+
+    main.init_db()
+    count = main.rebuild_item_summaries()
+    print(f"Rebuilt summaries for {count} item(s)")
+
+
+if __name__ == "__main__":
+    run()